@@ -0,0 +1,37 @@
+"""Rebuild the character trigram profiles used by discord_translator.language.
+
+Reads scripts/language_corpora/<language>.txt and writes
+src/discord_translator/data/ngram_profiles.json.
+
+    python scripts/build_language_profiles.py
+"""
+import json
+from collections import Counter
+from pathlib import Path
+
+from discord_translator.language import trigrams
+
+ROOT = Path(__file__).resolve().parent.parent
+CORPORA = ROOT / 'scripts' / 'language_corpora'
+OUTPUT = ROOT / 'src' / 'discord_translator' / 'data' / 'ngram_profiles.json'
+TOP_N = 400
+
+
+def build_profile(text):
+    counts = Counter(trigrams(text))
+    top = dict(counts.most_common(TOP_N))
+    return {'total': sum(counts.values()), 'counts': top}
+
+
+def main():
+    profiles = {
+        path.stem: build_profile(path.read_text('utf-8'))
+        for path in sorted(CORPORA.glob('*.txt'))
+    }
+    OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+    OUTPUT.write_text(json.dumps(profiles, ensure_ascii=False, sort_keys=True, indent=1) + '\n', 'utf-8')
+    print(f"Wrote {len(profiles)} profiles to {OUTPUT}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,4 +5,5 @@ setup(
     version="0.1.0",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    package_data={"discord_translator": ["data/*.json"]},
 )
\ No newline at end of file
@@ -1,6 +1,6 @@
-from .translation import translate_text
+from .translation import translate_batch, translate_text, translate_text_multi
 
 __version__ = "0.1.0"
 
 # This makes translate_text available when someone imports discord_translator
-__all__ = ["translate_text"]
\ No newline at end of file
+__all__ = ["translate_text", "translate_text_multi", "translate_batch"]
\ No newline at end of file
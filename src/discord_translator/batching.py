@@ -0,0 +1,210 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, List, Optional, Set
+
+
+class _Batch:
+    __slots__ = ('items', 'future')
+
+    def __init__(self, future: asyncio.Future):
+        self.items: List[Any] = []
+        self.future = future
+
+
+class WindowBatcher:
+    """Collect items submitted under the same key for a short window.
+
+    The first submission for a key opens a batch and schedules its handler
+    to run after ``window`` seconds with every distinct item submitted in
+    the meantime. All submitters of the batch await the same handler call
+    and receive its result. Handlers for one key never overlap: a batch
+    whose window closes while the previous batch for the key is still
+    running keeps collecting items until it finishes, so work piling up
+    behind a slow handler is merged into one call.
+    """
+
+    def __init__(self, window: float):
+        """
+        Args:
+            window (float): Seconds a batch stays open after its first item
+        """
+        self.window = window
+        self._batches = {}  # Format: {key: _Batch}, batches still collecting items
+        self._tails = {}  # Format: {key: asyncio.Task}, latest batch task per key
+        self._tasks = {}  # Format: {asyncio.Task: key}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._batches
+
+    def discard(self, key: Hashable, item: Any) -> bool:
+        """
+        Remove item from the batch still collecting items for key
+
+        Returns:
+            bool: Whether the item was waiting in an open batch
+        """
+        batch = self._batches.get(key)
+        if batch is None or item not in batch.items:
+            return False
+        batch.items.remove(item)
+        return True
+
+    def cancel(self, key: Hashable) -> int:
+        """Cancel every batch for key, open or running, returning how many were cancelled"""
+        tasks = [task for task, task_key in self._tasks.items() if task_key == key]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    async def submit(self, key: Hashable, item: Any, handler: Callable[[List[Any]], Awaitable[Any]]) -> Any:
+        """
+        Add item to the open batch for key, opening one if needed, and wait for the batch result
+
+        Args:
+            key (Hashable): Identity of the batch, such as a message ID
+            item (Any): Item to add; duplicates within a batch are kept once
+            handler (Callable[[List[Any]], Awaitable[Any]]): Called with the batch's items in
+                submission order; only the handler of the submission that opened the batch is used
+
+        Returns:
+            Any: The result of the handler
+        """
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(asyncio.get_running_loop().create_future())
+            task = asyncio.create_task(self._run(key, batch, handler, self._tails.get(key)))
+            self._tails[key] = task
+            self._tasks[task] = key
+            task.add_done_callback(lambda done: self._finish(key, batch, done))
+        if item not in batch.items:
+            batch.items.append(item)
+
+        # Shield so one waiter being cancelled does not cancel the batch for the others
+        return await asyncio.shield(batch.future)
+
+    async def _run(self, key: Hashable, batch: _Batch, handler: Callable[[List[Any]], Awaitable[Any]],
+                   previous: Optional[asyncio.Task]):
+        try:
+            await asyncio.sleep(self.window)
+            if previous is not None:
+                await asyncio.wait([previous])
+        finally:
+            if self._batches.get(key) is batch:
+                del self._batches[key]
+        if not batch.items:
+            return None  # Every item was withdrawn while the batch was open
+        return await handler(list(batch.items))
+
+    def _finish(self, key: Hashable, batch: _Batch, task: asyncio.Task):
+        # Resolve the waiters here rather than in _run, which never starts if cancelled early
+        self._tasks.pop(task, None)
+        if self._tails.get(key) is task:
+            del self._tails[key]
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+        if batch.future.done():
+            return
+        if task.cancelled():
+            batch.future.cancel()
+        elif task.exception() is not None:
+            batch.future.set_exception(task.exception())
+        else:
+            batch.future.set_result(task.result())
+
+    async def close(self):
+        """Cancel batches that are still waiting or running"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class DebouncedBatcher:
+    """Buffer items per key and hand them to a handler in micro-batches.
+
+    A key's buffer is flushed once no item has arrived for ``delay`` seconds,
+    so a burst of consecutive messages becomes a single batch. A busy key is
+    still flushed ``max_delay`` seconds after its first buffered item, and a
+    buffer reaching ``max_items`` is flushed at once. Handlers run as
+    background tasks; ``add()`` never waits for them.
+    """
+
+    def __init__(self, handler: Callable[[Hashable, List[Any]], Awaitable[Any]], delay: float = 2.0,
+                 max_delay: float = 10.0, max_items: int = 10):
+        """
+        Args:
+            handler (Callable[[Hashable, List[Any]], Awaitable[Any]]): Called with a key and its buffered items
+            delay (float): Quiet seconds after the last item before a buffer is flushed
+            max_delay (float): Longest a buffered item waits, however busy the key is
+            max_items (int): Buffer size that triggers an immediate flush
+        """
+        self.handler = handler
+        self.delay = delay
+        self.max_delay = max_delay
+        self.max_items = max_items
+        self._buffers = {}  # Format: {key: [item, ...]}
+        self._started = {}  # Format: {key: loop time of the first buffered item}
+        self._timers = {}  # Format: {key: asyncio.TimerHandle}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def pending(self, key: Hashable) -> int:
+        """Return how many items are buffered for key"""
+        return len(self._buffers.get(key, ()))
+
+    def add(self, key: Hashable, item: Any):
+        """Buffer item for key, flushing the buffer if it is full or has waited long enough"""
+        loop = asyncio.get_running_loop()
+        buffer = self._buffers.setdefault(key, [])
+        if not buffer:
+            self._started[key] = loop.time()
+        buffer.append(item)
+
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        remaining = self.max_delay - (loop.time() - self._started[key])
+        if len(buffer) >= self.max_items or remaining <= 0:
+            self.flush(key)
+        else:
+            self._timers[key] = loop.call_later(min(self.delay, remaining), self.flush, key)
+
+    def discard(self, key: Hashable, predicate: Callable[[Any], bool]) -> int:
+        """Remove buffered items of key for which predicate is true, returning how many were removed"""
+        buffer = self._buffers.get(key)
+        if not buffer:
+            return 0
+        kept = [item for item in buffer if not predicate(item)]
+        removed = len(buffer) - len(kept)
+        if kept:
+            self._buffers[key] = kept
+        else:
+            # Nothing left to hand over: drop the buffer along with its flush timer
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            del self._buffers[key], self._started[key]
+        return removed
+
+    def flush(self, key: Hashable):
+        """Hand key's buffered items to the handler now"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._buffers.pop(key, None)
+        self._started.pop(key, None)
+        if not items:
+            return
+        task = asyncio.create_task(self.handler(key, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        """Drop buffered items and cancel running handlers"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._buffers.clear()
+        self._started.clear()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
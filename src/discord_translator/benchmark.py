@@ -0,0 +1,280 @@
+"""Offline benchmark for the reaction-to-reply pipeline.
+
+Starts a FakeOllamaServer, drives TranslatorBot.on_raw_reaction_add with
+generated reaction streams and prints latency, throughput and backend call
+counts as JSON, so results can be compared between commits:
+
+    python -m discord_translator.benchmark --output before.json
+    python -m discord_translator.benchmark --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from contextlib import asynccontextmanager, redirect_stdout
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+from .logs import configure_logging, shutdown_logging
+from .testing import FakeOllamaServer
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+FLAGS = ('🇫🇷', '🇪🇸', '🇩🇪', '🇮🇹', '🇯🇵', '🇺🇸')
+
+SAMPLE_MESSAGES = (
+    'Good morning everyone, how is it going today?',
+    'Does anyone know when the next update is coming out?',
+    'Bonjour à tous, est-ce que quelqu\'un a testé la nouvelle version ?',
+    '¿Alguien puede revisar mi código por favor?',
+    'Kann jemand bitte meinen Code prüfen?',
+    'Run `make test` before pushing, see https://example.com/docs for details.',
+    'こんにちは、今日はいい天気ですね。',
+    'The build failed again.\n\n```\nError: missing dependency\n```\n\nCan someone take a look?',
+    ' '.join(['This is a long message with several sentences to translate.'] * 12),
+)
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, content: str, guild_id: Optional[int]):
+        self.id = message_id
+        self.content = content
+        self.guild = SimpleNamespace(id=guild_id) if guild_id else None
+        self.replies = []
+        self.reactions = []
+
+    async def reply(self, content, **kwargs):
+        self.replies.append(content)
+        return SimpleNamespace(edit=self._edit)
+
+    async def _edit(self, **kwargs):
+        pass
+
+    async def add_reaction(self, emoji):
+        self.reactions.append(emoji)
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild_id: Optional[int], messages: Dict[int, FakeMessage],
+                 rest_latency: float):
+        self.id = channel_id
+        self.guild = SimpleNamespace(id=guild_id, name=f'Guild {guild_id}')
+        self._messages = messages
+        self._rest_latency = rest_latency
+        self.fetches = 0
+
+    async def fetch_message(self, message_id):
+        self.fetches += 1
+        await asyncio.sleep(self._rest_latency)
+        return self._messages[message_id]
+
+    @asynccontextmanager
+    async def typing(self):
+        yield
+
+
+def generate_events(scenario: str, requests: int, rng: random.Random) -> List[dict]:
+    """
+    Build a reaction stream for a scenario
+
+    Returns:
+        List[dict]: Events with the send offset in seconds, guild, channel, message and flag
+    """
+    events = []
+    if scenario == 'burst':
+        # Every reaction arrives at once, spread over a handful of popular messages
+        for i in range(requests):
+            events.append({'at': 0.0, 'guild_id': 1 + i % 5, 'message_id': 1000 + i % 50,
+                           'text': SAMPLE_MESSAGES[i % 3], 'flag': rng.choice(FLAGS)})
+    elif scenario == 'steady':
+        # Evenly spaced reactions on distinct messages
+        for i in range(requests):
+            events.append({'at': i * 0.01, 'guild_id': 1 + i % 3, 'message_id': 2000 + i,
+                           'text': f'{rng.choice(SAMPLE_MESSAGES[:2])} ({i})', 'flag': rng.choice(FLAGS)})
+    elif scenario == 'mixed':
+        # Mixed languages, code, long messages and repeated texts at random arrival times
+        for i in range(requests):
+            events.append({'at': rng.uniform(0, requests * 0.005), 'guild_id': rng.randint(1, 8),
+                           'message_id': 3000 + rng.randint(0, requests // 2),
+                           'text': None, 'flag': rng.choice(FLAGS)})
+        texts = {}
+        for event in events:
+            event['text'] = texts.setdefault(event['message_id'], rng.choice(SAMPLE_MESSAGES))
+        events.sort(key=lambda event: event['at'])
+    else:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    return events
+
+
+def summarize_latencies(latencies: List[float]) -> dict:
+    """Return percentile and histogram statistics for latencies given in seconds"""
+    if not latencies:
+        return {'count': 0}
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+
+    histogram = {}
+    for bound in HISTOGRAM_BUCKETS_MS:
+        label = 'inf' if bound == float('inf') else str(bound)
+        histogram[label] = sum(1 for latency in ordered if latency * 1000 <= bound) - sum(histogram.values())
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'p50_ms': percentile(50),
+        'p90_ms': percentile(90),
+        'p99_ms': percentile(99),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'histogram_ms': histogram,
+    }
+
+
+async def run_scenario(scenario: str, args, env: Dict[str, str]) -> dict:
+    """Run one scenario against a fresh bot and fake backend and return its results"""
+    from .bot import TranslatorBot
+
+    rng = random.Random(args.seed)
+    events = generate_events(scenario, args.requests, rng)
+
+    server = await FakeOllamaServer(latency=args.latency, token_rate=args.token_rate,
+                                    failure_rate=args.failure_rate, seed=args.seed).start()
+    with patch.dict(os.environ, {**env, 'OLLAMA_URL': server.url}):
+        bot = TranslatorBot()
+    bot._connection.user = SimpleNamespace(id=0)
+
+    messages = {}
+    channels = {}
+    for event in events:
+        if event['message_id'] not in messages:
+            messages[event['message_id']] = FakeMessage(event['message_id'], event['text'], event['guild_id'])
+        channel_id = event['guild_id'] * 100
+        if channel_id not in channels:
+            channels[channel_id] = FakeChannel(channel_id, event['guild_id'], messages, args.rest_latency)
+        event['channel_id'] = channel_id
+
+    async def fetch_channel(channel_id):
+        await asyncio.sleep(args.rest_latency)
+        return channels[channel_id]
+
+    async def fetch_user(user_id):
+        await asyncio.sleep(args.rest_latency)
+        return SimpleNamespace(id=user_id, name=f'user{user_id}')
+
+    bot.fetch_channel = fetch_channel
+    bot.fetch_user = fetch_user
+    await bot.setup_hook()
+
+    latencies = []
+
+    async def react(index, event):
+        await asyncio.sleep(event['at'])
+        payload = SimpleNamespace(
+            emoji=event['flag'], user_id=10_000 + index, guild_id=event['guild_id'],
+            channel_id=event['channel_id'], message_id=event['message_id'], member=None,
+        )
+        started = time.perf_counter()
+        await bot.on_raw_reaction_add(payload)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(react(index, event) for index, event in enumerate(events)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await bot.close()
+        await server.close()
+
+    replies = sum(len(message.replies) for message in messages.values())
+    reactions = [emoji for message in messages.values() for emoji in message.reactions]
+    return {
+        'reactions': len(events),
+        'replies': replies,
+        'failed': reactions.count('❌'),
+        'shed': reactions.count('⏳'),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(events) / elapsed, 3) if elapsed else None,
+        'replies_per_s': round(replies / elapsed, 3) if elapsed else None,
+        'backend_calls': server.calls,
+        'backend_failures': server.failures,
+        'message_fetches': sum(channel.fetches for channel in channels.values()),
+        'latency': summarize_latencies(latencies),
+    }
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Return the change in headline numbers for scenarios present in both result files"""
+    keys = ('p50_ms', 'p99_ms', 'mean_ms')
+    deltas = {}
+    for scenario, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        if not previous:
+            continue
+        delta = {key: round(result['latency'].get(key, 0) - previous['latency'].get(key, 0), 3) for key in keys}
+        delta['throughput_rps'] = round((result['throughput_rps'] or 0) - (previous['throughput_rps'] or 0), 3)
+        delta['backend_calls'] = result['backend_calls'] - previous['backend_calls']
+        deltas[scenario] = delta
+    return deltas
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', choices=('burst', 'steady', 'mixed', 'all'), default='all')
+    parser.add_argument('--requests', type=int, default=200, help='reactions per scenario')
+    parser.add_argument('--latency', type=float, default=0.05, help='fake backend seconds before the first token')
+    parser.add_argument('--token-rate', type=float, default=200.0, help='fake backend tokens per second')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='fraction of backend calls that fail')
+    parser.add_argument('--rest-latency', type=float, default=0.01, help='seconds per simulated Discord REST call')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help='bot setting to override, may be repeated')
+    parser.add_argument('--log-level', default='WARNING', help='log level for the bot while benchmarking')
+    parser.add_argument('--output', help='write results to this file instead of stdout')
+    parser.add_argument('--baseline', help='results file from an earlier run to compare against')
+    return parser.parse_args(argv)
+
+
+async def run(args) -> dict:
+    env = {
+        'AUTHORIZED_GUILDS': '', 'OLLAMA_PROBE_INTERVAL': '0', 'OLLAMA_WARMUP': 'false', 'TRANSLATION_STORE_PATH': '',
+    }
+    env.update(item.split('=', 1) for item in args.env)
+    scenarios = ('burst', 'steady', 'mixed') if args.scenario == 'all' else (args.scenario,)
+
+    results = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline', 'log_level')},
+        'scenarios': {},
+    }
+    for scenario in scenarios:
+        results['scenarios'][scenario] = await run_scenario(scenario, args, env)
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Logs are written to stderr by a background thread, keeping stdout for the JSON results
+    configure_logging(level=args.log_level.upper())
+    try:
+        with redirect_stdout(sys.stderr):
+            results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            results['comparison'] = compare(results, json.load(f))
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
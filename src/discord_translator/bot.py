@@ -1,13 +1,36 @@
+import asyncio
+import json
+import multiprocessing
 import os
+import re
+import aiohttp
 import discord
 import logging
 import time
 from discord.ext import commands
 from dotenv import load_dotenv
-from discord_translator import translate_text
+from discord_translator import translate_batch, translate_text, translate_text_multi
+from discord_translator.batching import DebouncedBatcher, WindowBatcher
+from discord_translator.cache import LRUCache, TranslationCache, make_cache_key
+from discord_translator.config import Config
+from discord_translator.cooldown import CooldownCache
+from discord_translator.language import detect_language
+from discord_translator.logs import Preview, configure_logging_from_env, payload_logger
+from discord_translator.markup import has_translatable_text
+from discord_translator.memory import TranslationMemory
+from discord_translator.metrics import MetricsServer, registry
+from discord_translator.pool import BackendPool
+from discord_translator.ratelimit import RateLimiter
+from discord_translator.replies import DISCORD_MESSAGE_LIMIT, ConsolidatedReply
+from discord_translator.scheduler import QueueFullError, TranslationScheduler
+from discord_translator.segmenter import split_segments
+from discord_translator.shared_cache import cache_backend_from_env
+from discord_translator.singleflight import SingleFlight
+from discord_translator.store import TranslationStore
+from discord_translator.subscriptions import SubscriptionRegistry
+from discord_translator.tracing import tracer
+from discord_translator.translation import SYSTEM_PROMPT, precompile_prompts, stream_translation
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Dictionary to map flag emoji to language codes
@@ -39,18 +62,152 @@ FLAG_TO_LANGUAGE = {
     '🇲🇹': 'english',  # Malta
 }
 
+# Seconds during which repeat reactions for the same message and language are ignored
+COOLDOWN_SECONDS = 30
 
-class TranslatorBot(commands.Bot):
-    def __init__(self):
+# End of the first sentence in a streamed translation
+SENTENCE_END = re.compile(r'[.!?…](\s|$)|[。！？]|\n')
+
+
+def _parse_shard_ids(value):
+    """Parse a comma-separated SHARD_IDS value, None when unset"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    return [int(shard_id.strip()) for shard_id in value.split(',') if shard_id.strip()]
+
+
+def _parse_languages(targets):
+    """Resolve flag emoji and language names to languages, returning them and any unrecognised targets"""
+    known = set(FLAG_TO_LANGUAGE.values())
+    languages, unknown = [], []
+    for target in targets:
+        language = FLAG_TO_LANGUAGE.get(target) or (target.lower() if target.lower() in known else None)
+        if language is None:
+            unknown.append(target)
+        elif language not in languages:
+            languages.append(language)
+    return languages, unknown
+
+
+class TranslatorBot(commands.AutoShardedBot):
+    def __init__(self, shard_ids=None, shard_count=None, process_index=0, config=None):
+        """
+        Args:
+            shard_ids: Shards this process runs, defaults to SHARD_IDS or all shards
+            shard_count: Total shards across all processes, defaults to SHARD_COUNT or Discord's recommendation
+            process_index: Position of this process among the shard processes, added to METRICS_PORT
+            config: Ollama settings resolved by run_bot, read from the environment when omitted
+        """
         # Bot configuration
         intents = discord.Intents.default()
         intents.message_content = True
         intents.reactions = True
-        super().__init__(command_prefix='!', intents=intents)
+        if shard_ids is None:
+            shard_ids = _parse_shard_ids(os.getenv('SHARD_IDS'))
+        if shard_count is None and os.getenv('SHARD_COUNT', '').strip():
+            shard_count = int(os.getenv('SHARD_COUNT'))
+        super().__init__(command_prefix='!', intents=intents, shard_ids=shard_ids, shard_count=shard_count)
+        self.config = config or Config.from_env()
         self.authorized_guilds = self._get_authorized_guilds()
 
         #  dictionary to track translations
-        self.translation_cache = {} # Format: {(message_id, language): timestamp}
+        self.translation_cache = CooldownCache(
+            ttl=3600,  # Remove entries older than 1 hour
+            max_entries=int(os.getenv('COOLDOWN_CACHE_MAX_ENTRIES', '100000')),
+        )  # Format: {(message_id, language): timestamp}
+        self._cache_sweeper = None
+
+        # Identify the source language locally to skip translations into the same language
+        self.detect_languages = os.getenv('LANGUAGE_DETECTION', 'true').strip().lower() in ('1', 'true', 'yes')
+
+        # Recently fetched messages, so repeat reactions skip the REST fetch
+        self.message_cache = LRUCache(int(os.getenv('MESSAGE_CACHE_SIZE', '1000')))
+
+        # Translated text keyed by a hash of the source text, language and model
+        self.ollama_model = self.config.ollama_model
+        self.result_cache = TranslationCache(
+            max_bytes=int(os.getenv('TRANSLATION_CACHE_MAX_BYTES', str(8 * 1024 * 1024))),
+            ttl=float(os.getenv('TRANSLATION_CACHE_TTL', str(24 * 3600))),
+        )
+
+        # Translations of near-identical short texts, reused when the exact text was never translated
+        memory_size = int(os.getenv('TRANSLATION_MEMORY_SIZE', '5000'))
+        self.translation_memory = TranslationMemory(
+            threshold=float(os.getenv('TRANSLATION_MEMORY_THRESHOLD', '0.85')), max_entries=memory_size,
+        ) if memory_size > 0 else None
+
+        # Token-bucket limits per user, channel and guild, checked before any REST or model call
+        self.rate_limiter = RateLimiter.from_env()
+        self.rate_limit_notified = LRUCache(1000)  # Messages already marked as rate limited
+
+        # In-flight work keyed by (message_id, language) and by result cache key
+        self.reply_flights = SingleFlight()
+        self.translation_flights = SingleFlight()
+        # Reactions waiting on a translation, so removing the last one cancels it
+        self.requesters = {}  # Format: {(message_id, language): {(user_id, emoji), ...}}
+
+        # Bounded, guild-fair queue in front of the model
+        self.scheduler = TranslationScheduler(
+            workers=int(os.getenv('TRANSLATION_WORKERS', '2')),
+            max_queue=int(os.getenv('TRANSLATION_QUEUE_SIZE', '100')),
+            max_per_guild=int(os.getenv('TRANSLATION_QUEUE_PER_GUILD', '0')) or None,
+        )
+
+        # Flags added to a message within this many seconds are translated together in one
+        # model call and answered with one consolidated reply; 0 handles each flag on its own
+        self.fanout_window = float(os.getenv('TRANSLATION_FANOUT_WINDOW', '0'))
+        self.fanout = WindowBatcher(self.fanout_window)
+
+        # One reply per source message that later translations are edited into, and the
+        # per-channel queue of reply updates, merged while an earlier update is being sent
+        self.reply_index = LRUCache(int(os.getenv('REPLY_INDEX_SIZE', '1000')))  # {message_id: ConsolidatedReply}
+        self.reply_updates = WindowBatcher(0)
+
+        # Channels whose new messages are translated in the background, debounced per channel
+        # so consecutive short messages share one model call per subscribed language
+        self.subscriptions = SubscriptionRegistry(os.getenv('TRANSLATION_SUBSCRIPTIONS_PATH', '').strip() or None)
+        self.auto_translator = DebouncedBatcher(
+            self._auto_translate_batch,
+            delay=float(os.getenv('AUTO_TRANSLATE_DEBOUNCE', '2.0')),
+            max_delay=float(os.getenv('AUTO_TRANSLATE_MAX_DELAY', '10')),
+            max_items=int(os.getenv('AUTO_TRANSLATE_BATCH_SIZE', '10')),
+        )
+
+        # Messages longer than this are split into segments translated in parallel
+        self.segment_max_chars = int(os.getenv('TRANSLATION_SEGMENT_MAX_CHARS', '400'))
+
+        # Stream translations into a reply that is edited as the model generates
+        self.stream_translations = os.getenv('TRANSLATION_STREAMING', '').strip().lower() in ('1', 'true', 'yes')
+        self.stream_edit_interval = float(os.getenv('TRANSLATION_STREAM_EDIT_INTERVAL', '1.0'))
+
+        # Optional on-disk copy of the result cache that survives restarts
+        store_path = os.getenv('TRANSLATION_STORE_PATH', '').strip()
+        self.translation_store = TranslationStore(store_path) if store_path else None
+
+        # Result and cooldown state shared with bot processes running other shards
+        self.shared_cache = cache_backend_from_env()
+
+        # Pooled keep-alive HTTP clients for every Ollama endpoint, owned until close()
+        self.ollama_client = BackendPool.from_config(self.config)
+        self.model_warm = False  # Whether the startup warm-up loaded the model on some endpoint
+
+        # Stage timings and counters, optionally served to Prometheus over HTTP
+        self.metrics = registry
+        self.metrics.gauge('translator_queue_waiting', lambda: self.scheduler.queued)
+        self.metrics.gauge('translator_queue_active', lambda: self.scheduler.active)
+        self.metrics.gauge('translator_result_cache_bytes', lambda: self.result_cache.current_bytes)
+        self.metrics.gauge('translator_cooldown_entries', lambda: len(self.translation_cache))
+        metrics_port = os.getenv('METRICS_PORT', '').strip()
+        self.metrics_server = MetricsServer(
+            self.metrics, host=os.getenv('METRICS_HOST', '127.0.0.1'), port=int(metrics_port) + process_index
+        ) if metrics_port else None
+
+        # Span trees of individual reactions, sampled and appended to a JSON-lines file
+        self.tracer = tracer
+        self.tracer.configure_from_env()
+        self._trace_flusher = None
+        self._gateway_started = False
 
         # Register commands
         self.add_commands()
@@ -80,6 +237,10 @@ class TranslatorBot(commands.Bot):
                 "• `!version` - Show bot version info\n"
                 "• `!info` - Show this info message\n"
                 "• `!languages` - Show supported languages and their flags\n"
+                "• `!stats` - Show translation counts, cache hit rates and stage timings\n"
+                "• `!subscribe <flags or languages>` - Translate new messages in this channel automatically\n"
+                "• `!unsubscribe [flags or languages]` - Stop translating this channel, or only some languages\n"
+                "• `!subscriptions` - Show the languages this channel is translated into\n"
             )
             await ctx.send(help_text)
 
@@ -100,139 +261,907 @@ class TranslatorBot(commands.Bot):
 
             await ctx.send(response)
 
+        @self.command(name='stats')
+        async def stats(ctx):
+            """Show translation counts, cache hit rates and stage timings"""
+            await ctx.send(self._format_stats())
+
+        @self.command(name='subscribe')
+        @commands.guild_only()
+        @commands.has_permissions(manage_channels=True)
+        async def subscribe(ctx, *targets):
+            """Translate new messages in this channel into the given languages"""
+            languages, unknown = _parse_languages(targets)
+            if unknown or not languages:
+                await ctx.send(f"Unknown language: {', '.join(unknown)}. See `!languages`." if unknown
+                               else "Usage: `!subscribe <flags or languages>`, e.g. `!subscribe 🇫🇷 german`")
+                return
+            subscribed = self.subscriptions.add(ctx.channel.id, languages)
+            await self.subscriptions.save()
+            await ctx.send(f"New messages in this channel will be translated to {', '.join(subscribed)}")
+
+        @self.command(name='unsubscribe')
+        @commands.guild_only()
+        @commands.has_permissions(manage_channels=True)
+        async def unsubscribe(ctx, *targets):
+            """Stop translating this channel, or only the given languages"""
+            languages, unknown = _parse_languages(targets)
+            if unknown:
+                await ctx.send(f"Unknown language: {', '.join(unknown)}. See `!languages`.")
+                return
+            remaining = self.subscriptions.remove(ctx.channel.id, languages or None)
+            await self.subscriptions.save()
+            if remaining:
+                await ctx.send(f"New messages in this channel will be translated to {', '.join(remaining)}")
+            else:
+                await ctx.send("New messages in this channel will no longer be translated")
+
+        @self.command(name='subscriptions')
+        async def subscriptions(ctx):
+            """Show the languages this channel is translated into"""
+            languages = self.subscriptions.get(ctx.channel.id)
+            if languages:
+                await ctx.send(f"This channel is translated to {', '.join(languages)}")
+            else:
+                await ctx.send("This channel has no translation subscriptions")
+
+    def _format_stats(self):
+        """Summarise the metrics registry for the !stats command"""
+        metrics = self.metrics
+        lines = ["**Translation Stats**"]
+
+        outcomes = ('translated', 'failed', 'shed', 'cooldown', 'rate_limited', 'same_language')
+        lines.append("• Reactions: " + ", ".join(
+            f"{outcome.replace('_', ' ')} {int(metrics.value('translator_reactions_total', outcome=outcome))}"
+            for outcome in outcomes
+        ))
+
+        for cache in ('message', 'result', 'store', 'memory'):
+            hits = metrics.value('translator_cache_requests_total', cache=cache, result='hit')
+            misses = metrics.value('translator_cache_requests_total', cache=cache, result='miss')
+            if hits or misses:
+                lookups = int(hits + misses)
+                lines.append(f"• {cache.title()} cache: {hits / lookups:.0%} hit rate ({lookups} lookups)")
+
+        errors = sum(metrics.value('translator_backend_errors_total', error=error)
+                     for error in ('timeout', 'http', 'invalid_json', 'other'))
+        lines.append(f"• Backend errors: {int(errors)}")
+        lines.append(f"• Queue: {self.scheduler.queued} waiting, {self.scheduler.active} running")
+
+        stages = metrics.series('translator_stage_seconds')
+        if stages:
+            lines.append("**Stage timings** (mean / p95)")
+            for key, histogram in sorted(stages.items()):
+                stage = dict(key).get('stage', '?')
+                mean = histogram.sum / histogram.count * 1000
+                p95 = histogram.quantile(0.95) * 1000
+                lines.append(f"• {stage}: {mean:.0f} ms / {p95:.0f} ms ({histogram.count})")
+        return "\n".join(lines)
+
     def _get_authorized_guilds(self):
-        """Get list of authorized guild IDs from environment variables.
+        """Get set of authorized guild IDs from environment variables.
         Returns:
             - None if all guilds are allowed (empty env var)
-            - List of authorized guild IDs if specific guilds are set
+            - Set of authorized guild IDs if specific guilds are set
         """
         guild_ids = os.getenv('AUTHORIZED_GUILDS', '').strip()
         if not guild_ids:
             return None  # Allow all guilds
-        return [int(guild_id.strip()) for guild_id in guild_ids.split(',') if guild_id.strip()]
+        return {int(guild_id.strip()) for guild_id in guild_ids.split(',') if guild_id.strip()}
+
+    async def setup_hook(self):
+        precompile_prompts(set(FLAG_TO_LANGUAGE.values()))
+        await self.ollama_client.start()
+        if self.config.warmup:
+            await self._warm_up_model()
+        if self.shared_cache:
+            await self.shared_cache.open()
+        self.scheduler.start()
+        self._cache_sweeper = asyncio.create_task(self._sweep_translation_cache())
+        if self.tracer.enabled:
+            self._trace_flusher = asyncio.create_task(self._flush_traces())
+        self.subscriptions.load()
+        if self.translation_store:
+            await self.translation_store.open()
+            await self._warm_result_cache(int(os.getenv('TRANSLATION_STORE_WARM_ROWS', '1000')))
+        if self.metrics_server:
+            await self.metrics_server.start()
+            logger.info("Serving metrics on http://%s:%s/metrics", self.metrics_server.host,
+                        self.metrics_server.port)
+
+    async def connect(self, *, reconnect=True):
+        self._gateway_started = True
+        await super().connect(reconnect=reconnect)
+
+    async def close(self):
+        if self._gateway_started:
+            await super().close()
+        else:
+            # AutoShardedClient.close() relies on state that only connect() sets up, so a bot
+            # that never connected (failed login, benchmarks) only has its HTTP session to close
+            await self.http.close()
+        if self._cache_sweeper:
+            self._cache_sweeper.cancel()
+        if self._trace_flusher:
+            self._trace_flusher.cancel()
+            await self.tracer.flush()
+        await self.fanout.close()
+        await self.reply_updates.close()
+        await self.auto_translator.close()
+        await self.scheduler.close()
+        await self.ollama_client.close()
+        if self.translation_store:
+            await self.translation_store.close()
+        if self.metrics_server:
+            await self.metrics_server.close()
+        if self.shared_cache:
+            await self.shared_cache.close()
+
+    async def _warm_up_model(self):
+        """Load the model on every endpoint before going online, so no translation pays the cold start"""
+        results = await self.ollama_client.warm_up(SYSTEM_PROMPT)
+        for url, result in results.items():
+            if isinstance(result, BaseException):
+                logger.warning("Warm-up of %s on %s failed: %r", self.ollama_model, url, result)
+                continue
+            load_seconds, generate_seconds = result
+            logger.info("Cold start of %s on %s: loaded in %.2fs, first generation in %.2fs",
+                        self.ollama_model, url, load_seconds, generate_seconds)
+            self.model_warm = True
+
+    async def _warm_result_cache(self, limit):
+        """Preload the most recent stored translations into the result cache"""
+        rows = await self.translation_store.recent(limit)
+        # Oldest first so the most recent rows end up most recently used
+        for key, translation in reversed(rows):
+            self.result_cache.put(key, translation)
+        logger.info("Warmed result cache with %s stored translations", len(rows))
 
     async def on_ready(self):
-        logger.info(f'{self.user} has connected to Discord!')
-        logger.info(f'Bot is in {len(self.guilds)} guilds:')
+        logger.info("%s has connected to Discord!", self.user)
+        if self.model_warm:
+            logger.info("Healthy: %s is loaded and ready to translate", self.ollama_model)
+        elif self.config.warmup:
+            logger.warning("Degraded: %s could not be warmed up, the first translation may be slow",
+                           self.ollama_model)
+        if self.shard_ids is not None:
+            logger.info("Running shards %s of %s", self.shard_ids, self.shard_count)
+        logger.info("Bot is in %s guilds:", len(self.guilds))
         for guild in self.guilds:
             if self.authorized_guilds is None:
                 status = "AUTHORIZED (all guilds allowed)"
             else:
                 status = "AUTHORIZED" if guild.id in self.authorized_guilds else "UNAUTHORIZED"
-            logger.info(f'- {guild.name} (ID: {guild.id}) - {status}')
+            logger.info("- %s (ID: %s) - %s", guild.name, guild.id, status)
+
+    async def on_message(self, message):
+        await self.process_commands(message)
+
+        # Queue new messages in subscribed channels for background translation
+        if message.author.bot or message.guild is None or message.channel.id not in self.subscriptions:
+            return
+        if self.authorized_guilds and message.guild.id not in self.authorized_guilds:
+            return
+        if message.content.startswith(self.command_prefix) or not has_translatable_text(message.content):
+            return
+        self.message_cache.put(message.id, message)
+        self.auto_translator.add(message.channel.id, message)
 
     async def on_raw_reaction_add(self, payload):
+        with self.tracer.trace('reaction', message_id=payload.message_id, channel_id=payload.channel_id,
+                               guild_id=payload.guild_id):
+            await self._handle_reaction(payload)
+
+    async def _handle_reaction(self, payload):
         try:
             # Ignore bot's own reactions
             if payload.user_id == self.user.id:
                 return
 
-            # Get the channel
-            channel = await self.fetch_channel(payload.channel_id)
-            if not channel:
-                logger.warning(f"Could not fetch channel {payload.channel_id}")
+            # Check if the reaction is a flag emoji before doing any API work
+            with self.tracer.span('emoji_filter'):
+                emoji = str(payload.emoji)
+                target_language = FLAG_TO_LANGUAGE.get(emoji)
+            if target_language is None:
+                logger.debug("Ignoring non-flag emoji reaction: %s", emoji)
                 return
+            self.tracer.current().set(language=target_language)
 
             # Check if this is from an authorized guild
-            if not isinstance(channel, discord.DMChannel):  # Skip check for DMs
-                if self.authorized_guilds:  # Only check if we have a list of authorized guilds
-                    if channel.guild.id not in self.authorized_guilds:
-                        logger.warning(
-                            f"Rejecting request from unauthorized guild: {channel.guild.name} (ID: {channel.guild.id})")
-                        return
-                    logger.info(
-                        f"Processing request from authorized guild: {channel.guild.name} (ID: {channel.guild.id})")
-                else:
-                    logger.info(
-                        f"Processing request from guild (all guilds allowed): {channel.guild.name} (ID: {channel.guild.id})")
+            with self.tracer.span('guild_check'):
+                if payload.guild_id is not None:  # Skip check for DMs
+                    if self.authorized_guilds:  # Only check if we have a list of authorized guilds
+                        if payload.guild_id not in self.authorized_guilds:
+                            logger.warning("Rejecting request from unauthorized guild (ID: %s)", payload.guild_id)
+                            return
+                        logger.debug("Processing request from authorized guild (ID: %s)", payload.guild_id)
+                    else:
+                        logger.debug("Processing request from guild (all guilds allowed) (ID: %s)",
+                                     payload.guild_id)
+
+            started = time.perf_counter()
+            cache_key = (payload.message_id, target_language)
+            current_time = time.time()
+
+            # If we have a cached translation and it's less than 30 seconds old, ignore
+            last_translation_time = await self._get_cooldown(cache_key)
+            if last_translation_time is not None:
+                if current_time - last_translation_time < COOLDOWN_SECONDS:
+                    logger.debug("Ignoring duplicate translation request for message %s", payload.message_id)
+                    self.metrics.inc('translator_cooldown_drops_total')
+                    self.metrics.inc('translator_reactions_total', outcome='cooldown')
+                    return
+
+            # Refuse requests over the user, channel or guild allowance with a reaction, no fetches
+            limited_scope = self.rate_limiter.check(
+                user=payload.user_id, channel=payload.channel_id, guild=payload.guild_id
+            )
+            if limited_scope:
+                logger.info("Rate limited translation request from user %s (%s limit)", payload.user_id, limited_scope)
+                self.metrics.inc('translator_rate_limited_total', scope=limited_scope)
+                self.metrics.inc('translator_reactions_total', outcome='rate_limited')
+                await self._mark_rate_limited(payload)
+                return
+
+            # Track the reaction until its translation is done, so removing it can cancel the work
+            requester = (payload.user_id, emoji)
+            self.requesters.setdefault(cache_key, set()).add(requester)
+            try:
+                await self._handle_translation_request(payload, target_language, cache_key)
+            finally:
+                requesters = self.requesters.get(cache_key)
+                if requesters is not None:
+                    requesters.discard(requester)
+                    if not requesters:
+                        del self.requesters[cache_key]
+            self.metrics.observe('translator_stage_seconds', time.perf_counter() - started, stage='total')
+
+        except discord.errors.Forbidden as e:
+            logger.error("Missing permissions in channel %s", payload.channel_id)
+            self.tracer.current().set(error=repr(e))
+        except discord.errors.NotFound as e:
+            logger.error("Message or channel %s not found", payload.channel_id)
+            self.tracer.current().set(error=repr(e))
+        except Exception as e:
+            logger.error("Error handling reaction: %s", e, exc_info=True)  # Added exc_info for full traceback
+            self.tracer.current().set(error=repr(e))
+
+    async def _handle_translation_request(self, payload, target_language, cache_key):
+        """Fetch the reacted message and translate it, unless the reaction is withdrawn first"""
+        try:
+            # Get the channel, from the gateway cache when possible
+            channel = self.get_channel(payload.channel_id)
+            if channel is None:
+                with self.metrics.time('translator_stage_seconds', stage='fetch_channel'), \
+                        self.tracer.span('fetch_channel'):
+                    channel = await self.fetch_channel(payload.channel_id)
+            if not channel:
+                logger.warning("Could not fetch channel %s", payload.channel_id)
+                return
 
             # Get the message
-            message = await channel.fetch_message(payload.message_id)
+            message = await self._get_message(channel, payload.message_id)
             if not message or not message.content:
-                logger.warning(f"Could not fetch message {payload.message_id} or message was empty")
+                logger.warning("Could not fetch message %s or message was empty", payload.message_id)
                 return
 
-            # Check if the reaction is a flag emoji
-            emoji = str(payload.emoji)
-            if emoji not in FLAG_TO_LANGUAGE:
-                logger.debug(f"Ignoring non-flag emoji reaction: {emoji}")
+            # Skip messages with nothing to translate or already in the target language
+            if not has_translatable_text(message.content):
+                logger.debug("Ignoring message %s with no translatable text", payload.message_id)
+                return
+            if self.detect_languages and detect_language(message.content) == target_language:
+                logger.info("Message %s is already in %s, skipping translation", payload.message_id, target_language)
+                self.metrics.inc('translator_reactions_total', outcome='same_language')
                 return
 
-            target_language = FLAG_TO_LANGUAGE[emoji]
+            user = payload.member or self.get_user(payload.user_id)
+            if user is None:
+                with self.metrics.time('translator_stage_seconds', stage='fetch_user'), \
+                        self.tracer.span('fetch_user'):
+                    user = await self.fetch_user(payload.user_id)
+            logger.info("Translation requested by %s (ID: %s) to %s", user.name, user.id, target_language)
+            payload_logger.info("Original text of message %s: %s", message.id, Preview(message.content))
 
-            user = await self.fetch_user(payload.user_id)
-            logger.info(f"Translation requested by {user.name} (ID: {user.id}) to {target_language}")
-            logger.info(f"Original text: {message.content}")
+            if cache_key not in self.requesters:
+                logger.info("Translation of message %s to %s was withdrawn before it started", message.id,
+                            target_language)
+                self.metrics.inc('translator_reactions_total', outcome='cancelled')
+                return
 
-            cache_key = (payload.message_id, target_language)
-            current_time = time.time()
+            if self.fanout_window > 0:
+                # Flags added to the message within the window share one model call and reply
+                await self.fanout.submit(
+                    message.id, target_language,
+                    lambda languages: self._translate_and_reply_batch(channel, message, languages, payload.guild_id)
+                )
+            else:
+                # Concurrent reactions for the same message and language share one translation and reply
+                _, shared = await self.reply_flights.do(
+                    cache_key,
+                    lambda: self._translate_and_reply(channel, message, target_language, cache_key, payload.guild_id)
+                )
+                if shared:
+                    logger.debug("Joined in-flight translation for message %s to %s", payload.message_id,
+                                 target_language)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise  # The handler itself is being stopped, e.g. on shutdown
+            logger.info("Cancelled translation of message %s to %s", payload.message_id, target_language)
+            self.metrics.inc('translator_reactions_total', outcome='cancelled')
 
-            # If we have a cached translation and it's less than 30 seconds old, ignore
-            if cache_key in self.translation_cache:
-                last_translation_time = self.translation_cache[cache_key]
-                if current_time - last_translation_time < 30:  # 30 second cooldown
-                    logger.debug(f"Ignoring duplicate translation request for message {payload.message_id}")
-                    return
+    async def _mark_rate_limited(self, payload):
+        """React to a rate limited message once, through a partial message that needs no fetch"""
+        if self.rate_limit_notified.get(payload.message_id):
+            return
+        self.rate_limit_notified.put(payload.message_id, True)
+        channel = self.get_partial_messageable(payload.channel_id, guild_id=payload.guild_id)
+        await channel.get_partial_message(payload.message_id).add_reaction('🐢')
 
-            # Add typing indicator
-            async with channel.typing():
-                translated_text = await translate_text(message.content, target_language)
+    async def _get_message(self, channel, message_id):
+        """Return a message from the recently fetched cache, fetching it over REST on a miss"""
+        message = self.message_cache.get(message_id)
+        self._count_lookup('message', message)
+        if message is None:
+            with self.metrics.time('translator_stage_seconds', stage='fetch_message'), \
+                    self.tracer.span('fetch_message'):
+                message = await channel.fetch_message(message_id)
+            if message:
+                self.message_cache.put(message_id, message)
+        return message
 
-                if translated_text:
-                    logger.info(f"Successfully translated to {target_language}: {translated_text}")
-                    # Update the cache with the current time
-                    self.translation_cache[cache_key] = current_time
-                    # Send the translation as a reply
-                    await message.reply(
-                        f"Translation ({target_language}):\n{translated_text}",
-                        mention_author=False  # Avoid notification spam
-                    )
+    async def on_raw_message_edit(self, payload):
+        # Drop the cached copy so the next translation sees the edited content
+        self.message_cache.pop(payload.message_id)
+
+    async def on_raw_reaction_remove(self, payload):
+        # Cancel a translation once every reaction that asked for it has been removed
+        target_language = FLAG_TO_LANGUAGE.get(str(payload.emoji))
+        if target_language is None:
+            return
+        cache_key = (payload.message_id, target_language)
+        requesters = self.requesters.get(cache_key)
+        if not requesters:
+            return
+        requesters.discard((payload.user_id, str(payload.emoji)))
+        if not requesters:
+            del self.requesters[cache_key]
+            self._cancel_translation(cache_key)
+
+    async def on_raw_message_delete(self, payload):
+        self.message_cache.pop(payload.message_id)
+        self.reply_index.pop(payload.message_id)
+        # Nothing can be replied to a deleted message, so stop all work for it
+        for cache_key in [key for key in self.requesters if key[0] == payload.message_id]:
+            del self.requesters[cache_key]
+        for cache_key in [key for key in self.reply_flights if key[0] == payload.message_id]:
+            self._cancel_translation(cache_key)
+        if self.fanout.cancel(payload.message_id):
+            logger.info("Cancelled translations of deleted message %s", payload.message_id)
+        if self.auto_translator.discard(payload.channel_id, lambda message: message.id == payload.message_id):
+            logger.debug("Dropped deleted message %s from the auto-translate queue", payload.message_id)
+
+    def _cancel_translation(self, cache_key):
+        """Cancel the queued or running translation of a message into one language"""
+        message_id, target_language = cache_key
+        if self.reply_flights.cancel(cache_key) or self.fanout.discard(message_id, target_language):
+            logger.info("Cancelling translation of message %s to %s", message_id, target_language)
+
+    async def _translate_and_reply(self, channel, message, target_language, cache_key, guild_id=None):
+        """Translate a message and reply with the result, or flag the failure"""
+        # Add typing indicator
+        async with channel.typing():
+            try:
+                if self.stream_translations and message.id not in self.reply_index:
+                    # Only the first reply to a message is streamed; later languages are edited into it
+                    translated_text, _ = await self._stream_translate(message, target_language, guild_id)
                 else:
-                    logger.error(f"Translation failed for text: '{message.content}' to {target_language}")
-                    await message.add_reaction('❌')  # Indicate translation failure
+                    translated_text = await self._translate(message.content, target_language, guild_id)
+            except QueueFullError:
+                logger.warning("Translation queue full, shedding request for message %s", message.id)
+                self.metrics.inc('translator_reactions_total', outcome='shed')
+                await message.add_reaction('⏳')  # Indicate the bot is too busy right now
+                return
+
+            if translated_text:
+                logger.info("Successfully translated message %s to %s", message.id, target_language)
+                payload_logger.info("Translation (%s) of message %s: %s", target_language, message.id,
+                                    Preview(translated_text))
+                self.metrics.inc('translator_reactions_total', outcome='translated')
+                # Update the cache with the current time
+                await self._set_cooldown(cache_key, time.time())
+                # Add the translation to the message's reply, or finish the reply it was streamed into
+                await self._add_to_reply(channel.id, message, [(target_language, translated_text)])
+            else:
+                logger.error("Translation failed for text: '%s' to %s", Preview(message.content), target_language)
+                self.metrics.inc('translator_reactions_total', outcome='failed')
+                await message.add_reaction('❌')  # Indicate translation failure
+
+    async def _translate_and_reply_batch(self, channel, message, target_languages, guild_id=None):
+        """Translate a message into every language requested during the fan-out window.
+
+        All languages of a message share one consolidated reply: the first batch
+        posts it and later batches edit it to add their languages. Batches for one
+        message run one at a time, so a flag arriving while a translation is in
+        progress waits for it and is skipped if that batch already covered it.
+        """
+        state = self.reply_index.get(message.id) or ConsolidatedReply()
+        target_languages = [language for language in target_languages if language not in state.translations]
+        if not target_languages:
+            return
+
+        async with channel.typing():
+            try:
+                results = await self._translate_many(message.content, target_languages, guild_id)
+            except QueueFullError:
+                logger.warning("Translation queue full, shedding request for message %s", message.id)
+                self.metrics.inc('translator_reactions_total', value=len(target_languages), outcome='shed')
+                await message.add_reaction('⏳')  # Indicate the bot is too busy right now
+                return
+
+            translated = [(language, results[language]) for language in target_languages if results.get(language)]
+            failed = len(target_languages) - len(translated)
+            if translated:
+                languages = ', '.join(language for language, _ in translated)
+                logger.info("Successfully translated message %s to %s", message.id, languages)
+                self.metrics.inc('translator_reactions_total', value=len(translated), outcome='translated')
+                now = time.time()
+                for language, _ in translated:
+                    await self._set_cooldown((message.id, language), now)
+                await self._add_to_reply(channel.id, message, translated)
+            if failed:
+                logger.error("Translation failed for %s of %s languages of message %s",
+                             failed, len(target_languages), message.id)
+                self.metrics.inc('translator_reactions_total', value=failed, outcome='failed')
+                await message.add_reaction('❌')  # Indicate translation failure
 
-                # Cleanup; old; cache; entries; periodically
-                self._cleanup_translation_cache()
+    async def _auto_translate_batch(self, channel_id, messages):
+        """Translate a debounced batch of new messages into every language their channel is subscribed to"""
+        try:
+            guild_id = messages[0].guild.id
+            replies = {message.id: [] for message in messages}  # Format: {message_id: [(language, text)]}
+            detected = [detect_language(message.content) if self.detect_languages else None for message in messages]
+            for language in self.subscriptions.get(channel_id):
+                pending = [message for message, source in zip(messages, detected) if source != language]
+                try:
+                    translations = await self._translate_texts(
+                        [message.content for message in pending], language, guild_id
+                    )
+                except QueueFullError:
+                    logger.warning("Translation queue full, skipping %s translations in channel %s",
+                                   language, channel_id)
+                    self.metrics.inc('translator_auto_translations_total', value=len(pending), outcome='shed')
+                    continue
+                for message, translated_text in zip(pending, translations):
+                    if translated_text:
+                        replies[message.id].append((language, translated_text))
+                    else:
+                        self.metrics.inc('translator_auto_translations_total', outcome='failed')
 
-        except discord.errors.Forbidden:
-            logger.error(f"Missing permissions in channel {payload.channel_id}")
-        except discord.errors.NotFound:
-            logger.error(f"Message or channel {payload.channel_id} not found")
+            now = time.time()
+            updates = []
+            for message in messages:
+                state = self.reply_index.get(message.id) or ConsolidatedReply()
+                translated = [(language, text) for language, text in replies[message.id]
+                              if language not in state.translations]
+                if not translated:
+                    continue
+                self.metrics.inc('translator_auto_translations_total', value=len(translated), outcome='translated')
+                for language, _ in translated:
+                    await self._set_cooldown((message.id, language), now)
+                updates.append(self._add_to_reply(channel_id, message, translated))
+            # Every reply is queued at once, so the channel's updates go out as one batch
+            for result in await asyncio.gather(*updates, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.error("Could not reply with translations in channel %s: %s", channel_id, result)
+            logger.info("Auto-translated %s messages in channel %s", len(messages), channel_id)
         except Exception as e:
-            logger.error(f"Error handling reaction: {str(e)}", exc_info=True)  # Added exc_info for full traceback
+            logger.error("Error auto-translating channel %s: %s", channel_id, e, exc_info=True)
+
+    async def _translate_texts(self, texts, target_language, guild_id=None):
+        """Translate several texts into one language, sharing one model call for short ones not cached"""
+        keys = [make_cache_key(text, target_language, self.ollama_model) for text in texts]
+        results = [await self._get_cached_result(key, text, target_language) for key, text in zip(keys, texts)]
+
+        # Long texts are better served by the segmented path of _translate
+        short = [index for index, text in enumerate(texts)
+                 if results[index] is None and len(text) <= self.segment_max_chars]
+        if len(short) > 1:
+            translations = await self.scheduler.run(guild_id, self._timed_queue(
+                lambda: translate_batch([texts[index] for index in short], target_language, client=self.ollama_client)
+            ))
+            for index, translated_text in zip(short, translations):
+                if translated_text:
+                    results[index] = translated_text
+                    await self._remember_result(keys[index], translated_text, texts[index], target_language)
+
+        # Texts the batched call did not return are translated one by one
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            singles = await asyncio.gather(*(self._translate(texts[index], target_language, guild_id)
+                                             for index in missing))
+            for index, translated_text in zip(missing, singles):
+                results[index] = translated_text
+        return results
+
+    async def _add_to_reply(self, channel_id, message, translations):
+        """
+        Add translations to the message's consolidated reply and wait until it shows them
+
+        Updates are sent one at a time per channel; those queued while an earlier one is
+        being sent are merged, so a burst of translations costs one edit per message.
+        While a translation is streamed into the reply, later ones wait for it to end.
+
+        Raises:
+            discord.errors.HTTPException: If the reply could not be posted or edited
+        """
+        state = self.reply_index.get(message.id) or ConsolidatedReply()
+        if state.streaming is not None:
+            await state.streaming.wait()  # Let a reply being streamed be posted first, then edit into it
+        state.translations.update(translations)
+        self.reply_index.put(message.id, state)
+        with self.metrics.time('translator_stage_seconds', stage='reply'), self.tracer.span('reply'):
+            errors = await self.reply_updates.submit(channel_id, (message, state), self._show_replies)
+        if message.id in errors:
+            raise errors[message.id]
+
+    async def _show_replies(self, updates):
+        """Bring the replies of a channel's queued messages up to date, returning errors by message ID"""
+        errors = {}
+        for message, state in updates:
+            try:
+                await self._show_consolidated_reply(message, state)
+            except discord.errors.HTTPException as e:
+                errors[message.id] = e
+        return errors
+
+    async def _show_consolidated_reply(self, message, state):
+        """Post or edit the reply messages so they show every translation in state"""
+        chunks = state.render()
+        for index, content in enumerate(chunks):
+            if index < len(state.messages):
+                if state.contents[index] == content:
+                    continue
+                try:
+                    await state.messages[index].edit(content=content)
+                    state.contents[index] = content
+                    continue
+                except discord.errors.NotFound:
+                    # The reply was deleted; post this and the following chunks afresh
+                    del state.messages[index:], state.contents[index:]
+            state.messages.append(await message.reply(content, mention_author=False))  # Avoid notification spam
+            state.contents.append(content)
+
+    async def _translate_many(self, text, target_languages, guild_id=None):
+        """Translate text into several languages, sharing one model call for those not cached"""
+        results = {}
+        keys = {language: make_cache_key(text, language, self.ollama_model) for language in target_languages}
+        for language in target_languages:
+            cached = await self._get_cached_result(keys[language], text, language)
+            if cached is not None:
+                results[language] = cached
+        missing = [language for language in target_languages if language not in results]
+
+        # Long messages are better served by the per-language segmented path
+        if len(missing) > 1 and len(text) <= self.segment_max_chars:
+            translations = await self.scheduler.run(guild_id, self._timed_queue(
+                lambda: translate_text_multi(text, missing, client=self.ollama_client)
+            ))
+            for language in missing:
+                if translations.get(language):
+                    results[language] = translations[language]
+                    await self._remember_result(keys[language], translations[language], text, language)
+            missing = [language for language in missing if language not in results]
+
+        # Languages the combined call did not return are translated one by one
+        if missing:
+            singles = await asyncio.gather(*(self._translate(text, language, guild_id) for language in missing))
+            results.update(zip(missing, singles))
+        return results
+
+    async def _stream_translate(self, message, target_language, guild_id=None):
+        """Translate a message with the streaming API, replying once the first sentence is ready.
+
+        The message's consolidated reply is registered before streaming starts, so
+        languages requested meanwhile wait for the stream and are edited into its reply.
+        Edits stop once the translation no longer fits in one Discord message; the rest
+        is added by splitting the reply when the translation is complete.
+
+        Returns:
+            The final translation and the reply it was streamed into, or None if nothing was posted
+        """
+        state = ConsolidatedReply()
+        state.streaming = asyncio.Event()
+        self.reply_index.put(message.id, state)
+        try:
+            return await self._stream_into_reply(message, target_language, state, guild_id)
+        finally:
+            state.streaming.set()
+
+    async def _stream_into_reply(self, message, target_language, state, guild_id=None):
+        """Stream the translation into a new reply, recording a posted reply in state"""
+        key = make_cache_key(message.content, target_language, self.ollama_model)
+        cached = await self._get_cached_result(key, message.content, target_language)
+        if cached is not None:
+            return cached, None
+
+        async def stream():
+            header = f"Translation ({target_language}):\n"
+            reply = None
+            posted = ''
+            last_edit = 0.0
+            translated_text = ''
+            try:
+                async for translated_text in stream_translation(message.content, target_language, self.ollama_client):
+                    if len(header) + len(translated_text) > DISCORD_MESSAGE_LIMIT:
+                        continue  # Too long for one message; _add_to_reply splits it once complete
+                    now = time.monotonic()
+                    if reply is None:
+                        if SENTENCE_END.search(translated_text):
+                            reply = await message.reply(header + translated_text, mention_author=False)
+                            posted, last_edit = translated_text, now
+                    elif now - last_edit >= self.stream_edit_interval:
+                        await reply.edit(content=header + translated_text)
+                        posted, last_edit = translated_text, now
+            except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+                logger.error("Translation stream failed for message %s: %s", message.id, e)
+                await self._delete_partial_reply(message, reply)
+                return None, None, ''
+            except asyncio.CancelledError:
+                await self._delete_partial_reply(message, reply)
+                raise
+
+            if reply is not None and translated_text != posted \
+                    and len(header) + len(translated_text) <= DISCORD_MESSAGE_LIMIT:
+                await reply.edit(content=header + translated_text)
+                posted = translated_text
+            return translated_text or None, reply, header + posted
+
+        translated_text, reply, content = await self.scheduler.run(guild_id, self._timed_queue(stream))
+        if translated_text:
+            await self._remember_result(key, translated_text, message.content, target_language)
+            if reply is not None:
+                state.translations[target_language] = translated_text
+                state.messages.append(reply)
+                state.contents.append(content)
+        return translated_text, reply
+
+    async def _delete_partial_reply(self, message, reply):
+        """Remove a partly streamed translation so it is not mistaken for a complete one"""
+        if reply is None:
+            return
+        try:
+            await reply.delete()
+        except discord.errors.HTTPException as e:
+            logger.warning("Could not delete partial translation of message %s: %s", message.id, e)
+
+    async def _translate(self, text, target_language, guild_id=None):
+        """Translate text, serving repeat translations from the result cache"""
+        key = make_cache_key(text, target_language, self.ollama_model)
+        cached = await self._get_cached_result(key, text, target_language)
+        if cached is not None:
+            logger.debug("Result cache hit for %s translation", target_language)
+            return cached
+
+        # Long messages are translated segment by segment in parallel, each segment cached on its own
+        if len(text) > self.segment_max_chars:
+            segments = split_segments(text, self.segment_max_chars)
+            if sum(segment.translate for segment in segments) > 1:
+                translated_text = await self._translate_segments(segments, target_language, guild_id)
+                if translated_text:
+                    self.result_cache.put(key, translated_text)
+                return translated_text
+
+        # Concurrent requests for the same text share one model call
+        translated_text, _ = await self.translation_flights.do(
+            key, lambda: self._load_translation(text, target_language, key, guild_id)
+        )
+        return translated_text
+
+    async def _translate_segments(self, segments, target_language, guild_id=None):
+        """Translate segments concurrently and reassemble them in their original order"""
+        translatable = [segment.translate and has_translatable_text(segment.text) for segment in segments]
+        results = iter(await asyncio.gather(*(
+            self._translate(segment.text, target_language, guild_id)
+            for segment, translate in zip(segments, translatable) if translate
+        )))
+
+        parts = []
+        for segment, translate in zip(segments, translatable):
+            if not translate:
+                parts.append(segment.text)
+                continue
+            translated_segment = next(results)
+            if not translated_segment:
+                return None
+            parts.append(translated_segment)
+        return ''.join(parts)
+
+    async def _load_translation(self, text, target_language, key, guild_id=None):
+        """Fetch a translation from the persistent store or the model and cache it"""
+        if self.translation_store:
+            stored = await self.translation_store.get(key)
+            self._count_lookup('store', stored)
+            if stored is not None:
+                logger.debug("Translation store hit for %s translation", target_language)
+                self.result_cache.put(key, stored)
+                return stored
+
+        translated_text = await self.scheduler.run(
+            guild_id, self._timed_queue(lambda: translate_text(text, target_language, client=self.ollama_client))
+        )
+        if translated_text:
+            await self._remember_result(key, translated_text, text, target_language)
+        return translated_text
+
+    def _count_lookup(self, cache, value):
+        """Count a cache lookup as a hit or a miss depending on whether it found a value"""
+        self.metrics.inc('translator_cache_requests_total', cache=cache, result='miss' if value is None else 'hit')
+
+    async def _get_cached_result(self, key, text=None, target_language=None):
+        """Look up the result cache, the shared cache, then the translation memory, counting hits and misses"""
+        with self.tracer.span('cache_lookup', language=target_language) as span:
+            cached = self.result_cache.get(key)
+            self._count_lookup('result', cached)
+            if cached is None and self.shared_cache:
+                cached = await self.shared_cache.get('result', key)
+                self._count_lookup('shared', cached)
+                if cached is not None:
+                    self.result_cache.put(key, cached)
+            if cached is None and self._uses_memory(text):
+                cached = self.translation_memory.get(text, target_language)
+                self._count_lookup('memory', cached)
+                if cached is not None:
+                    logger.debug("Reusing the %s translation of a near-identical text", target_language)
+                    self.result_cache.put(key, cached)
+            span.set(hit=cached is not None)
+        return cached
+
+    def _uses_memory(self, text):
+        """Only short texts, such as chat messages, go through the translation memory"""
+        return self.translation_memory is not None and text is not None and len(text) <= self.segment_max_chars
+
+    async def _remember_result(self, key, translated_text, text=None, target_language=None):
+        """Cache a new translation locally, in the persistent store and for other processes"""
+        self.result_cache.put(key, translated_text)
+        if self._uses_memory(text):
+            self.translation_memory.put(text, target_language, translated_text)
+        if self.translation_store:
+            self.translation_store.put(key, translated_text)
+        if self.shared_cache:
+            await self.shared_cache.set('result', key, translated_text, self.result_cache.ttl)
+
+    async def _get_cooldown(self, cache_key):
+        """Return when a message was last translated to a language, by this or another process"""
+        timestamp = self.translation_cache.get(cache_key)
+        if timestamp is None and self.shared_cache:
+            shared = await self.shared_cache.get('cooldown', self._cooldown_key(cache_key))
+            if shared is not None:
+                timestamp = float(shared)
+        return timestamp
+
+    async def _set_cooldown(self, cache_key, timestamp):
+        self.translation_cache[cache_key] = timestamp
+        if self.shared_cache:
+            await self.shared_cache.set('cooldown', self._cooldown_key(cache_key), repr(timestamp), COOLDOWN_SECONDS)
+
+    @staticmethod
+    def _cooldown_key(cache_key):
+        message_id, target_language = cache_key
+        return f'{message_id}:{target_language}'
+
+    def _timed_queue(self, factory):
+        """Wrap a scheduler factory so the time it spends waiting for a worker is recorded"""
+        queued_at = time.perf_counter()
+
+        def start():
+            self.metrics.observe('translator_stage_seconds', time.perf_counter() - queued_at, stage='queue')
+            self.tracer.record('queue_wait', queued_at)
+            return factory()
+        return start
+
+    async def _flush_traces(self, interval=5):
+        """Background task that periodically appends kept traces to the trace file"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.tracer.flush()
 
     def _cleanup_translation_cache(self):
         """Remove old cache entries to prevent memory growth"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, timestamp in self.translation_cache.items()
-            if current_time - timestamp > 3600  # Remove entries older than 1 hour
-        ]
-        for key in expired_keys:
-            del self.translation_cache[key]
+        return self.translation_cache.expire()
+
+    async def _sweep_translation_cache(self, interval=60):
+        """Background task that periodically expires old cooldown entries"""
+        while True:
+            await asyncio.sleep(interval)
+            removed = self._cleanup_translation_cache()
+            if removed:
+                logger.debug("Expired %s cooldown entries", removed)
+            if self.shared_cache:
+                try:
+                    await self.shared_cache.purge()
+                except Exception as e:
+                    logger.error("Failed to purge shared cache: %s", e)
 
     async def on_command_error(self, ctx, error):
         if isinstance(error, commands.CommandNotFound):
             return
-        logger.error(f"Command error: {error}")
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You need the Manage Channels permission to change this channel's subscriptions")
+            return
+        logger.error("Command error: %s", error)
+
+
+def shard_groups(shard_count, processes):
+    """Split shard ids 0..shard_count-1 into one contiguous group per process"""
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    groups = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        groups.append(list(range(start, end)))
+        start = end
+    return groups
+
+
+def _run_shard_group(token, shard_ids=None, shard_count=None, process_index=0, config=None):
+    """Run one bot process for the given shards until it disconnects"""
+    # Spawned shard processes start without the parent's logging setup
+    configure_logging_from_env()
+    bot = TranslatorBot(shard_ids=shard_ids, shard_count=shard_count, process_index=process_index, config=config)
+
+    try:
+        # discord.py would add its own handler writing on the event loop; its records reach the queue handler
+        bot.run(token, log_handler=None)
+    except discord.errors.LoginFailure:
+        logger.error("Failed to login: Invalid token")
+    except Exception as e:
+        logger.error("Failed to start bot: %s", e)
 
 
 def run_bot():
     # Load environment variables
     load_dotenv()
+    configure_logging_from_env()
 
     token = os.getenv('DISCORD_TOKEN')
     if not token:
         raise ValueError("DISCORD_TOKEN environment variable not set")
 
-    bot = TranslatorBot()
+    # Resolved once here and handed to every shard process and translation client
+    config = Config.from_env()
+
+    processes = int(os.getenv('SHARD_PROCESSES', '1'))
+    if processes <= 1:
+        _run_shard_group(token, config=config)
+        return
 
+    if not os.getenv('SHARD_COUNT', '').strip():
+        raise ValueError("SHARD_COUNT must be set when SHARD_PROCESSES is greater than 1")
+    shard_count = int(os.getenv('SHARD_COUNT'))
+    if not os.getenv('SHARED_CACHE_URL', '').strip():
+        logger.warning("SHARED_CACHE_URL is not set, each process keeps its own result and cooldown caches")
+
+    # Each shard group gets its own process, gateway connections and event loop
+    context = multiprocessing.get_context('spawn')
+    workers = [
+        context.Process(
+            target=_run_shard_group, args=(token, group, shard_count, index, config),
+            name=f'shards-{group[0]}-{group[-1]}',
+        )
+        for index, group in enumerate(shard_groups(shard_count, processes))
+    ]
+    for worker in workers:
+        worker.start()
+        logger.info("Started %s (PID: %s)", worker.name, worker.pid)
     try:
-        bot.run(token)
-    except discord.errors.LoginFailure:
-        logger.error("Failed to login: Invalid token")
-    except Exception as e:
-        logger.error(f"Failed to start bot: {e}")
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+import hashlib
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keying without touching interior formatting"""
+    return unicodedata.normalize('NFC', text).strip()
+
+
+def make_cache_key(text: str, target_language: str, model: str) -> str:
+    """
+    Build a content-addressed cache key for a translation
+
+    Args:
+        text (str): Source text
+        target_language (str): Target language for translation
+        model (str): Model used to produce the translation
+
+    Returns:
+        str: Hex SHA-256 digest of the normalized text, language and model
+    """
+    digest = hashlib.sha256()
+    for part in (model, target_language.lower(), normalize_text(text)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class TranslationCache:
+    """Bounded in-memory LRU cache of translated text with a TTL.
+
+    Entries are evicted least-recently-used first once the total size of the
+    cached translations exceeds ``max_bytes``, and are treated as missing once
+    they are older than ``ttl`` seconds.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, ttl: float = 24 * 3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # Format: {key: (translation, stored_at, size)}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    @staticmethod
+    def _entry_size(key: str, translation: str) -> int:
+        return len(key) + len(translation.encode('utf-8'))
+
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        """Return the cached translation for key, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            if count:
+                self.misses += 1
+            return None
+
+        translation, stored_at, size = entry
+        if time.monotonic() - stored_at > self.ttl:
+            self._remove(key)
+            if count:
+                self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if count:
+            self.hits += 1
+        return translation
+
+    def put(self, key: str, translation: str):
+        """Store a translation, evicting least recently used entries to stay within budget"""
+        size = self._entry_size(key, translation)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (translation, time.monotonic(), size)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+
+class LRUCache:
+    """Small count-bounded LRU mapping, used for objects such as fetched messages"""
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Return the value for key and mark it as most recently used"""
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, value):
+        """Store value for key, evicting the least recently used entry when full"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self._entries.pop(key, default)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Optional, Tuple, Union
+
+import aiohttp
+
+from .config import DEFAULT_OLLAMA_MODEL, DEFAULT_OLLAMA_URL, Config
+from .tracing import tracer
+
+
+class OllamaClient:
+    """Async HTTP client for the Ollama API backed by one keep-alive session.
+
+    The session and its connection pool are created lazily on first use (or by
+    ``start()``) and live until ``close()``, so concurrent translations share
+    pooled connections instead of opening a new one per request. The model
+    and ``keep_alive`` are added to every request that does not set its own.
+
+    Requests are written in the /api/generate shape, with an optional
+    ``system`` prompt. With ``api='chat'`` they are sent to /api/chat as a
+    system and a user message instead, and replies are returned with the
+    message content under ``response`` so callers handle both the same way.
+    """
+
+    def __init__(self, url: str = DEFAULT_OLLAMA_URL, pool_size: int = 10,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 total_timeout: float = 60.0, model: str = DEFAULT_OLLAMA_MODEL,
+                 keep_alive: Optional[Union[int, str]] = None, api: str = 'generate',
+                 num_ctx: Optional[int] = None, num_predict_scale: float = 1.0):
+        """
+        Args:
+            url (str): Ollama generate endpoint, e.g. http://localhost:11434/api/generate
+            pool_size (int): Maximum number of simultaneous connections to the host
+            connect_timeout (float): Seconds allowed to establish a connection
+            read_timeout (float): Seconds allowed between reads of the response body
+            total_timeout (float): Seconds allowed for the whole request
+            model (str): Model used by requests that do not name one
+            keep_alive (Optional[Union[int, str]]): How long the server keeps the model loaded after a
+                request, e.g. '30m' or -1 for always; the server default when None
+            api (str): 'generate' or 'chat', the Ollama endpoint requests are sent to
+            num_ctx (Optional[int]): Context window for every request; keeping it fixed lets the
+                server reuse its cached prompt prefix. The server default when None
+            num_predict_scale (float): Multiplier for the num_predict output limit of each request,
+                0 to remove the limit
+        """
+        self.url = url
+        self.model = model
+        self.keep_alive = keep_alive
+        self.api = api
+        self.num_ctx = num_ctx
+        self.num_predict_scale = num_predict_scale
+        self.base_url = url.split('/api/', 1)[0].rstrip('/')
+        self.chat_url = f'{self.base_url}/api/chat'
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout,
+            sock_connect=connect_timeout,
+            sock_read=read_timeout,
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_config(cls, config: Config, url: Optional[str] = None) -> 'OllamaClient':
+        """Build a client for url, or the first configured endpoint, from a Config"""
+        return cls(
+            url=url or config.ollama_urls[0],
+            pool_size=config.pool_size,
+            connect_timeout=config.connect_timeout,
+            read_timeout=config.read_timeout,
+            total_timeout=config.total_timeout,
+            model=config.ollama_model,
+            keep_alive=config.keep_alive,
+            api=config.api,
+            num_ctx=config.num_ctx,
+            num_predict_scale=config.num_predict_scale,
+        )
+
+    @classmethod
+    def from_env(cls) -> 'OllamaClient':
+        """Build a client from the OLLAMA_* environment variables"""
+        return cls.from_config(Config.from_env())
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def start(self):
+        """Open the pooled session if it is not already open"""
+        if self.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        """Close the session and release all pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _request(self, payload: dict, stream: bool, scale: bool = True) -> Tuple[str, dict]:
+        """Return the URL and body for a generate-shaped payload, filled with the client's defaults"""
+        body = {'model': self.model}
+        if self.keep_alive is not None:
+            body['keep_alive'] = self.keep_alive
+        body.update(payload)
+        body['stream'] = stream
+
+        options = dict(body.pop('options', None) or {})
+        if self.num_ctx:
+            options.setdefault('num_ctx', self.num_ctx)
+        if scale and 'num_predict' in options:
+            if self.num_predict_scale > 0:
+                options['num_predict'] = max(1, round(options['num_predict'] * self.num_predict_scale))
+            else:
+                del options['num_predict']
+        if options:
+            body['options'] = options
+
+        if self.api != 'chat':
+            return self.url, body
+        messages = []
+        system = body.pop('system', None)
+        if system:
+            messages.append({'role': 'system', 'content': system})
+        prompt = body.pop('prompt', '')
+        if prompt:
+            messages.append({'role': 'user', 'content': prompt})
+        body['messages'] = messages  # An empty list only loads the model
+        return self.chat_url, body
+
+    def _response(self, data: dict) -> dict:
+        """Present a chat reply or chunk like a generate one, with its text under 'response'"""
+        if self.api == 'chat' and 'response' not in data:
+            data['response'] = (data.get('message') or {}).get('content', '')
+        return data
+
+    async def generate(self, payload: dict) -> dict:
+        """
+        POST a request to the generate endpoint and return the decoded JSON body
+
+        Args:
+            payload (dict): Request body in the /api/generate shape, sent with 'stream' set to False
+
+        Returns:
+            dict: Decoded JSON response
+
+        Raises:
+            aiohttp.ClientError: On connection failures or non-2xx responses
+            asyncio.TimeoutError: When one of the configured timeouts expires
+            json.JSONDecodeError: When the body is not valid JSON
+        """
+        return await self._post(*self._request(payload, stream=False))
+
+    async def _post(self, url: str, body: dict) -> dict:
+        await self.start()
+        with tracer.span('ollama_request', url=url) as span:
+            started = time.perf_counter()
+            async with self._session.post(url, json=body) as response:
+                # Headers arrive once the model has finished, as the body is not streamed
+                span.set(status=response.status, ttfb_ms=round((time.perf_counter() - started) * 1000, 1))
+                response.raise_for_status()
+                return self._response(await response.json(content_type=None))
+
+    async def warm_up(self, system: Optional[str] = None) -> Tuple[float, float]:
+        """
+        Load the model into memory and run a throwaway one-token generation
+
+        Args:
+            system (Optional[str]): System prompt to evaluate during the generation, so its tokens
+                are already in the server's prompt cache when the first translation arrives
+
+        Returns:
+            Tuple[float, float]: Seconds taken to load the model and to run the generation
+
+        Raises:
+            aiohttp.ClientError: On connection failures or non-2xx responses
+            asyncio.TimeoutError: When one of the configured timeouts expires
+        """
+        started = time.perf_counter()
+        await self.generate({'prompt': ''})  # An empty prompt only loads the model
+        loaded = time.perf_counter()
+        payload = {'prompt': 'Hello', 'options': {'num_predict': 1}}
+        if system:
+            payload['system'] = system
+        await self._post(*self._request(payload, stream=False, scale=False))
+        return loaded - started, time.perf_counter() - loaded
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """Return whether the server answers its /api/tags endpoint successfully"""
+        await self.start()
+        try:
+            async with self._session.get(f'{self.base_url}/api/tags',
+                                         timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                return response.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def stream_generate(self, payload: dict) -> AsyncIterator[dict]:
+        """
+        POST a streaming request to the generate endpoint and yield each NDJSON chunk
+
+        Args:
+            payload (dict): Request body in the /api/generate shape, sent with 'stream' set to True
+
+        Yields:
+            dict: Decoded chunks as they arrive, ending with the chunk marked 'done'
+
+        Raises:
+            aiohttp.ClientError: On connection failures or non-2xx responses
+            asyncio.TimeoutError: When one of the configured timeouts expires
+            json.JSONDecodeError: When a line is not valid JSON
+        """
+        await self.start()
+        url, body = self._request(payload, stream=True)
+        started = time.perf_counter()
+        first_token = None
+        try:
+            async with self._session.post(url, json=body) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                    chunk = self._response(json.loads(line))
+                    yield chunk
+                    if chunk.get('done'):
+                        break
+        finally:
+            # Recorded afterwards, as a span left open across yields would adopt the consumer's spans
+            attributes = {'url': url, 'stream': True}
+            if first_token is not None:
+                attributes['ttfb_ms'] = round(first_token * 1000, 1)
+            tracer.record('ollama_request', started, **attributes)
@@ -0,0 +1,77 @@
+import os
+from typing import NamedTuple, Optional, Tuple, Union
+
+DEFAULT_OLLAMA_URL = 'http://localhost:11434/api/generate'
+DEFAULT_OLLAMA_MODEL = 'llama3.1:8b'
+
+# Ollama endpoints a client can send translations to
+OLLAMA_APIS = ('generate', 'chat')
+
+
+def _parse_keep_alive(value: str) -> Optional[Union[int, str]]:
+    """Parse OLLAMA_KEEP_ALIVE: seconds as a number (-1 keeps the model loaded) or a duration such as '30m'"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _parse_bool(value: str, default: bool) -> bool:
+    value = (value or '').strip().lower()
+    if not value:
+        return default
+    return value in ('1', 'true', 'yes')
+
+
+class Config(NamedTuple):
+    """Ollama and translation settings, resolved once at startup and passed to the clients"""
+
+    ollama_urls: Tuple[str, ...] = (DEFAULT_OLLAMA_URL,)
+    ollama_model: str = DEFAULT_OLLAMA_MODEL
+    pool_size: int = 10
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    total_timeout: float = 60.0
+    failure_threshold: int = 3
+    circuit_cooldown: float = 30.0
+    probe_interval: float = 15.0
+    keep_alive: Optional[Union[int, str]] = None  # Server default when None
+    warmup: bool = True
+    api: str = 'generate'
+    num_ctx: Optional[int] = None  # Server default when None
+    num_predict_scale: float = 1.0  # 0 removes the output limit
+
+    @classmethod
+    def from_env(cls) -> 'Config':
+        """
+        Read the configuration from the OLLAMA_* environment variables
+
+        Call once after loading the .env file; the result is passed on rather than re-read per request.
+
+        Raises:
+            ValueError: If OLLAMA_API is not one of OLLAMA_APIS
+        """
+        api = os.getenv('OLLAMA_API', '').strip().lower() or 'generate'
+        if api not in OLLAMA_APIS:
+            raise ValueError(f"OLLAMA_API must be one of {', '.join(OLLAMA_APIS)}: {api}")
+        num_ctx = os.getenv('OLLAMA_NUM_CTX', '').strip()
+        urls = tuple(url.strip() for url in os.getenv('OLLAMA_URLS', '').split(',') if url.strip())
+        return cls(
+            ollama_urls=urls or (os.getenv('OLLAMA_URL') or DEFAULT_OLLAMA_URL,),
+            ollama_model=os.getenv('OLLAMA_MODEL') or DEFAULT_OLLAMA_MODEL,
+            pool_size=int(os.getenv('OLLAMA_POOL_SIZE', '10')),
+            connect_timeout=float(os.getenv('OLLAMA_CONNECT_TIMEOUT', '5')),
+            read_timeout=float(os.getenv('OLLAMA_READ_TIMEOUT', '30')),
+            total_timeout=float(os.getenv('OLLAMA_TIMEOUT', '60')),
+            failure_threshold=int(os.getenv('OLLAMA_FAILURE_THRESHOLD', '3')),
+            circuit_cooldown=float(os.getenv('OLLAMA_CIRCUIT_COOLDOWN', '30')),
+            probe_interval=float(os.getenv('OLLAMA_PROBE_INTERVAL', '15')),
+            keep_alive=_parse_keep_alive(os.getenv('OLLAMA_KEEP_ALIVE', '')),
+            warmup=_parse_bool(os.getenv('OLLAMA_WARMUP', ''), True),
+            api=api,
+            num_ctx=int(num_ctx) if num_ctx else None,
+            num_predict_scale=float(os.getenv('OLLAMA_NUM_PREDICT_SCALE', '1.0')),
+        )
@@ -0,0 +1,76 @@
+import heapq
+import time
+from typing import Hashable, Optional
+
+
+class CooldownCache:
+    """Map of key -> last translation time with expiry-ordered eviction.
+
+    A min-heap ordered by timestamp sits beside the dict, so expiring old
+    entries costs O(log n) per removed entry instead of a scan of the whole
+    map, and the map never grows past ``max_entries``. Heap entries made stale
+    by a later update of the same key are skipped when they surface.
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 100_000):
+        """
+        Args:
+            ttl (float): Seconds an entry is kept before ``expire()`` removes it
+            max_entries (int): Hard cap on entries; the oldest are evicted beyond it
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._timestamps = {}  # Format: {(message_id, language): timestamp}
+        self._heap = []  # Format: [(timestamp, key), ...]
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timestamps
+
+    def __getitem__(self, key: Hashable) -> float:
+        return self._timestamps[key]
+
+    def __setitem__(self, key: Hashable, timestamp: float):
+        self._timestamps[key] = timestamp
+        heapq.heappush(self._heap, (timestamp, key))
+
+        while len(self._timestamps) > self.max_entries:
+            self._pop_oldest()
+
+        # Rebuild once stale heap entries outnumber live ones
+        if len(self._heap) > 2 * len(self._timestamps) + 64:
+            self._heap = [(ts, k) for k, ts in self._timestamps.items()]
+            heapq.heapify(self._heap)
+
+    def get(self, key: Hashable, default: Optional[float] = None) -> Optional[float]:
+        return self._timestamps.get(key, default)
+
+    def clear(self):
+        self._timestamps.clear()
+        self._heap.clear()
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Remove entries older than the TTL
+
+        Args:
+            now (Optional[float]): Current time, defaults to time.time()
+
+        Returns:
+            int: Number of entries removed
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        while self._heap and now - self._heap[0][0] > self.ttl:
+            if self._pop_oldest():
+                removed += 1
+        return removed
+
+    def _pop_oldest(self) -> bool:
+        timestamp, key = heapq.heappop(self._heap)
+        if self._timestamps.get(key) == timestamp:
+            del self._timestamps[key]
+            return True
+        return False
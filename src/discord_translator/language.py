@@ -0,0 +1,129 @@
+import json
+import math
+import re
+import unicodedata
+from collections import Counter
+from importlib import resources
+from typing import Dict, Iterable, Optional
+
+from .markup import PROTECTED_PATTERN
+
+# Languages identified from their script, checked in order
+SCRIPT_LANGUAGES = (
+    ('HANGUL', 'korean'),
+    ('HIRAGANA', 'japanese'),
+    ('KATAKANA', 'japanese'),
+    ('CJK', 'chinese'),
+    ('CYRILLIC', 'russian'),
+    ('GREEK', 'greek'),
+)
+
+# Scripts shared by several languages only name one when a letter confirms it and none rules it out:
+# Russian needs ы, э or ё and no Ukrainian, Belarusian, Serbian or Macedonian letter, and Chinese needs
+# a character Japanese does not use, so kanji-only Japanese is not taken for Chinese
+SCRIPT_MARKERS = {
+    'russian': (frozenset('ыэё'), frozenset('іїєґўјљњћђџѓќѕ')),
+    'chinese': (frozenset('们这个么吗呢吧你您她它说还对过为让谁啊們這麼嗎說妳'), frozenset()),
+}
+
+# Minimum average log-likelihood lead of the best Latin-script language over the runner-up
+MIN_CONFIDENCE = 0.3
+
+# Minimum average log-likelihood of text in each Latin-script language, calibrated on held-out
+# sentences, so languages without a profile, such as Dutch or Polish, are not forced onto the closest one
+MIN_FIT = {
+    'english': -6.45,
+    'french': -6.6,
+    'german': -6.6,
+    'spanish': -6.6,
+    'italian': -6.9,
+    'portuguese': -6.9,
+}
+DEFAULT_MIN_FIT = -6.6
+
+_profiles = None
+
+
+def strip_untranslatable(text: str) -> str:
+    """Remove code, URLs, mentions and custom emoji from text"""
+    return PROTECTED_PATTERN.sub(' ', text)
+
+
+def trigrams(text: str) -> Iterable[str]:
+    """Yield character trigrams of each lowercased word, padded with spaces"""
+    for word in re.findall(r"[^\W\d_]+(?:'[^\W\d_]+)*", text.lower()):
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+
+def _load_profiles() -> Dict[str, Dict]:
+    global _profiles
+    if _profiles is None:
+        raw = json.loads(resources.files('discord_translator').joinpath('data/ngram_profiles.json').read_text('utf-8'))
+        _profiles = {}
+        for language, profile in raw.items():
+            total = profile['total']
+            _profiles[language] = {
+                'logprobs': {gram: math.log(count / total) for gram, count in profile['counts'].items()},
+                'unseen': math.log(0.5 / total),
+            }
+    return _profiles
+
+
+def _script_language(text: str) -> Optional[str]:
+    counts = Counter()
+    letters = 0
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        letters += 1
+        name = unicodedata.name(ch, '')
+        for script, language in SCRIPT_LANGUAGES:
+            if name.startswith(script):
+                counts[language] += 1
+                break
+    if not letters or not counts:
+        return None
+    # Kana marks Japanese even when most characters are kanji
+    if counts['japanese']:
+        counts['japanese'] += counts.pop('chinese', 0)
+    language, count = counts.most_common(1)[0]
+    if count * 2 < letters:
+        return None
+    if language in SCRIPT_MARKERS:
+        confirming, excluding = SCRIPT_MARKERS[language]
+        chars = set(text.lower())
+        if chars & excluding or not chars & confirming:
+            return None
+    return language
+
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Identify the language of text without calling the model
+
+    Args:
+        text (str): Text to identify
+
+    Returns:
+        Optional[str]: Language name as used in FLAG_TO_LANGUAGE, or None if unsure
+    """
+    text = strip_untranslatable(text)
+    language = _script_language(text)
+    if language:
+        return language
+
+    grams = list(trigrams(text))
+    if len(grams) < 8:
+        return None  # Too little text to tell Latin-script languages apart
+
+    scores = []
+    for language, profile in _load_profiles().items():
+        logprobs, unseen = profile['logprobs'], profile['unseen']
+        scores.append((sum(logprobs.get(gram, unseen) for gram in grams) / len(grams), language))
+    scores.sort(reverse=True)
+    (best, language), (runner_up, _) = scores[0], scores[1]
+    if best < MIN_FIT.get(language, DEFAULT_MIN_FIT) or best - runner_up < MIN_CONFIDENCE:
+        return None
+    return language
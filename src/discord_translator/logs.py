@@ -0,0 +1,146 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Logger for records that carry message or translation text, sampled separately from the rest
+payload_logger = logging.getLogger('discord_translator.payload')
+
+TEXT_FORMAT = '%(levelname)s:%(name)s:%(message)s'
+
+# Attributes every LogRecord has; anything else on a record was passed through ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+class Preview:
+    """Text shortened for a log line, only when the line is actually formatted.
+
+    Creating one is a single allocation, so payloads can be passed to the
+    logger on the hot path without copying or slicing text nobody reads.
+    """
+
+    __slots__ = ('text',)
+    max_chars = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        text = str(self.text)
+        if len(text) <= self.max_chars:
+            return text
+        return f'{text[:self.max_chars]}… ({len(text)} chars)'
+
+    __repr__ = __str__
+
+
+class SampleFilter(logging.Filter):
+    """Let through a random fraction of records"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including fields passed through ``extra``"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue records as they are, leaving all formatting to the listener thread.
+
+    The standard QueueHandler merges the message and its arguments before
+    queueing, on the caller's thread; within one process the record can be
+    handed over untouched, so the event loop only pays for creating it.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(level='INFO', json_output: bool = False, payload_sample_rate: float = 1.0,
+                      payload_chars: int = 200) -> QueueListener:
+    """
+    Send log records through a queue to a background thread that formats and writes them to stderr
+
+    Calling it again replaces the previous configuration.
+
+    Args:
+        level: Level of the root logger
+        json_output (bool): Write one JSON object per record instead of plain text
+        payload_sample_rate (float): Fraction of payload_logger records to keep
+        payload_chars (int): Characters of a Preview shown before it is cut off
+
+    Returns:
+        QueueListener: The running listener, stopped by shutdown_logging() or at exit
+    """
+    global _handler, _listener
+    shutdown_logging()
+
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT))
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    _handler = DeferredQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(level)
+
+    Preview.max_chars = payload_chars
+    for existing in [f for f in payload_logger.filters if isinstance(f, SampleFilter)]:
+        payload_logger.removeFilter(existing)
+    if payload_sample_rate < 1:
+        payload_logger.addFilter(SampleFilter(payload_sample_rate))
+    return _listener
+
+
+def configure_logging_from_env() -> QueueListener:
+    """Configure logging from LOG_LEVEL, LOG_FORMAT, LOG_PAYLOAD_SAMPLE_RATE and LOG_PAYLOAD_CHARS"""
+    return configure_logging(
+        level=os.getenv('LOG_LEVEL', 'INFO').strip().upper() or 'INFO',
+        json_output=os.getenv('LOG_FORMAT', '').strip().lower() == 'json',
+        payload_sample_rate=float(os.getenv('LOG_PAYLOAD_SAMPLE_RATE', '1.0')),
+        payload_chars=int(os.getenv('LOG_PAYLOAD_CHARS', '200')),
+    )
+
+
+def shutdown_logging():
+    """Remove the queue handler and flush and stop the listener thread"""
+    global _handler, _listener
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
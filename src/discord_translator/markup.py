@@ -0,0 +1,82 @@
+import re
+from typing import List, Tuple
+
+# Spans that must reach the reader byte-for-byte and carry no translatable language
+CODE_BLOCK_PATTERN = re.compile(r'```.*?(?:```|$)', re.DOTALL)
+INLINE_CODE_PATTERN = re.compile(r'`[^`\n]+`')
+URL_PATTERN = re.compile(r'https?://[^\s<>]+')
+MENTION_PATTERN = re.compile(r'<(?:@[!&]?|#)\d+>|@everyone|@here')
+CUSTOM_EMOJI_PATTERN = re.compile(r'<a?:\w+:\d+>')
+TIMESTAMP_PATTERN = re.compile(r'<t:\d+(?::[tTdDfFR])?>')
+
+PROTECTED_PATTERN = re.compile('|'.join(
+    f'(?:{pattern.pattern})' for pattern in (
+        CODE_BLOCK_PATTERN, INLINE_CODE_PATTERN, URL_PATTERN,
+        MENTION_PATTERN, CUSTOM_EMOJI_PATTERN, TIMESTAMP_PATTERN,
+    )
+), re.DOTALL)
+
+PLACEHOLDER_PATTERN = re.compile(r'\[\[\s*(\d+)\s*\]\]')
+
+
+def protect(text: str) -> Tuple[str, List[str]]:
+    """
+    Replace code, URLs, mentions and custom emoji with numbered placeholders
+
+    Args:
+        text (str): Message content
+
+    Returns:
+        Tuple[str, List[str]]: The masked text and the original spans, indexed by placeholder number.
+            Text that already contains placeholder-like markers is returned unmasked.
+    """
+    if PLACEHOLDER_PATTERN.search(text):
+        return text, []
+
+    spans = []
+
+    def replace(match):
+        spans.append(match.group())
+        return f'[[{len(spans) - 1}]]'
+
+    return PROTECTED_PATTERN.sub(replace, text), spans
+
+
+def restore(text: str, spans: List[str], append_missing: bool = True) -> str:
+    """
+    Put the original spans back in place of their placeholders
+
+    Spans whose placeholder the model dropped are appended at the end so that
+    no code or link is silently lost.
+
+    Args:
+        text (str): Translated text containing placeholders
+        spans (List[str]): Spans returned by protect()
+        append_missing (bool): Append spans whose placeholder is absent, off for partial streamed text
+
+    Returns:
+        str: Text with every placeholder replaced by its original span
+    """
+    if not spans:
+        return text
+
+    used = set()
+
+    def replace(match):
+        index = int(match.group(1))
+        if index >= len(spans):
+            return match.group()
+        used.add(index)
+        return spans[index]
+
+    restored = PLACEHOLDER_PATTERN.sub(replace, text)
+    missing = [span for index, span in enumerate(spans) if index not in used]
+    if missing and append_missing:
+        restored = '\n'.join([restored, *missing])
+    return restored
+
+
+def has_translatable_text(text: str) -> bool:
+    """Return whether text contains any letters outside code, URLs, mentions and custom emoji"""
+    masked, _ = protect(text)
+    return any(ch.isalpha() for ch in PLACEHOLDER_PATTERN.sub(' ', masked))
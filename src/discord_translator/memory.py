@@ -0,0 +1,175 @@
+import random
+import re
+import zlib
+from collections import Counter, OrderedDict
+from typing import FrozenSet, Optional, Tuple
+
+from .cache import normalize_text
+from .markup import protect
+
+# Mersenne prime used as the modulus of the MinHash permutations
+_PRIME = (1 << 61) - 1
+
+NUMBER_PATTERN = re.compile(r'\d+')
+WORD_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+# Words whose presence on only one side flips the meaning of otherwise similar texts
+NEGATIONS = frozenset({
+    'not', 'no', 'never', 'nothing', 'nobody', 'none', 'nor', 'neither', 'cannot', 'without',
+    'dont', 'cant', 'wont', 'isnt', 'arent', 'doesnt', 'didnt', 'wasnt', 'werent', 'havent', 'hasnt',
+    'ne', 'pas', 'non', 'jamais', 'nicht', 'kein', 'keine', 'nie', 'nunca', 'nada', 'nem', 'não', 'mai',
+})
+# Prefixes that negate a word, as in successful and unsuccessful
+NEGATING_PREFIXES = ('un', 'in', 'im', 'il', 'ir', 'dis', 'non')
+
+
+def _normalize(text: str) -> str:
+    """Lower-case text and collapse its whitespace, keeping punctuation, which can change the meaning"""
+    return ' '.join(normalize_text(text).lower().split())
+
+
+def _shingles(text: str, size: int) -> FrozenSet[int]:
+    """Return hashes of the character n-grams of already normalized text"""
+    return frozenset(zlib.crc32(text[index:index + size].encode('utf-8'))
+                     for index in range(len(text) - size + 1))
+
+
+def _words(text: str) -> Tuple[str, ...]:
+    """Return the words of already normalized text, without surrounding punctuation"""
+    return tuple(WORD_PATTERN.findall(text.replace('\u2019', "'")))
+
+
+def _negates(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    """Whether the words that differ between a and b include a negation"""
+    counts_a, counts_b = Counter(a), Counter(b)
+    differing = set(counts_a - counts_b) | set(counts_b - counts_a)
+    for word in differing:
+        if word in NEGATIONS or word.endswith("n't"):
+            return True
+        if any(word.startswith(prefix) and word[len(prefix):] in differing for prefix in NEGATING_PREFIXES):
+            return True
+    return False
+
+
+def _jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TranslationMemory:
+    """Reuse translations of near-identical source texts.
+
+    Source texts are indexed per target language by a MinHash signature of
+    their character n-grams, split into LSH bands so a lookup only compares
+    against texts that share at least one band. Candidates are confirmed by
+    their exact n-gram Jaccard similarity, and numbers, code, URLs, mentions
+    and question marks must match exactly, so "meet at 5" never reuses the
+    translation of "meet at 6". Words may differ, but not by a negation, so
+    "do not merge" never reuses the translation of "do merge". Entries are
+    evicted least-recently-used first beyond ``max_entries``.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_entries: int = 5000, shingle_size: int = 3,
+                 bands: int = 8, rows: int = 4, seed: int = 1):
+        """
+        Args:
+            threshold (float): Minimum n-gram Jaccard similarity for a stored translation to be reused
+            max_entries (int): Source texts remembered across all languages
+            shingle_size (int): Characters per n-gram
+            bands (int): LSH bands; more bands find less similar candidates
+            rows (int): Signature values per band; more rows make candidates stricter
+            seed (int): Seed of the MinHash permutations
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = rows
+        generator = random.Random(seed)
+        self._permutations = [(generator.randrange(1, _PRIME), generator.randrange(0, _PRIME))
+                              for _ in range(bands * rows)]
+        self._entries = OrderedDict()  # Format: {(language, normalized): (translation, guard, band_keys)}
+        self._buckets = {}  # Format: {(language, band, band_values): {normalized, ...}}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _guard(self, text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...], int]:
+        """Parts of a text that must be identical for its translation to be reused"""
+        masked, spans = protect(text)
+        return tuple(spans), tuple(NUMBER_PATTERN.findall(masked)), masked.count('?')
+
+    def _band_keys(self, shingles: FrozenSet[int]) -> Tuple[Tuple[int, ...], ...]:
+        signature = [min((a * shingle + b) % _PRIME for shingle in shingles) for a, b in self._permutations]
+        return tuple(tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands))
+
+    def get(self, text: str, target_language: str) -> Optional[str]:
+        """
+        Return the stored translation of the most similar remembered text, if similar enough
+
+        Args:
+            text (str): Source text
+            target_language (str): Target language for translation
+
+        Returns:
+            Optional[str]: The reusable translation, or None if no remembered text is close enough
+        """
+        normalized = _normalize(text)
+        if len(normalized) < self.shingle_size:
+            return None
+        language = target_language.lower()
+        guard = self._guard(text)
+
+        entry = self._entries.get((language, normalized))
+        if entry is not None:
+            if entry[1] != guard:
+                return None
+            self._entries.move_to_end((language, normalized))
+            return entry[0]
+
+        words = _words(normalized)
+        shingles = _shingles(normalized, self.shingle_size)
+        candidates = set()
+        for band, values in enumerate(self._band_keys(shingles)):
+            candidates.update(self._buckets.get((language, band, values), ()))
+
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            translation, candidate_guard, _ = self._entries[(language, candidate)]
+            if candidate_guard != guard or _negates(words, _words(candidate)):
+                continue
+            score = _jaccard(shingles, _shingles(candidate, self.shingle_size))
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is None:
+            return None
+        self._entries.move_to_end((language, best))
+        return self._entries[(language, best)][0]
+
+    def put(self, text: str, target_language: str, translation: str):
+        """Remember the translation of text, evicting the least recently used texts beyond max_entries"""
+        normalized = _normalize(text)
+        if len(normalized) < self.shingle_size or self.max_entries <= 0:
+            return
+        language = target_language.lower()
+        key = (language, normalized)
+        if key in self._entries:
+            self._remove(key)
+        band_keys = self._band_keys(_shingles(normalized, self.shingle_size))
+        self._entries[key] = (translation, self._guard(text), band_keys)
+        for band, values in enumerate(band_keys):
+            self._buckets.setdefault((language, band, values), set()).add(normalized)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        language, normalized = key
+        _, _, band_keys = self._entries.pop(key)
+        for band, values in enumerate(band_keys):
+            bucket_key = (language, band, values)
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(normalized)
+                if not bucket:
+                    del self._buckets[bucket_key]
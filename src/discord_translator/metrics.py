@@ -0,0 +1,190 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from aiohttp import web
+
+# Upper bounds, in seconds, shared by every latency histogram
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Fixed-bucket histogram; observing is a bisect and two additions"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by interpolating within its bucket
+
+        Returns:
+            Optional[float]: The estimate, capped at the largest finite bound, or None if empty
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                return lower + (self.bounds[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+class Metrics:
+    """In-process counters, histograms and gauges rendered in the Prometheus text format"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def describe(self, name: str, text: str):
+        """Set the HELP text of a metric"""
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        series = self._counters.setdefault(name, {})
+        key = _label_key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        series = self._histograms.setdefault(name, {})
+        key = _label_key(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels) -> Iterator[None]:
+        """Observe the seconds spent in the block, including when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def gauge(self, name: str, read: Callable[[], float]):
+        """Register a gauge whose value is read when metrics are rendered"""
+        self._gauges[name] = read
+
+    def value(self, name: str, **labels) -> float:
+        """Return the current value of a counter series"""
+        return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def series(self, name: str) -> Dict[LabelKey, Histogram]:
+        """Return every labelled histogram recorded under name"""
+        return dict(self._histograms.get(name, {}))
+
+    def reset(self):
+        """Forget all recorded values, keeping descriptions and gauges"""
+        self._counters.clear()
+        self._histograms.clear()
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def header(name, kind):
+            if name in self._help:
+                lines.append(f'# HELP {name} {self._help[name]}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        for name, series in sorted(self._counters.items()):
+            header(name, 'counter')
+            for key, value in sorted(series.items()):
+                lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+
+        for name, series in sorted(self._histograms.items()):
+            header(name, 'histogram')
+            for key, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(key, ("le", repr(bound)))} {cumulative}')
+                lines.append(f'{name}_bucket{_format_labels(key, ("le", "+Inf"))} {histogram.count}')
+                lines.append(f'{name}_sum{_format_labels(key)} {_format_value(histogram.sum)}')
+                lines.append(f'{name}_count{_format_labels(key)} {histogram.count}')
+
+        for name, read in sorted(self._gauges.items()):
+            header(name, 'gauge')
+            lines.append(f'{name} {_format_value(read())}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """HTTP server exposing a Metrics registry at /metrics for Prometheus to scrape"""
+
+    def __init__(self, metrics: Metrics, host: str = '127.0.0.1', port: int = 9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> 'MetricsServer':
+        app = web.Application()
+        app.router.add_get('/metrics', self._metrics)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _metrics(self, request):
+        return web.Response(text=self.metrics.render(), content_type='text/plain', charset='utf-8')
+
+
+# Process-wide registry shared by the bot and the translation functions
+registry = Metrics()
+registry.describe('translator_stage_seconds', 'Seconds spent in each stage of handling a translation reaction')
+registry.describe('translator_reactions_total', 'Flag reactions received, by outcome')
+registry.describe('translator_cache_requests_total', 'Cache lookups, by cache and result')
+registry.describe('translator_cooldown_drops_total', 'Reactions dropped because the message was translated recently')
+registry.describe('translator_rate_limited_total', 'Reactions refused by a rate limit, by scope')
+registry.describe('translator_backend_errors_total', 'Failed Ollama requests, by error kind')
+registry.describe('translator_auto_translations_total', 'Translations of messages in subscribed channels, by outcome')
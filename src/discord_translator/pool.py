@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import aiohttp
+
+from .client import OllamaClient
+from .config import DEFAULT_OLLAMA_MODEL, Config
+
+logger = logging.getLogger(__name__)
+
+
+class NoHealthyBackendError(aiohttp.ClientConnectionError):
+    """Raised when every backend in the pool has an open circuit"""
+
+
+class Backend:
+    """One Ollama endpoint with its load, latency and circuit breaker state"""
+
+    def __init__(self, client: OllamaClient, ewma_alpha: float = 0.3):
+        self.client = client
+        self.ewma_alpha = ewma_alpha
+        self.in_flight = 0
+        self.ewma_latency = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return self.client.url
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    def score(self) -> float:
+        """Expected wait on this node: one latency per request ahead of us plus ours"""
+        return (self.in_flight + 1) * (self.ewma_latency or 1.0)
+
+    def record_success(self, latency: float):
+        if self.ewma_latency:
+            self.ewma_latency += self.ewma_alpha * (latency - self.ewma_latency)
+        else:
+            self.ewma_latency = latency
+        self.failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, threshold: int, cooldown: float):
+        self.failures += 1
+        if self.failures >= threshold:
+            self.open_until = time.monotonic() + cooldown
+
+
+class BackendPool:
+    """Routes Ollama requests across several endpoints.
+
+    Each request goes to the healthy node with the lowest expected wait, based
+    on its in-flight count and EWMA latency. Nodes that fail repeatedly have
+    their circuit opened for a cooldown period, and a background task probes
+    every node so recovered nodes rejoin and dead ones are skipped. The pool
+    exposes the same ``generate``/``stream_generate`` interface as
+    ``OllamaClient`` so it can be passed to ``translate_text`` directly.
+    """
+
+    def __init__(self, urls: List[str], pool_size: int = 10, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, total_timeout: float = 60.0, failure_threshold: int = 3,
+                 cooldown: float = 30.0, probe_interval: float = 15.0, model: str = DEFAULT_OLLAMA_MODEL,
+                 keep_alive: Optional[Union[int, str]] = None, api: str = 'generate',
+                 num_ctx: Optional[int] = None, num_predict_scale: float = 1.0):
+        """
+        Args:
+            urls (List[str]): Generate endpoints of the Ollama servers
+            pool_size (int): Connection pool size for each server
+            connect_timeout (float): Seconds allowed to establish a connection
+            read_timeout (float): Seconds allowed between reads of the response body
+            total_timeout (float): Seconds allowed for the whole request
+            failure_threshold (int): Consecutive failures that open a node's circuit
+            cooldown (float): Seconds a node's circuit stays open before it is retried
+            probe_interval (float): Seconds between health probes, 0 to disable probing
+            model (str): Model used by requests that do not name one
+            keep_alive (Optional[Union[int, str]]): How long each server keeps the model loaded after a request
+            api (str): 'generate' or 'chat', the Ollama endpoint requests are sent to
+            num_ctx (Optional[int]): Context window for every request, the server default when None
+            num_predict_scale (float): Multiplier for the num_predict output limit, 0 to remove it
+        """
+        if not urls:
+            raise ValueError("BackendPool needs at least one endpoint")
+        self.backends = [
+            Backend(OllamaClient(url, pool_size, connect_timeout, read_timeout, total_timeout, model, keep_alive,
+                                 api, num_ctx, num_predict_scale))
+            for url in urls
+        ]
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self._probe_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'BackendPool':
+        """Build a pool with one node per configured endpoint"""
+        return cls(
+            list(config.ollama_urls),
+            pool_size=config.pool_size,
+            connect_timeout=config.connect_timeout,
+            read_timeout=config.read_timeout,
+            total_timeout=config.total_timeout,
+            failure_threshold=config.failure_threshold,
+            cooldown=config.circuit_cooldown,
+            probe_interval=config.probe_interval,
+            model=config.ollama_model,
+            keep_alive=config.keep_alive,
+            api=config.api,
+            num_ctx=config.num_ctx,
+            num_predict_scale=config.num_predict_scale,
+        )
+
+    @classmethod
+    def from_env(cls) -> 'BackendPool':
+        """Build a pool from OLLAMA_URLS (comma separated) or OLLAMA_URL and the OLLAMA_* settings"""
+        return cls.from_config(Config.from_env())
+
+    async def start(self):
+        """Open every node's session and start the health probe"""
+        for backend in self.backends:
+            await backend.client.start()
+        if self.probe_interval and self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def close(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        for backend in self.backends:
+            await backend.client.close()
+
+    def _pick(self, exclude=()) -> Backend:
+        candidates = [b for b in self.backends if b.healthy and b not in exclude]
+        if not candidates:
+            raise NoHealthyBackendError("No healthy Ollama backend available")
+        return min(candidates, key=Backend.score)
+
+    async def generate(self, payload: dict) -> dict:
+        """
+        Send a generate request to the least-loaded healthy node
+
+        A connection failure is retried once on a different node; other errors
+        are raised to the caller after being recorded against the node.
+        """
+        tried = []
+        while True:
+            backend = self._pick(exclude=tried)
+            tried.append(backend)
+            backend.in_flight += 1
+            backend.requests += 1
+            started = time.monotonic()
+            try:
+                result = await backend.client.generate(payload)
+            except aiohttp.ClientConnectionError:
+                backend.record_failure(self.failure_threshold, self.cooldown)
+                if len(tried) >= min(2, len(self.backends)):
+                    raise
+                continue
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                backend.record_failure(self.failure_threshold, self.cooldown)
+                raise
+            finally:
+                backend.in_flight -= 1
+            backend.record_success(time.monotonic() - started)
+            return result
+
+    async def stream_generate(self, payload: dict) -> AsyncIterator[dict]:
+        """Stream a generate request from the least-loaded healthy node"""
+        backend = self._pick()
+        backend.in_flight += 1
+        backend.requests += 1
+        started = time.monotonic()
+        try:
+            async for chunk in backend.client.stream_generate(payload):
+                yield chunk
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            backend.record_failure(self.failure_threshold, self.cooldown)
+            raise
+        else:
+            backend.record_success(time.monotonic() - started)
+        finally:
+            backend.in_flight -= 1
+
+    async def warm_up(self, system: Optional[str] = None) -> Dict[str, Union[Tuple[float, float], BaseException]]:
+        """
+        Warm up every node at once, evaluating the system prompt on each
+
+        Returns:
+            Dict[str, Union[Tuple[float, float], BaseException]]: For each node's URL, the seconds taken to
+                load the model and to run the throwaway generation, or the error that stopped it
+        """
+        results = await asyncio.gather(*(backend.client.warm_up(system) for backend in self.backends),
+                                       return_exceptions=True)
+        return {backend.url: result for backend, result in zip(self.backends, results)}
+
+    async def probe(self):
+        """Check every node once, closing or opening its circuit to match"""
+        results = await asyncio.gather(*(backend.client.ping() for backend in self.backends))
+        for backend, ok in zip(self.backends, results):
+            if ok:
+                if not backend.healthy:
+                    logger.info("Ollama backend %s recovered", backend.url)
+                backend.failures = 0
+                backend.open_until = 0.0
+            elif backend.healthy:
+                logger.warning("Ollama backend %s failed its health check", backend.url)
+                backend.failures = self.failure_threshold
+                backend.open_until = time.monotonic() + self.cooldown
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.error("Ollama health probe failed: %s", e)
@@ -0,0 +1,131 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+# Limits applied when the environment does not configure a scope, as (requests, seconds)
+DEFAULT_LIMITS = {
+    'user': '10/60',
+    'channel': '',
+    'guild': '',
+}
+
+
+def parse_rate(spec: str) -> Optional[Tuple[int, float]]:
+    """
+    Parse a limit written as "requests/seconds", such as "10/60"
+
+    Returns:
+        Optional[Tuple[int, float]]: Burst size and refill period, or None for an empty or zero limit
+
+    Raises:
+        ValueError: If the spec is not of the form "requests/seconds"
+    """
+    spec = (spec or '').strip()
+    if not spec:
+        return None
+    requests, _, seconds = spec.partition('/')
+    if not seconds:
+        raise ValueError(f"Rate limit must look like 'requests/seconds': {spec}")
+    requests, seconds = int(requests), float(seconds)
+    if requests <= 0 or seconds <= 0:
+        return None
+    return requests, seconds
+
+
+class TokenBucketLimiter:
+    """Token buckets for many keys, each holding up to ``capacity`` requests.
+
+    A bucket refills at ``capacity / per`` tokens per second. Each key costs
+    one (tokens, updated_at) pair, kept in least-recently-used order; a bucket
+    left alone for ``per`` seconds is full again and indistinguishable from
+    a new one, so it is dropped, keeping memory proportional to active keys.
+    """
+
+    def __init__(self, capacity: int, per: float):
+        """
+        Args:
+            capacity (int): Requests allowed in a burst
+            per (float): Seconds to refill an empty bucket
+        """
+        self.capacity = capacity
+        self.per = per
+        self.rate = capacity / per
+        self._buckets = OrderedDict()  # Format: {key: (tokens, updated_at)}
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def tokens(self, key: Hashable, now: float) -> float:
+        """Return the tokens available to key at time now"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.capacity)
+        tokens, updated_at = bucket
+        return min(float(self.capacity), tokens + (now - updated_at) * self.rate)
+
+    def consume(self, key: Hashable, now: float) -> bool:
+        """Take one token from key's bucket, returning False if it is empty"""
+        self.evict_idle(now)
+        tokens = self.tokens(key, now)
+        if tokens < 1:
+            return False
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        return True
+
+    def evict_idle(self, now: float) -> int:
+        """Drop buckets that have refilled completely and return how many were dropped"""
+        removed = 0
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.per:
+                break
+            del self._buckets[key]
+            removed += 1
+        return removed
+
+
+class RateLimiter:
+    """Per-user, per-channel and per-guild limits checked together.
+
+    A request is admitted only if every applicable scope has a token left,
+    and only then is a token taken from each, so a request refused by one
+    scope does not use up another scope's allowance.
+    """
+
+    def __init__(self, limits: Dict[str, TokenBucketLimiter]):
+        """
+        Args:
+            limits (Dict[str, TokenBucketLimiter]): Limiter for each scope name
+        """
+        self.limits = limits
+
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        """Create limiters from RATE_LIMIT_USER, RATE_LIMIT_CHANNEL and RATE_LIMIT_GUILD"""
+        limits = {}
+        for scope, default in DEFAULT_LIMITS.items():
+            rate = parse_rate(os.getenv(f'RATE_LIMIT_{scope.upper()}', default))
+            if rate:
+                limits[scope] = TokenBucketLimiter(*rate)
+        return cls(limits)
+
+    def check(self, now: Optional[float] = None, **keys: Hashable) -> Optional[str]:
+        """
+        Admit a request for the given scope keys, such as user=..., guild=...
+
+        Keys that are None, or scopes without a configured limit, are not checked.
+
+        Returns:
+            Optional[str]: The first scope whose limit is exhausted, or None if the request is admitted
+        """
+        now = time.monotonic() if now is None else now
+        applicable = [(scope, self.limits[scope], key) for scope, key in keys.items()
+                      if key is not None and scope in self.limits]
+        for scope, limiter, key in applicable:
+            if limiter.tokens(key, now) < 1:
+                return scope
+        for _, limiter, key in applicable:
+            limiter.consume(key, now)
+        return None
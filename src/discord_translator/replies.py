@@ -0,0 +1,65 @@
+import asyncio
+from collections import OrderedDict
+from typing import List, Optional
+
+# Longest message content Discord accepts
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+def _split_long(text: str, limit: int) -> List[str]:
+    """Split text into pieces of at most limit characters, preferring line and word breaks"""
+    pieces = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit + 1)
+        if cut < limit // 2:
+            # A line break this early would leave a short piece, such as a header on its own
+            cut = max(cut, text.rfind(' ', 0, limit + 1))
+        if cut <= 0:
+            cut = limit
+        pieces.append(text[:cut])
+        text = text[cut:]
+        if text[:1] in ('\n', ' '):
+            text = text[1:]  # The break itself is not needed at the start of the next piece
+    pieces.append(text)
+    return pieces
+
+
+def chunk_sections(sections: List[str], limit: int = DISCORD_MESSAGE_LIMIT, separator: str = '\n\n') -> List[str]:
+    """
+    Pack sections into as few messages as fit within Discord's length limit
+
+    Sections are kept whole where possible; a section longer than the limit
+    is split at line or word breaks.
+
+    Args:
+        sections (List[str]): Text blocks in display order
+        limit (int): Maximum characters per message
+        separator (str): Text placed between sections sharing a message
+
+    Returns:
+        List[str]: Message contents, each at most limit characters
+    """
+    chunks: List[str] = []
+    for section in sections:
+        for piece in _split_long(section, limit):
+            if chunks and len(chunks[-1]) + len(separator) + len(piece) <= limit:
+                chunks[-1] += separator + piece
+            else:
+                chunks.append(piece)
+    return chunks
+
+
+class ConsolidatedReply:
+    """Translations of one message and the reply messages showing them together"""
+
+    def __init__(self):
+        self.translations = OrderedDict()  # Format: {language: translated_text}
+        self.messages = []  # Posted reply messages, in order
+        self.contents: List[str] = []  # Content last sent for each posted message
+        self.streaming: Optional[asyncio.Event] = None  # Set once a translation streamed into the reply ends
+
+    def render(self, limit: int = DISCORD_MESSAGE_LIMIT) -> List[str]:
+        """Return the content of each reply message for the current translations"""
+        return chunk_sections(
+            [f"Translation ({language}):\n{text}" for language, text in self.translations.items()], limit
+        )
@@ -0,0 +1,152 @@
+import asyncio
+import contextvars
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the translation queue cannot accept more work"""
+
+
+class TranslationScheduler:
+    """Bounded work queue that runs translations on a fixed number of workers.
+
+    Work is queued per guild and workers take from the guilds in round-robin
+    order, so a burst in one guild cannot starve the others. When the queue
+    (or a single guild's share of it, a quarter of the queue by default) is
+    full, ``run()`` raises ``QueueFullError`` immediately instead of letting
+    requests pile up.
+    Cancelling a ``run()`` call removes its work from the queue, or cancels
+    it on its worker if it has already started. Work runs in a copy of its
+    caller's context, so context variables such as the current trace span
+    carry over to the worker.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 100, max_per_guild: Optional[int] = None):
+        """
+        Args:
+            workers (int): Number of translations allowed to run at once
+            max_queue (int): Maximum number of translations waiting across all guilds
+            max_per_guild (Optional[int]): Maximum number waiting for a single guild, defaults to a quarter of max_queue
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_guild = max_per_guild or max(1, max_queue // 4)
+        self.active = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self._queues = OrderedDict()  # Format: {guild_id: deque([(future, factory, context), ...])}
+        self._size = 0
+        self._available: Optional[asyncio.Semaphore] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    @property
+    def queued(self) -> int:
+        return self._size
+
+    def start(self):
+        """Start the worker tasks if they are not already running"""
+        if self._worker_tasks:
+            return
+        self._available = asyncio.Semaphore(self._size)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the workers and cancel everything still waiting in the queue"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        for queue in self._queues.values():
+            for future, _, _ in queue:
+                future.cancel()
+        self._queues.clear()
+        self._size = 0
+
+    async def run(self, guild_id: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Queue factory() for guild_id and wait for its result
+
+        Args:
+            guild_id (Hashable): Guild the work is for, None for direct messages
+            factory (Callable[[], Awaitable[Any]]): Creates the coroutine to run on a worker
+
+        Returns:
+            Any: The result of the coroutine
+
+        Raises:
+            QueueFullError: If the queue or the guild's share of it is full
+        """
+        queue = self._queues.get(guild_id)
+        if self._size >= self.max_queue or (queue is not None and len(queue) >= self.max_per_guild):
+            self.rejected += 1
+            raise QueueFullError(f"Translation queue is full ({self._size} waiting)")
+
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        if queue is None:
+            queue = self._queues[guild_id] = deque()
+        item = (future, factory, contextvars.copy_context())
+        queue.append(item)
+        self._size += 1
+        self._available.release()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._discard(guild_id, item)
+            raise
+
+    def _discard(self, guild_id: Hashable, item):
+        """Drop work whose caller gave up before a worker took it"""
+        queue = self._queues.get(guild_id)
+        if queue is None or item not in queue:
+            return
+        queue.remove(item)
+        if not queue:
+            del self._queues[guild_id]
+        self._size -= 1
+        self.cancelled += 1
+
+    def _next(self):
+        # Take from the guild at the front, then rotate it to the back
+        guild_id, queue = next(iter(self._queues.items()))
+        item = queue.popleft()
+        if queue:
+            self._queues.move_to_end(guild_id)
+        else:
+            del self._queues[guild_id]
+        self._size -= 1
+        return item
+
+    async def _worker(self):
+        while True:
+            await self._available.acquire()
+            if not self._size:
+                continue  # The work this permit was released for has been discarded
+            future, factory, context = self._next()
+            if future.done():
+                continue  # Caller gave up while the work was queued
+
+            self.active += 1
+            work = asyncio.get_running_loop().create_task(context.run(factory), context=context)
+            # Stop the work, such as a request to the backend, as soon as its caller gives up
+            future.add_done_callback(lambda _, work=work: work.cancel())
+            try:
+                result = await work
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    self.cancelled += 1
+                    continue
+                future.cancel()  # The worker itself is being stopped
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.active -= 1
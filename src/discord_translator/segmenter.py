@@ -0,0 +1,110 @@
+import re
+from typing import List, NamedTuple
+
+CODE_FENCE = re.compile(r'```.*?(?:```|$)', re.DOTALL)
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n\s*')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?…。！？])\s+')
+
+
+class Segment(NamedTuple):
+    text: str
+    translate: bool
+
+
+def _split_whitespace(text: str) -> List[Segment]:
+    """Move leading and trailing whitespace of a chunk into untranslated segments"""
+    stripped = text.strip()
+    if not stripped:
+        return [Segment(text, False)] if text else []
+    start = text.index(stripped)
+    parts = [Segment(text[:start], False), Segment(stripped, True), Segment(text[start + len(stripped):], False)]
+    return [part for part in parts if part.text]
+
+
+def _split_sentences(paragraph: str, max_chars: int) -> List[Segment]:
+    """Split a paragraph longer than max_chars at sentence boundaries"""
+    if len(paragraph) <= max_chars:
+        return [Segment(paragraph, True)]
+
+    segments = []
+    position = 0
+    for match in SENTENCE_BREAK.finditer(paragraph):
+        segments.append(Segment(paragraph[position:match.start()], True))
+        segments.append(Segment(match.group(), False))
+        position = match.end()
+    segments.append(Segment(paragraph[position:], True))
+    return segments
+
+
+def _merge(segments: List[Segment], max_chars: int) -> List[Segment]:
+    """Join neighbouring translatable segments, and the separators between them, up to max_chars"""
+    merged: List[Segment] = []
+    pending_separator = None
+    for segment in segments:
+        if not segment.translate:
+            if pending_separator is not None:
+                pending_separator = Segment(pending_separator.text + segment.text, False)
+            elif merged and merged[-1].translate:
+                pending_separator = segment
+            else:
+                merged.append(segment)
+            continue
+
+        if (pending_separator is not None and merged and merged[-1].translate
+                and '```' not in pending_separator.text
+                and len(merged[-1].text) + len(pending_separator.text) + len(segment.text) <= max_chars):
+            merged[-1] = Segment(merged[-1].text + pending_separator.text + segment.text, True)
+        else:
+            if pending_separator is not None:
+                merged.append(pending_separator)
+            merged.append(segment)
+        pending_separator = None
+
+    if pending_separator is not None:
+        merged.append(pending_separator)
+    return merged
+
+
+def split_segments(text: str, max_chars: int = 400) -> List[Segment]:
+    """
+    Split a message into independently translatable segments
+
+    Fenced code blocks and the whitespace between paragraphs are kept as
+    untranslated segments, so joining every segment's text reproduces the
+    original message exactly. Paragraphs longer than max_chars are split at
+    sentence boundaries, and short neighbouring paragraphs are merged back
+    together up to max_chars to avoid one model call per line.
+
+    Args:
+        text (str): Message content
+        max_chars (int): Target maximum length of a translatable segment
+
+    Returns:
+        List[Segment]: Segments in order, each marked with whether it should be translated
+    """
+    segments: List[Segment] = []
+    position = 0
+    blocks = []
+    for match in CODE_FENCE.finditer(text):
+        blocks.append((text[position:match.start()], True))
+        blocks.append((match.group(), False))
+        position = match.end()
+    blocks.append((text[position:], True))
+
+    for block, is_prose in blocks:
+        if not block:
+            continue
+        if not is_prose:
+            segments.append(Segment(block, False))
+            continue
+
+        position = 0
+        for match in PARAGRAPH_BREAK.finditer(block):
+            for part in _split_whitespace(block[position:match.start()]):
+                segments.extend(_split_sentences(part.text, max_chars) if part.translate else [part])
+            segments.append(Segment(match.group(), False))
+            position = match.end()
+        for part in _split_whitespace(block[position:]):
+            segments.extend(_split_sentences(part.text, max_chars) if part.translate else [part])
+
+    return _merge(segments, max_chars)
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """State shared between bot processes, such as results and cooldowns.
+
+    Values are strings grouped by namespace and expire after a per-entry TTL.
+    Each process keeps its own in-memory caches in front of the backend, so
+    the backend is only consulted on a local miss.
+    """
+
+    async def open(self):
+        pass
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        """Return the unexpired value stored under key, or None"""
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: str, ttl: float):
+        """Store value under key for ttl seconds"""
+
+    async def purge(self) -> int:
+        """Remove expired entries and return how many were removed"""
+        return 0
+
+    async def close(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Backend held in this process's memory.
+
+    Shares nothing between processes; it stands in for a real backend in
+    tests and when the bot runs as a single process.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[str, float]] = {}  # Format: {(namespace, key): (value, expires_at)}
+
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._entries[(namespace, key)]
+            return None
+        return entry[0]
+
+    async def set(self, namespace: str, key: str, value: str, ttl: float):
+        self._entries[(namespace, key)] = (value, time.time() + ttl)
+
+    async def purge(self) -> int:
+        now = time.time()
+        expired = [entry_key for entry_key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for entry_key in expired:
+            del self._entries[entry_key]
+        return len(expired)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Backend in a SQLite file that every process on the host opens.
+
+    The database runs in WAL mode so readers in one process never wait for a
+    writer in another. Writes are committed immediately, unlike
+    TranslationStore, because a cooldown set by one process must be visible
+    to the next reaction handled by another. All database work runs on a
+    single background thread per process.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Location of the SQLite database file shared by all processes
+        """
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shared-cache')
+        self._connection: Optional[sqlite3.Connection] = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def open(self):
+        if self._connection is None:
+            await self._run(self._open_sync)
+
+    def _open_sync(self):
+        # Other processes may hold the write lock briefly; wait rather than fail
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS shared_cache ('
+            ' namespace TEXT NOT NULL,'
+            ' key TEXT NOT NULL,'
+            ' value TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL,'
+            ' PRIMARY KEY (namespace, key)'
+            ') WITHOUT ROWID'
+        )
+        connection.commit()
+        self._connection = connection
+
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        if self._connection is None:
+            return None
+        try:
+            return await self._run(self._get_sync, namespace, key)
+        except sqlite3.Error as e:
+            logger.error("Shared cache read failed: %s", e)
+            return None
+
+    def _get_sync(self, namespace: str, key: str) -> Optional[str]:
+        row = self._connection.execute(
+            'SELECT value FROM shared_cache WHERE namespace = ? AND key = ? AND expires_at > ?',
+            (namespace, key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    async def set(self, namespace: str, key: str, value: str, ttl: float):
+        if self._connection is None:
+            return
+        try:
+            await self._run(self._set_sync, namespace, key, value, time.time() + ttl)
+        except sqlite3.Error as e:
+            logger.error("Shared cache write failed: %s", e)
+
+    def _set_sync(self, namespace: str, key: str, value: str, expires_at: float):
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO shared_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                (namespace, key, value, expires_at)
+            )
+
+    async def purge(self) -> int:
+        if self._connection is None:
+            return 0
+        return await self._run(self._purge_sync)
+
+    def _purge_sync(self) -> int:
+        with self._connection:
+            return self._connection.execute('DELETE FROM shared_cache WHERE expires_at <= ?', (time.time(),)).rowcount
+
+    async def close(self):
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=False)
+
+
+def cache_backend_from_env() -> Optional[CacheBackend]:
+    """
+    Create the backend named by SHARED_CACHE_URL
+
+    Supported values are ``memory://`` and ``sqlite:///path/to/file.db``.
+
+    Returns:
+        Optional[CacheBackend]: The backend, or None when SHARED_CACHE_URL is unset
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    url = os.getenv('SHARED_CACHE_URL', '').strip()
+    if not url:
+        return None
+    if url == 'memory://':
+        return MemoryCacheBackend()
+    if url.startswith('sqlite:///'):
+        return SQLiteCacheBackend(url[len('sqlite:///'):])
+    raise ValueError(f"Unsupported SHARED_CACHE_URL: {url}")
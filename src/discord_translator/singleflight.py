@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Iterator, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is still pending await the same task instead of starting their
+    own. Once the task finishes the key is released, so later calls run again.
+    Work is cancelled when its last waiting caller is, or through ``cancel()``.
+    """
+
+    def __init__(self):
+        self._calls = {}  # Format: {key: asyncio.Task}
+        self._waiters = {}  # Format: {asyncio.Task: number of callers awaiting it}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._calls))
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run factory() for key unless a call for key is already in flight
+
+        Args:
+            key (Hashable): Identity of the work being requested
+            factory (Callable[[], Awaitable[Any]]): Creates the coroutine to run if nobody else is
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared with an earlier caller
+
+        Raises:
+            asyncio.CancelledError: If this caller or the shared work was cancelled
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shield so one waiter being cancelled does not cancel the work for the others
+            return await asyncio.shield(task), shared
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                task.cancel()  # Nobody is left to use the result; a no-op once the work is done
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel the work in flight for key, raising CancelledError to everyone waiting for it
+
+        Returns:
+            bool: Whether there was unfinished work to cancel
+        """
+        task = self._calls.get(key)
+        return task is not None and task.cancel()
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationStore:
+    """Persistent SQLite store of translations keyed like the result cache.
+
+    All database work runs on a single background thread so the event loop
+    never blocks on disk I/O. Writes are queued with ``put()`` and committed in
+    batches; reads are point lookups on the primary key, so startup cost does
+    not grow with the number of stored rows.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 0.5):
+        """
+        Args:
+            path (str): Location of the SQLite database file
+            batch_size (int): Number of pending writes that triggers an immediate flush
+            flush_interval (float): Maximum seconds a write waits before being committed
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='translation-store')
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pending = {}  # Format: {key: (translation, created_at)}
+        self._flush_requested = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def open(self):
+        """Open the database, create the schema and start the background writer"""
+        if self._connection is not None:
+            return
+        await self._run(self._open_sync)
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def _open_sync(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS translations ('
+            ' key TEXT PRIMARY KEY,'
+            ' translation TEXT NOT NULL,'
+            ' created_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS translations_created_at ON translations (created_at)')
+        connection.commit()
+        self._connection = connection
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the stored translation for key, including writes not yet flushed"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            return pending[0]
+        if self._connection is None:
+            return None
+        return await self._run(self._get_sync, key)
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        row = self._connection.execute('SELECT translation FROM translations WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, translation: str):
+        """Queue a translation to be written by the background writer"""
+        self._pending[key] = (translation, time.time())
+        if len(self._pending) >= self.batch_size:
+            self._flush_requested.set()
+
+    async def recent(self, limit: int) -> List[Tuple[str, str]]:
+        """Return up to limit of the most recently stored (key, translation) pairs"""
+        if self._connection is None or limit <= 0:
+            return []
+        return await self._run(self._recent_sync, limit)
+
+    def _recent_sync(self, limit: int) -> List[Tuple[str, str]]:
+        return self._connection.execute(
+            'SELECT key, translation FROM translations ORDER BY created_at DESC LIMIT ?', (limit,)
+        ).fetchall()
+
+    async def flush(self):
+        """Write all pending translations in a single transaction"""
+        if not self._pending or self._connection is None:
+            return
+        batch = [(key, translation, created_at) for key, (translation, created_at) in self._pending.items()]
+        self._pending = {}
+        try:
+            await self._run(self._write_sync, batch)
+        except sqlite3.Error as e:
+            logger.error("Failed to write %s translations to store: %s", len(batch), e)
+
+    def _write_sync(self, batch):
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO translations (key, translation, created_at) VALUES (?, ?, ?)', batch
+            )
+
+    async def _writer(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def close(self):
+        """Flush pending writes, stop the writer and close the database"""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        if self._connection is not None:
+            await self.flush()
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=False)
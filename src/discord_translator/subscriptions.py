@@ -0,0 +1,79 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionRegistry:
+    """Target languages each channel is auto-translated into.
+
+    Subscriptions live in memory and, when a path is given, are saved to a
+    small JSON file after every change so they survive restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path (Optional[str]): JSON file to load subscriptions from and save them to
+        """
+        self.path = path
+        self._channels: Dict[int, List[str]] = {}  # Format: {channel_id: [language, ...]}
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._channels
+
+    def __len__(self):
+        return len(self._channels)
+
+    def get(self, channel_id: int) -> List[str]:
+        return list(self._channels.get(channel_id, ()))
+
+    def add(self, channel_id: int, languages: Iterable[str]) -> List[str]:
+        """Subscribe a channel to languages and return all of its languages"""
+        current = self._channels.setdefault(channel_id, [])
+        for language in languages:
+            if language not in current:
+                current.append(language)
+        return list(current)
+
+    def remove(self, channel_id: int, languages: Optional[Iterable[str]] = None) -> List[str]:
+        """Unsubscribe a channel from languages, or from all when none are given, and return what is left"""
+        if languages is None:
+            self._channels.pop(channel_id, None)
+            return []
+        remaining = [language for language in self._channels.get(channel_id, ()) if language not in set(languages)]
+        if remaining:
+            self._channels[channel_id] = remaining
+        else:
+            self._channels.pop(channel_id, None)
+        return remaining
+
+    def load(self):
+        """Read subscriptions from the file, if it exists"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                raw = json.load(f)
+            self._channels = {int(channel_id): list(languages) for channel_id, languages in raw.items()}
+        except (OSError, ValueError) as e:
+            logger.error("Failed to load subscriptions from %s: %s", self.path, e)
+
+    async def save(self):
+        """Write subscriptions to the file without blocking the event loop"""
+        if not self.path:
+            return
+        data = {str(channel_id): languages for channel_id, languages in self._channels.items()}
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError as e:
+            logger.error("Failed to save subscriptions to %s: %s", self.path, e)
+
+    def _write(self, data):
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temporary, self.path)
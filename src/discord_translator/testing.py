@@ -0,0 +1,116 @@
+import asyncio
+import json
+import random
+from typing import Optional
+
+from aiohttp import web
+
+
+class FakeOllamaServer:
+    """Local HTTP server that mimics the parts of the Ollama API the bot uses.
+
+    Intended for tests and benchmarks. It answers /api/generate and /api/chat
+    (streaming and non-streaming) and the /api/tags health endpoint, with configurable
+    latency, token rate and failure rate, and counts the requests it receives
+    and those the client abandoned before their response was complete.
+    """
+
+    def __init__(self, response: str = 'Bonjour le monde', latency: float = 0.0,
+                 failure_rate: float = 0.0, token_rate: Optional[float] = None, seed: Optional[int] = None):
+        """
+        Args:
+            response (str): Text returned for every generation
+            latency (float): Seconds to wait before the first token, like prompt evaluation
+            failure_rate (float): Fraction of generations answered with HTTP 500
+            token_rate (Optional[float]): Tokens generated per second, None for instant generation
+            seed (Optional[int]): Seed for the failure sampling
+        """
+        self.response = response
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.token_rate = token_rate
+        self.failures = 0
+        self.healthy = True
+        self.calls = 0
+        self.aborted = 0
+        self.requests = []
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ''
+
+    @property
+    def url(self) -> str:
+        """URL of the generate endpoint"""
+        return f'{self.base_url}/api/generate'
+
+    async def start(self) -> 'FakeOllamaServer':
+        app = web.Application()
+        app.router.add_post('/api/generate', self._generate)
+        app.router.add_post('/api/chat', self._generate)
+        app.router.add_get('/api/tags', self._tags)
+        # Cancel handlers whose client disconnects, as Ollama stops generating for them
+        self._runner = web.AppRunner(app, handler_cancellation=True)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f'http://127.0.0.1:{port}'
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _tags(self, request):
+        if not self.healthy:
+            return web.Response(status=503)
+        return web.json_response({'models': []})
+
+    async def _generate(self, request):
+        body = await request.json()
+        self.calls += 1
+        self.requests.append(body)
+        try:
+            return await self._respond(request, body)
+        except asyncio.CancelledError:
+            self.aborted += 1
+            raise
+
+    async def _respond(self, request, body):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not self.healthy or self._random.random() < self.failure_rate:
+            self.failures += 1
+            return web.Response(status=500)
+
+        chat = request.path.endswith('/chat')
+
+        def reply(text, done):
+            if chat:
+                return {'message': {'role': 'assistant', 'content': text}, 'done': done}
+            return {'response': text, 'done': done}
+
+        tokens = [token + ' ' for token in self.response.split(' ')]
+        token_delay = 1 / self.token_rate if self.token_rate else 0
+
+        if not body.get('stream', True):
+            if token_delay:
+                await asyncio.sleep(token_delay * len(tokens))
+            return web.json_response(reply(self.response, True))
+
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        for token in tokens:
+            if token_delay:
+                await asyncio.sleep(token_delay)
+            chunk = reply(token, False)
+            await response.write(json.dumps(chunk).encode('utf-8') + b'\n')
+        await response.write(json.dumps(reply('', True)).encode('utf-8') + b'\n')
+        return response
@@ -0,0 +1,205 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Span of the code currently running; tasks started from it inherit it with their context
+_current_span = contextvars.ContextVar('discord_translator_span', default=None)
+
+
+class _Trace:
+    __slots__ = ('trace_id', 'sampled', 'spans', 'wall_offset', 'finished')
+
+    def __init__(self, sampled: bool):
+        self.trace_id = f'{random.getrandbits(128):032x}'
+        self.sampled = sampled
+        self.spans: List['Span'] = []
+        self.wall_offset = time.time() - time.perf_counter()  # Converts perf_counter readings to epoch time
+        self.finished = False
+
+
+class Span:
+    """One timed operation within a trace, with the attributes set on it"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'start', 'duration', 'attributes')
+
+    def __init__(self, trace: _Trace, name: str, parent_id: Optional[str], start: float, attributes: dict):
+        self.trace = trace
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.duration: Optional[float] = None
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        """Add attributes to the span, such as a cache result or an error"""
+        self.attributes.update(attributes)
+
+    def export(self, service: str) -> dict:
+        """Return the span in the Zipkin v2 JSON format, with times in microseconds"""
+        span = {
+            'traceId': self.trace.trace_id,
+            'id': self.span_id,
+            'name': self.name,
+            'timestamp': int((self.start + self.trace.wall_offset) * 1e6),
+            'duration': max(1, int((self.duration or 0.0) * 1e6)),
+            'localEndpoint': {'serviceName': service},
+            'tags': {name: str(value) for name, value in self.attributes.items()},
+        }
+        if self.parent_id:
+            span['parentId'] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span when nothing is being traced"""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Record a tree of timed spans per request and export sampled traces as JSON lines.
+
+    ``trace()`` opens the root span of a request, and ``span()`` anywhere below
+    it, including in tasks started from it, adds a child through a context
+    variable. Head sampling keeps a random fraction of traces, decided when a
+    trace starts; tail sampling also keeps every trace whose root took at least
+    ``slow_threshold`` seconds or that recorded an error, so the slowest
+    requests are never lost. Kept traces are buffered and appended to the file
+    by ``flush()`` on a worker thread. Without a path nothing is recorded.
+    """
+
+    def __init__(self, path: Optional[str] = None, sample_rate: float = 0.01, slow_threshold: float = 1.0,
+                 service: str = 'discord-translator', max_pending: int = 10000):
+        """
+        Args:
+            path (Optional[str]): JSON-lines file traces are appended to, None to disable tracing
+            sample_rate (float): Fraction of traces kept whatever their duration
+            slow_threshold (float): Seconds from which a trace is always kept
+            service (str): Service name written with every span
+            max_pending (int): Spans buffered between flushes; later ones are dropped
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.service = service
+        self.max_pending = max_pending
+        self.kept = 0
+        self.dropped = 0
+        self._pending: List[dict] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def configure(self, path: Optional[str], sample_rate: float = 0.01, slow_threshold: float = 1.0):
+        """Change where and how much is traced"""
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+
+    def configure_from_env(self):
+        """Configure tracing from TRACE_PATH, TRACE_SAMPLE_RATE and TRACE_SLOW_MS"""
+        self.configure(
+            os.getenv('TRACE_PATH', '').strip() or None,
+            sample_rate=float(os.getenv('TRACE_SAMPLE_RATE', '0.01')),
+            slow_threshold=float(os.getenv('TRACE_SLOW_MS', '1000')) / 1000,
+        )
+
+    def current(self):
+        """Return the span of the running code, or a no-op span outside a trace"""
+        return _current_span.get() or NOOP_SPAN
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[object]:
+        """Open the root span of a new trace, deciding whether it is kept once it ends"""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        trace = _Trace(sampled=random.random() < self.sample_rate)
+        root = None
+        try:
+            with self._open(trace, name, None, attributes) as root:
+                yield root
+        finally:
+            trace.finished = True
+            if trace.sampled or root.duration >= self.slow_threshold or any('error' in span.attributes
+                                                                            for span in trace.spans):
+                self._keep(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[object]:
+        """Time the block as a child of the current span; a no-op outside a trace"""
+        parent = _current_span.get()
+        if parent is None or parent.trace.finished:
+            yield NOOP_SPAN
+            return
+        with self._open(parent.trace, name, parent.span_id, attributes) as span:
+            yield span
+
+    def record(self, name: str, started: float, **attributes):
+        """Add a child span of the current span for an interval measured from started until now"""
+        parent = _current_span.get()
+        if parent is None or parent.trace.finished:
+            return
+        span = Span(parent.trace, name, parent.span_id, started, attributes)
+        span.duration = time.perf_counter() - started
+        parent.trace.spans.append(span)
+
+    @contextmanager
+    def _open(self, trace: _Trace, name: str, parent_id: Optional[str], attributes: dict) -> Iterator[Span]:
+        span = Span(trace, name, parent_id, time.perf_counter(), attributes)
+        trace.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.set(cancelled=True)
+            raise
+        except Exception as e:
+            span.set(error=f'{type(e).__name__}: {e}')
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration = time.perf_counter() - span.start
+
+    def _keep(self, trace: _Trace):
+        if len(self._pending) + len(trace.spans) > self.max_pending:
+            self.dropped += 1
+            return
+        self.kept += 1
+        # Spans still running, such as shared work the request stopped waiting for, are left out
+        self._pending.extend(span.export(self.service) for span in trace.spans if span.duration is not None)
+
+    async def flush(self):
+        """Append the buffered spans to the trace file without blocking the event loop"""
+        if not self._pending or not self.path:
+            return
+        spans, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self._write, self.path, spans)
+        except OSError as e:
+            logger.error("Could not write traces to %s: %s", self.path, e)
+
+    @staticmethod
+    def _write(path: str, spans: List[dict]):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(span, ensure_ascii=False) + '\n' for span in spans)
+
+
+# Tracer shared by the bot, the translation functions and the Ollama clients
+tracer = Tracer()
@@ -1,73 +1,316 @@
-import os
-
-from dotenv import load_dotenv
-import requests
+import asyncio
+import aiohttp
 import json
-from typing import Optional
+import logging
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from .client import OllamaClient
+from .logs import Preview, payload_logger
+from .markup import has_translatable_text, protect, restore
+from .metrics import registry
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+# Constant instructions sent ahead of every request, so the server can reuse their evaluated
+# tokens from its prompt cache instead of re-evaluating them for each translation
+SYSTEM_PROMPT = (
+    'You are a translation engine. IMPORTANT: You must preserve ALL original formatting, including '
+    'spaces, newlines, markdown, and alignment. Keep every placeholder such as [[0]] exactly as written. '
+    'Your response must contain ONLY the translation with the preserved formatting, in exactly the output '
+    'format the request asks for - no additional text, no alternatives, no explanations.'
+)
+
+# Output tokens allowed per translation beyond one per source character, which leaves ample room
+# for any language pair while stopping a runaway generation early
+NUM_PREDICT_MARGIN = 64
+
+
+@lru_cache(maxsize=None)
+def _instruction(target_language: str) -> str:
+    return f'Translate the following text to {target_language}.\n\n'
+
+
+@lru_cache(maxsize=256)
+def _multi_instruction(target_languages: Tuple[str, ...]) -> str:
+    return (
+        f'Translate the following text into each of these languages: {", ".join(target_languages)}. '
+        f'Respond with a JSON object whose keys are exactly the language names listed above and whose '
+        f'values are the translations.\n\n'
+    )
+
+
+@lru_cache(maxsize=None)
+def _batch_instruction(target_language: str) -> str:
+    return (
+        f'Translate each text in the following JSON array to {target_language}. Respond with a JSON '
+        f'object of the form {{"translations": [...]}} holding one translation per text, in the same '
+        f'order.\n\n'
+    )
+
+
+def precompile_prompts(target_languages: Iterable[str]):
+    """Build the per-language instructions once at startup rather than on the first request"""
+    for target_language in target_languages:
+        _instruction(target_language)
+        _batch_instruction(target_language)
+
+
+def _request(prompt: str, source_chars: int, outputs: int = 1, **extra) -> dict:
+    """Build a request body with the shared system prompt and an output budget scaled to the input"""
+    return {
+        'system': SYSTEM_PROMPT,
+        'prompt': prompt,
+        'options': {'num_predict': outputs * (source_chars + NUM_PREDICT_MARGIN)},
+        **extra,
+    }
+
+
+def _clean_translation(raw: str) -> str:
+    # Clean up the response to ensure single translation
+    translation = raw.strip()
 
-# Load environment variables
-load_dotenv()
+    # Remove any "Translation:" prefix if present
+    if translation.lower().startswith('translation:'):
+        translation = translation.split(':', 1)[1].strip()
 
-async def translate_text(text: str, target_language: str) -> Optional[str]:
+    return translation
+
+
+async def translate_text(text: str, target_language: str, client: Optional[OllamaClient] = None) -> Optional[str]:
     """
     Translate text using Ollama API
 
     Args:
         text (str): Text to translate
         target_language (str): Target language for translation
+        client (Optional[OllamaClient]): Shared client or BackendPool to send the request with, which
+            sets its model and keep_alive. When omitted a short-lived client is configured from the
+            environment for this call only.
 
     Returns:
         Optional[str]: Translated text or None if translation fails
     """
 
-    load_dotenv()
+    if not text:
+        return text
+
+    # Keep code, URLs, mentions and custom emoji out of the prompt
+    masked, spans = protect(text)
+    if not has_translatable_text(masked):
+        return text
+
+    owns_client = client is None
+    if owns_client:
+        client = OllamaClient.from_env()
     try:
+        with registry.time('translator_stage_seconds', stage='ollama'), \
+                tracer.span('translate_text', language=target_language, chars=len(masked)):
+            data = await client.generate(_request(
+                _instruction(target_language) + masked, len(masked),
+                stream=False,  # Ensure we get complete response
+            ))
 
-        ollama_model = os.getenv('OLLAMA_MODEL')
-        ollama_url = os.getenv('OLLAMA_URL')
-
-        # Use aiohttp or httpx for async HTTP requests in production
-        response = requests.post(
-            ollama_url,
-            json={
-                'model': ollama_model,
-                'prompt': (
-                    f'Translate the following text to {target_language}. '
-                    f'IMPORTANT: You must preserve ALL original formatting, including spaces, newlines, markdown, and '
-                    f'alignment. Your response must contain ONLY the translation with the preserved formatting - no '
-                    f'additional text, no alternatives, no explanations: '
-                    f'\n\n{text}'
-                ),
-                'stream': False  # Ensure we get complete response
-            },
-            timeout=30  # Add timeout to prevent hanging
-        )
-
-        response.raise_for_status()
-
-        data = response.json()
-        print(f"Raw JSON response from API: {data}")
+        payload_logger.debug("Raw JSON response from API: %s", Preview(data))
         if 'response' in data:
-            # Clean up the response to ensure single translation
-            translation = data['response'].strip()
-
-            # Remove any "Translation:" prefix if present
-            if translation.lower().startswith('translation:'):
-                translation = translation.split(':', 1)[1].strip()
+            translation = _clean_translation(data['response'])
 
             # If there are multiple translations (separated by OR, or newlines), take only the first
             # translation = translation.split('\n')[0].split(' OR ')[0].split(' or ')[0].strip()
 
-            return translation if translation else None
+            return restore(translation, spans) if translation else None
 
         return None
 
-    except requests.exceptions.RequestException as e:
-        print(f"Translation request error: {e}")
+    except asyncio.TimeoutError as e:
+        registry.inc('translator_backend_errors_total', error='timeout')
+        logger.error("Translation request error: %s", e)
+        return None
+    except aiohttp.ClientError as e:
+        registry.inc('translator_backend_errors_total', error='http')
+        logger.error("Translation request error: %s", e)
         return None
     except json.JSONDecodeError as e:
-        print(f"JSON parsing error: {e}")
+        registry.inc('translator_backend_errors_total', error='invalid_json')
+        logger.error("JSON parsing error: %s", e)
         return None
     except Exception as e:
-        print(f"Unexpected error during translation: {e}")
-        return None
\ No newline at end of file
+        registry.inc('translator_backend_errors_total', error='other')
+        logger.error("Unexpected error during translation: %s", e, exc_info=True)
+        return None
+    finally:
+        if owns_client:
+            await client.close()
+
+
+
+async def translate_text_multi(text: str, target_languages: List[str],
+                               client: Optional[OllamaClient] = None) -> Dict[str, Optional[str]]:
+    """
+    Translate text into several languages with one JSON-mode Ollama request
+
+    The source text is processed once and the model returns an object with one
+    translation per language, instead of one request per target language.
+
+    Args:
+        text (str): Text to translate
+        target_languages (List[str]): Target languages for translation
+        client (Optional[OllamaClient]): Shared client or BackendPool to send the request with, which
+            sets its model and keep_alive. When omitted a short-lived client is configured from the
+            environment for this call only.
+
+    Returns:
+        Dict[str, Optional[str]]: Translation for every requested language, None for any the
+            model failed to return
+    """
+    results = dict.fromkeys(target_languages)
+    if not text or not target_languages:
+        return results
+
+    masked, spans = protect(text)
+    if not has_translatable_text(masked):
+        return dict.fromkeys(target_languages, text)
+
+    owns_client = client is None
+    if owns_client:
+        client = OllamaClient.from_env()
+    try:
+        with registry.time('translator_stage_seconds', stage='ollama'), \
+                tracer.span('translate_text_multi', languages=','.join(target_languages), chars=len(masked)):
+            data = await client.generate(_request(
+                _multi_instruction(tuple(target_languages)) + masked, len(masked), len(target_languages),
+                format='json',  # Constrain the output to a JSON object
+            ))
+
+        translations = json.loads(data.get('response') or '{}')
+        if not isinstance(translations, dict):
+            raise json.JSONDecodeError('Expected a JSON object', str(translations), 0)
+        by_language = {str(language).strip().lower(): value for language, value in translations.items()}
+        for language in target_languages:
+            value = by_language.get(language.lower())
+            if isinstance(value, str):
+                translation = _clean_translation(value)
+                results[language] = restore(translation, spans) if translation else None
+        return results
+
+    except asyncio.TimeoutError as e:
+        registry.inc('translator_backend_errors_total', error='timeout')
+        logger.error("Translation request error: %s", e)
+    except aiohttp.ClientError as e:
+        registry.inc('translator_backend_errors_total', error='http')
+        logger.error("Translation request error: %s", e)
+    except json.JSONDecodeError as e:
+        registry.inc('translator_backend_errors_total', error='invalid_json')
+        logger.error("JSON parsing error: %s", e)
+    except Exception as e:
+        registry.inc('translator_backend_errors_total', error='other')
+        logger.error("Unexpected error during translation: %s", e, exc_info=True)
+    finally:
+        if owns_client:
+            await client.close()
+    return results
+
+
+async def translate_batch(texts: List[str], target_language: str,
+                          client: Optional[OllamaClient] = None) -> List[Optional[str]]:
+    """
+    Translate several short texts into one language with one JSON-mode Ollama request
+
+    Args:
+        texts (List[str]): Texts to translate
+        target_language (str): Target language for translation
+        client (Optional[OllamaClient]): Shared client or BackendPool to send the request with, which
+            sets its model and keep_alive. When omitted a short-lived client is configured from the
+            environment for this call only.
+
+    Returns:
+        List[Optional[str]]: Translation of each text in order, None for any the model failed to return
+    """
+    results: List[Optional[str]] = [None] * len(texts)
+    masked = [protect(text) for text in texts]
+    pending = [index for index, (masked_text, _) in enumerate(masked) if has_translatable_text(masked_text)]
+    for index, text in enumerate(texts):
+        if index not in pending:
+            results[index] = text
+    if not pending:
+        return results
+
+    owns_client = client is None
+    if owns_client:
+        client = OllamaClient.from_env()
+    try:
+        texts_json = json.dumps([masked[index][0] for index in pending], ensure_ascii=False)
+
+        with registry.time('translator_stage_seconds', stage='ollama'), \
+                tracer.span('translate_batch', language=target_language, texts=len(pending)):
+            data = await client.generate(_request(
+                _batch_instruction(target_language) + texts_json, len(texts_json),
+                format='json',  # Constrain the output to a JSON object
+            ))
+
+        translations = json.loads(data.get('response') or '{}')
+        translations = translations.get('translations') if isinstance(translations, dict) else None
+        if not isinstance(translations, list):
+            raise json.JSONDecodeError('Expected a "translations" array', str(translations), 0)
+        if len(translations) != len(pending):
+            # Without a one-to-one answer there is no telling which translation belongs to which text
+            logger.warning("Batch translation returned %s results for %s texts", len(translations), len(pending))
+            return results
+        for index, value in zip(pending, translations):
+            if isinstance(value, str):
+                translation = _clean_translation(value)
+                results[index] = restore(translation, masked[index][1]) if translation else None
+        return results
+
+    except asyncio.TimeoutError as e:
+        registry.inc('translator_backend_errors_total', error='timeout')
+        logger.error("Translation request error: %s", e)
+    except aiohttp.ClientError as e:
+        registry.inc('translator_backend_errors_total', error='http')
+        logger.error("Translation request error: %s", e)
+    except json.JSONDecodeError as e:
+        registry.inc('translator_backend_errors_total', error='invalid_json')
+        logger.error("JSON parsing error: %s", e)
+    except Exception as e:
+        registry.inc('translator_backend_errors_total', error='other')
+        logger.error("Unexpected error during translation: %s", e, exc_info=True)
+    finally:
+        if owns_client:
+            await client.close()
+    return results
+
+
+async def stream_translation(text: str, target_language: str, client: OllamaClient) -> AsyncIterator[str]:
+    """
+    Translate text using Ollama's streaming API, yielding the translation as it grows
+
+    Args:
+        text (str): Text to translate
+        target_language (str): Target language for translation
+        client (OllamaClient): Shared client or BackendPool to send the request with
+
+    Yields:
+        str: The cleaned translation accumulated so far
+
+    Raises:
+        aiohttp.ClientError: On connection failures or non-2xx responses
+        asyncio.TimeoutError: When one of the client's timeouts expires
+        json.JSONDecodeError: When a streamed chunk is not valid JSON
+    """
+    masked, spans = protect(text)
+    if not has_translatable_text(masked):
+        yield text
+        return
+
+    accumulated = ''
+    async for chunk in client.stream_generate(_request(_instruction(target_language) + masked, len(masked))):
+        token = chunk.get('response', '')
+        if token:
+            accumulated += token
+            yield restore(_clean_translation(accumulated), spans, append_missing=False)
+
+    if accumulated and spans:
+        # Once generation is complete, re-attach any spans the model dropped
+        yield restore(_clean_translation(accumulated), spans)
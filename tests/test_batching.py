@@ -0,0 +1,189 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+
+from discord_translator.batching import DebouncedBatcher, WindowBatcher
+
+
+class TestWindowBatcher:
+    @pytest.mark.asyncio
+    async def test_items_in_window_are_handled_together(self):
+        """Test that submissions within the window reach one handler call, without duplicates"""
+        batcher = WindowBatcher(window=0.01)
+        calls = []
+
+        async def handler(items):
+            calls.append(items)
+            return {item: item.upper() for item in items}
+
+        results = await asyncio.gather(*(batcher.submit("m", item, handler) for item in ("fr", "de", "fr")))
+
+        assert calls == [["fr", "de"]]
+        assert results == [{"fr": "FR", "de": "DE"}] * 3
+        assert "m" not in batcher
+
+    @pytest.mark.asyncio
+    async def test_keys_and_late_items_start_new_batches(self):
+        """Test that different keys, and items after the window closes, are batched separately"""
+        batcher = WindowBatcher(window=0.01)
+        calls = []
+
+        async def handler(items):
+            calls.append(items)
+            return items
+
+        await asyncio.gather(batcher.submit("a", 1, handler), batcher.submit("b", 2, handler))
+        await batcher.submit("a", 3, handler)
+
+        assert sorted(calls) == [[1], [2], [3]]
+
+    @pytest.mark.asyncio
+    async def test_batches_for_one_key_do_not_overlap(self):
+        """Test that a batch opened while the previous one is running waits for it to finish"""
+        batcher = WindowBatcher(window=0.01)
+        events = []
+
+        async def handler(items):
+            events.append(("start", items))
+            await asyncio.sleep(0.05)
+            events.append(("end", items))
+
+        first = asyncio.create_task(batcher.submit("m", 1, handler))
+        await asyncio.sleep(0.03)  # First window closed, handler running
+        await asyncio.gather(first, batcher.submit("m", 2, handler))
+
+        assert events == [("start", [1]), ("end", [1]), ("start", [2]), ("end", [2])]
+
+    @pytest.mark.asyncio
+    async def test_handler_errors_reach_every_submitter(self):
+        """Test that an exception from the handler is raised to all waiters"""
+        batcher = WindowBatcher(window=0.01)
+
+        async def handler(items):
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            batcher.submit("m", 1, handler), batcher.submit("m", 2, handler), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_open_batches(self):
+        """Test that closing cancels batches still waiting for their window"""
+        batcher = WindowBatcher(window=60)
+
+        async def handler(items):
+            return items
+
+        waiter = asyncio.create_task(batcher.submit("m", 1, handler))
+        await asyncio.sleep(0)
+        await batcher.close()
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+
+    @pytest.mark.asyncio
+    async def test_withdrawn_items_and_cancelled_keys(self):
+        """Test that discarded items are left out of the batch and cancel() stops a key's batches"""
+        batcher = WindowBatcher(window=0.01)
+        calls = []
+
+        async def handler(items):
+            calls.append(items)
+            return items
+
+        first = asyncio.create_task(batcher.submit("m", "fr", handler))
+        second = asyncio.create_task(batcher.submit("m", "de", handler))
+        await asyncio.sleep(0)
+        assert batcher.discard("m", "fr")
+        assert not batcher.discard("m", "it")
+        assert await asyncio.gather(first, second) == [["de"], ["de"]]
+
+        lone = asyncio.create_task(batcher.submit("n", "fr", handler))
+        await asyncio.sleep(0)
+        batcher.discard("n", "fr")
+        assert await lone is None
+
+        waiter = asyncio.create_task(batcher.submit("m", "es", handler))
+        await asyncio.sleep(0)
+        assert batcher.cancel("m") == 1
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert calls == [["de"]]
+
+
+class TestDebouncedBatcher:
+    @pytest.mark.asyncio
+    async def test_burst_is_flushed_once_quiet(self):
+        """Test that consecutive items for a key reach the handler in one batch after the quiet delay"""
+        calls = []
+
+        async def handler(key, items):
+            calls.append((key, items))
+
+        batcher = DebouncedBatcher(handler, delay=0.02, max_delay=1.0)
+        for item in ("a", "b", "c"):
+            batcher.add("channel", item)
+            await asyncio.sleep(0.005)
+        assert batcher.pending("channel") == 3
+        await asyncio.sleep(0.05)
+
+        assert calls == [("channel", ["a", "b", "c"])]
+        assert batcher.pending("channel") == 0
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_and_max_delay_flush_early(self):
+        """Test that a full buffer flushes at once and a busy key is flushed after max_delay"""
+        calls = []
+
+        async def handler(key, items):
+            calls.append(items)
+
+        batcher = DebouncedBatcher(handler, delay=0.02, max_delay=0.03, max_items=2)
+        batcher.add("k", 1)
+        batcher.add("k", 2)
+        await asyncio.sleep(0)
+        assert calls == [[1, 2]]
+
+        busy = DebouncedBatcher(handler, delay=0.02, max_delay=0.03)
+        for item in range(3, 8):
+            busy.add("k", item)
+            await asyncio.sleep(0.012)  # Never quiet for the whole delay
+        await asyncio.sleep(0.05)
+
+        assert len(calls) > 2
+        assert [item for items in calls[1:] for item in items] == [3, 4, 5, 6, 7]
+
+    @pytest.mark.asyncio
+    async def test_close_drops_buffered_items(self):
+        """Test that closing cancels pending flushes"""
+        handler = AsyncMock()
+        batcher = DebouncedBatcher(handler, delay=0.01)
+        batcher.add("k", 1)
+
+        await batcher.close()
+        await asyncio.sleep(0.02)
+
+        handler.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_discarded_items_are_not_handled(self):
+        """Test that discarded items are dropped, along with the flush of a buffer left empty"""
+        calls = []
+
+        async def handler(key, items):
+            calls.append((key, items))
+
+        batcher = DebouncedBatcher(handler, delay=0.01)
+        for item in (1, 2, 3):
+            batcher.add("a", item)
+        batcher.add("b", 4)
+
+        assert batcher.discard("a", lambda item: item == 2) == 1
+        assert batcher.discard("b", lambda item: True) == 1
+        assert batcher.discard("c", lambda item: True) == 0
+        await asyncio.sleep(0.03)
+
+        assert calls == [("a", [1, 3])]
@@ -0,0 +1,71 @@
+import json
+import random
+
+import pytest
+
+from discord_translator.benchmark import compare, generate_events, main, parse_args, run, summarize_latencies
+
+
+class TestGenerateEvents:
+    @pytest.mark.parametrize("scenario", ["burst", "steady", "mixed"])
+    def test_scenarios_are_reproducible(self, scenario):
+        """Test that the same seed produces the same reaction stream"""
+        first = generate_events(scenario, 20, random.Random(1))
+        second = generate_events(scenario, 20, random.Random(1))
+
+        assert first == second
+        assert len(first) == 20
+
+    def test_unknown_scenario(self):
+        """Test that an unknown scenario is rejected"""
+        with pytest.raises(ValueError):
+            generate_events("unknown", 10, random.Random(1))
+
+
+class TestSummarizeLatencies:
+    def test_percentiles_and_histogram(self):
+        """Test that every latency lands in exactly one histogram bucket"""
+        summary = summarize_latencies([0.001, 0.02, 0.3, 2.0])
+
+        assert summary["count"] == 4
+        assert summary["max_ms"] == 2000.0
+        assert sum(summary["histogram_ms"].values()) == 4
+        assert summary["histogram_ms"]["5"] == 1
+
+    def test_empty(self):
+        """Test that no latencies give an empty summary"""
+        assert summarize_latencies([]) == {"count": 0}
+
+
+class TestRun:
+    @pytest.mark.asyncio
+    async def test_scenario_reports_results(self):
+        """Test that a small run replies through the fake backend and reports its numbers"""
+        args = parse_args(["--scenario", "burst", "--requests", "10", "--latency", "0",
+                           "--rest-latency", "0", "--token-rate", "0"])
+        results = await run(args)
+
+        burst = results["scenarios"]["burst"]
+        assert burst["reactions"] == 10
+        assert burst["replies"] > 0
+        assert burst["backend_calls"] > 0
+        assert burst["latency"]["count"] == 10
+
+    def test_main_prints_only_json(self, capsys):
+        """Test that stdout holds nothing but the JSON results"""
+        main(["--scenario", "burst", "--requests", "3", "--latency", "0", "--rest-latency", "0",
+              "--token-rate", "0", "--log-level", "INFO"])
+
+        assert json.loads(capsys.readouterr().out)["scenarios"]["burst"]["reactions"] == 3
+
+    def test_main_writes_output_and_comparison(self, tmp_path):
+        """Test that results are written as JSON and compared with a baseline"""
+        output = tmp_path / "after.json"
+        argv = ["--scenario", "steady", "--requests", "5", "--latency", "0",
+                "--rest-latency", "0", "--token-rate", "0", "--log-level", "INFO", "--output", str(output)]
+        main(argv)
+        main(argv + ["--baseline", str(output)])
+
+        results = json.loads(output.read_text())
+        assert set(results["comparison"]["steady"]) >= {"p50_ms", "p99_ms", "throughput_rps", "backend_calls"}
+        assert compare(results, {"scenarios": {}}) == {}
@@ -1,4 +1,7 @@
+import aiohttp
+import json
 import pytest
+import asyncio
 import sys
 import logging
 import time
@@ -15,7 +18,12 @@ import discord
 from discord.ext import commands
 
 # Import your bot module
-from discord_translator.bot import TranslatorBot, FLAG_TO_LANGUAGE
+from discord_translator.bot import TranslatorBot, FLAG_TO_LANGUAGE, _run_shard_group, shard_groups
+from discord_translator.cache import make_cache_key
+from discord_translator.config import Config
+from discord_translator.ratelimit import RateLimiter, TokenBucketLimiter
+from discord_translator.scheduler import QueueFullError
+from discord_translator.shared_cache import MemoryCacheBackend
 
 
 class TestTranslatorBot:
@@ -41,6 +49,10 @@ class TestTranslatorBot:
             # Mock the guilds property to return our list
             type(bot).guilds = PropertyMock(return_value=mock_guilds)
 
+            # Nothing is in the gateway cache by default, so lookups fall back to REST
+            bot.get_channel = Mock(return_value=None)
+            bot.get_user = Mock(return_value=None)
+
             return bot
 
     @pytest.fixture
@@ -51,6 +63,8 @@ class TestTranslatorBot:
         payload.channel_id = 789
         payload.message_id = 101112
         payload.user_id = 131415
+        payload.guild_id = 123456
+        payload.member = None
 
         # Properly mock the emoji string representation
         payload.emoji.name = '🇫🇷'
@@ -94,7 +108,7 @@ class TestTranslatorBot:
     async def test_on_raw_reaction_add_successful_translation(self, bot, mock_payload, mock_channel, mock_message):
         """Test successful translation flow"""
         # Clear the translation cache
-        bot.translation_cache = {}
+        bot.translation_cache.clear()
         # Mock bot user
         mock_user = Mock()
         mock_user.id = 999999  # Different from payload.user_id (which is 131415 in the fixture)
@@ -122,7 +136,7 @@ class TestTranslatorBot:
             await bot.on_raw_reaction_add(mock_payload)
 
             # Debug print to see what's happening
-            mock_translate.assert_called_once_with("Hello world", "french")
+            mock_translate.assert_called_once_with("Hello world", "french", client=bot.ollama_client)
             mock_message.reply.assert_called_once_with(
                 f"Translation (french):\n{translated_text}",
                 mention_author=False
@@ -137,12 +151,80 @@ class TestTranslatorBot:
         await bot.on_raw_reaction_add(mock_payload)
         bot.fetch_channel.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_non_flag_reaction_makes_no_api_calls(self, bot, mock_payload):
+        """Test that non-flag reactions are rejected before any channel, message or user lookup"""
+        mock_payload.emoji.__str__ = Mock(return_value='👍')
+        bot._connection.user.id = 999999
+        bot.fetch_channel = AsyncMock()
+        bot.fetch_user = AsyncMock()
+
+        await bot.on_raw_reaction_add(mock_payload)
+
+        bot.get_channel.assert_not_called()
+        bot.fetch_channel.assert_not_called()
+        bot.fetch_user.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cached_channel_member_and_message_skip_rest(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that gateway-cached channel, payload member and recently fetched message avoid REST calls"""
+        bot.translation_cache.clear()
+        bot._connection.user.id = 999999
+        bot.authorized_guilds = None
+
+        bot.get_channel = Mock(return_value=mock_channel)
+        bot.fetch_channel = AsyncMock()
+        bot.fetch_user = AsyncMock()
+        mock_payload.member = Mock(id=mock_payload.user_id)
+        mock_payload.member.name = "Test User"
+        bot.message_cache.put(mock_payload.message_id, mock_message)
+
+        with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            mock_translate.return_value = "Bonjour le monde"
+            await bot.on_raw_reaction_add(mock_payload)
+
+        bot.fetch_channel.assert_not_called()
+        bot.fetch_user.assert_not_called()
+        mock_channel.fetch_message.assert_not_called()
+        mock_message.reply.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_fetched_message_is_cached_until_edited(self, bot, mock_channel, mock_message):
+        """Test that fetched messages are reused and dropped when edited"""
+        mock_channel.fetch_message.return_value = mock_message
+
+        assert await bot._get_message(mock_channel, 101112) is mock_message
+        assert await bot._get_message(mock_channel, 101112) is mock_message
+        assert mock_channel.fetch_message.call_count == 1
+
+        await bot.on_raw_message_edit(Mock(message_id=101112))
+        await bot._get_message(mock_channel, 101112)
+        assert mock_channel.fetch_message.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("content", ["Good morning everyone, how is it going?", "https://example.com 🎉"])
+    async def test_skips_messages_not_needing_translation(self, bot, mock_payload, mock_channel, mock_message, content):
+        """Test that messages already in the target language, or with no text, never reach the model"""
+        mock_payload.emoji.__str__ = Mock(return_value='🇺🇸')
+        bot._connection.user.id = 999999
+        bot.authorized_guilds = None
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_message.content = content
+        mock_channel.fetch_message.return_value = mock_message
+        bot.fetch_user = AsyncMock()
+
+        with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            await bot.on_raw_reaction_add(mock_payload)
+
+        mock_translate.assert_not_called()
+        mock_message.reply.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_on_raw_reaction_add_translation_failure(self, bot, mock_payload, mock_channel, mock_message):
         """Test handling of translation failure"""
 
         # Clear the translation cache
-        bot.translation_cache = {}
+        bot.translation_cache.clear()
 
         # Mock bot user
         mock_user = Mock()
@@ -218,6 +300,35 @@ class TestTranslatorBot:
         assert "!version" in response
         assert "!info" in response
         assert "!languages" in response
+        assert "!stats" in response
+
+    @pytest.mark.asyncio
+    async def test_stats_command_reports_metrics(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that stage timings and counters recorded while translating appear in !stats"""
+        bot.metrics.reset()
+        bot.translation_cache.clear()
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_channel.fetch_message.return_value = mock_message
+        bot.fetch_user = AsyncMock(return_value=Mock(id=mock_payload.user_id))
+
+        with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            mock_translate.return_value = "Bonjour le monde"
+            await bot.on_raw_reaction_add(mock_payload)
+            await bot.on_raw_reaction_add(mock_payload)  # Dropped by the cooldown
+
+        assert bot.metrics.value('translator_reactions_total', outcome='translated') == 1
+        assert bot.metrics.value('translator_cooldown_drops_total') == 1
+        assert bot.metrics.value('translator_cache_requests_total', cache='result', result='miss') == 1
+        for stage in ('fetch_channel', 'fetch_message', 'fetch_user', 'queue', 'reply', 'total'):
+            assert bot.metrics.histogram('translator_stage_seconds', stage=stage).count == 1
+
+        ctx = AsyncMock()
+        await bot.get_command('stats')(ctx)
+        response = ctx.send.call_args[0][0]
+        assert "Translation Stats" in response
+        assert "translated 1" in response
+        assert "cooldown 1" in response
+        assert "fetch_message" in response
 
 
     @pytest.mark.asyncio
@@ -242,7 +353,7 @@ class TestTranslatorBot:
     async def test_translation_cache_behavior(self, bot, mock_payload, mock_channel, mock_message):
         """Test that translation caching prevents duplicate translations"""
         # Clear the translation cache
-        bot.translation_cache = {}
+        bot.translation_cache.clear()
 
         # Mock bot user
         mock_user = Mock()
@@ -283,6 +394,430 @@ class TestTranslatorBot:
             assert mock_translate.call_count == 1
 
 
+    @pytest.mark.asyncio
+    async def test_result_cache_serves_repeat_translation(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a repeat translation after the cooldown is served from the result cache"""
+        bot.translation_cache.clear()
+
+        mock_user = Mock()
+        mock_user.id = 999999
+        bot._connection = Mock()
+        bot._connection.user = mock_user
+
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_channel.fetch_message.return_value = mock_message
+        bot.fetch_user = AsyncMock(return_value=Mock(id=mock_payload.user_id))
+        bot.authorized_guilds = None
+
+        with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            mock_translate.return_value = "Bonjour le monde"
+
+            await bot.on_raw_reaction_add(mock_payload)
+            # Expire the cooldown so the second reaction is processed
+            bot.translation_cache.clear()
+            await bot.on_raw_reaction_add(mock_payload)
+
+            assert mock_translate.call_count == 1
+            mock_message.reply.assert_called_once()  # The existing reply already shows the translation
+            assert bot.result_cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reactions_translate_and_reply_once(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that simultaneous reactions on one message share a single translation and reply"""
+        bot.translation_cache.clear()
+
+        mock_user = Mock()
+        mock_user.id = 999999
+        bot._connection = Mock()
+        bot._connection.user = mock_user
+
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_channel.fetch_message.return_value = mock_message
+        bot.fetch_user = AsyncMock(return_value=Mock(id=mock_payload.user_id))
+        bot.authorized_guilds = None
+
+        async def slow_translate(text, language, client=None):
+            await asyncio.sleep(0.01)
+            return "Bonjour le monde"
+
+        with patch('discord_translator.bot.translate_text', side_effect=slow_translate) as mock_translate:
+            await asyncio.gather(*(bot.on_raw_reaction_add(mock_payload) for _ in range(3)))
+
+            assert mock_translate.call_count == 1
+            mock_message.reply.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_texts_share_model_call(self, bot):
+        """Test that the same text requested concurrently from different messages calls the model once"""
+        async def slow_translate(text, language, client=None):
+            await asyncio.sleep(0.01)
+            return "Bonjour"
+
+        with patch('discord_translator.bot.translate_text', side_effect=slow_translate) as mock_translate:
+            results = await asyncio.gather(bot._translate("Hello", "french"), bot._translate("Hello ", "french"))
+
+        assert results == ["Bonjour", "Bonjour"]
+        assert mock_translate.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds_with_reaction(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a full translation queue reacts with an hourglass instead of replying"""
+        bot.translation_cache.clear()
+
+        mock_user = Mock()
+        mock_user.id = 999999
+        bot._connection = Mock()
+        bot._connection.user = mock_user
+
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_channel.fetch_message.return_value = mock_message
+        bot.fetch_user = AsyncMock(return_value=Mock(id=mock_payload.user_id))
+        bot.authorized_guilds = None
+        bot.scheduler.run = AsyncMock(side_effect=QueueFullError("full"))
+
+        await bot.on_raw_reaction_add(mock_payload)
+
+        mock_message.add_reaction.assert_called_once_with('⏳')
+        mock_message.reply.assert_not_called()
+        assert (mock_payload.message_id, "french") not in bot.translation_cache
+
+    def _prepare_reaction(self, bot, mock_payload, mock_channel, mock_message):
+        bot._connection = Mock()
+        bot._connection.user = Mock(id=999999)
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_channel.fetch_message.return_value = mock_message
+        mock_channel.typing.return_value.__aexit__ = AsyncMock(return_value=False)  # Let cancellation through
+        bot.fetch_user = AsyncMock(return_value=Mock(id=mock_payload.user_id))
+        bot.authorized_guilds = None
+
+    @pytest.mark.asyncio
+    async def test_removed_reaction_cancels_translation(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that removing the only flag cancels its running translation without replying"""
+        self._prepare_reaction(bot, mock_payload, mock_channel, mock_message)
+        cancelled_before = bot.metrics.value('translator_reactions_total', outcome='cancelled')
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow_translate(text, language, client=None):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with patch('discord_translator.bot.translate_text', side_effect=slow_translate):
+            reaction = asyncio.create_task(bot.on_raw_reaction_add(mock_payload))
+            await started.wait()
+            await bot.on_raw_reaction_remove(mock_payload)
+            await asyncio.wait_for(reaction, 1)
+
+        assert cancelled.is_set()
+        mock_message.reply.assert_not_called()
+        mock_message.add_reaction.assert_not_called()
+        assert (mock_payload.message_id, "french") not in bot.translation_cache
+        assert not bot.requesters and not bot.reply_flights and bot.scheduler.active == 0
+        assert bot.metrics.value('translator_reactions_total', outcome='cancelled') == cancelled_before + 1
+
+    @pytest.mark.asyncio
+    async def test_translation_continues_while_another_reaction_wants_it(self, bot, mock_payload, mock_channel,
+                                                                         mock_message):
+        """Test that removing one of two users' flags leaves the translation running for the other"""
+        self._prepare_reaction(bot, mock_payload, mock_channel, mock_message)
+        other = self._flag_payload(mock_payload, '🇫🇷')
+        other.user_id = 555
+
+        async def slow_translate(text, language, client=None):
+            await asyncio.sleep(0.05)
+            return "Bonjour le monde"
+
+        with patch('discord_translator.bot.translate_text', side_effect=slow_translate):
+            reactions = asyncio.gather(bot.on_raw_reaction_add(mock_payload), bot.on_raw_reaction_add(other))
+            await asyncio.sleep(0.01)
+            await bot.on_raw_reaction_remove(mock_payload)
+            await reactions
+
+        mock_message.reply.assert_called_once_with("Translation (french):\nBonjour le monde", mention_author=False)
+
+    @pytest.mark.asyncio
+    async def test_deleted_message_cancels_every_language(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that deleting a message cancels the translations in progress for all its languages"""
+        self._prepare_reaction(bot, mock_payload, mock_channel, mock_message)
+        calls = []
+
+        async def slow_translate(text, language, client=None):
+            calls.append(language)
+            await asyncio.sleep(10)
+
+        with patch('discord_translator.bot.translate_text', side_effect=slow_translate):
+            reactions = asyncio.gather(
+                bot.on_raw_reaction_add(mock_payload),
+                bot.on_raw_reaction_add(self._flag_payload(mock_payload, '🇩🇪')),
+            )
+            while len(calls) < 2:
+                await asyncio.sleep(0)
+            await bot.on_raw_message_delete(Mock(message_id=mock_payload.message_id, channel_id=789))
+            await asyncio.wait_for(reactions, 1)
+
+        mock_message.reply.assert_not_called()
+        assert not bot.reply_flights and not bot.translation_flights and bot.scheduler.active == 0
+
+    @pytest.mark.asyncio
+    async def test_languages_share_one_edited_reply(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a second language is edited into the first reply instead of posting another"""
+        self._prepare_reaction(bot, mock_payload, mock_channel, mock_message)
+        mock_message.id = mock_payload.message_id
+
+        async def translate(text, language, client=None):
+            return {"french": "Bonjour le monde", "german": "Hallo Welt"}[language]
+
+        with patch('discord_translator.bot.translate_text', side_effect=translate):
+            await bot.on_raw_reaction_add(mock_payload)
+            await bot.on_raw_reaction_add(self._flag_payload(mock_payload, '🇩🇪'))
+
+        mock_message.reply.assert_called_once_with("Translation (french):\nBonjour le monde", mention_author=False)
+        mock_message.reply.return_value.edit.assert_called_once_with(
+            content="Translation (french):\nBonjour le monde\n\nTranslation (german):\nHallo Welt"
+        )
+        assert bot.reply_index.get(mock_message.id).messages == [mock_message.reply.return_value]
+
+    @pytest.mark.asyncio
+    async def test_reply_updates_are_coalesced_per_channel(self, bot, mock_message):
+        """Test that translations finishing while a reply is being sent are merged into one edit"""
+        mock_message.id = 1
+        reply = AsyncMock()
+
+        async def slow_reply(content, **kwargs):
+            await asyncio.sleep(0.02)
+            return reply
+
+        mock_message.reply.side_effect = slow_reply
+        first = asyncio.create_task(bot._add_to_reply(789, mock_message, [("french", "Bonjour")]))
+        await asyncio.sleep(0.01)  # The first reply is being posted
+        await asyncio.gather(
+            first,
+            bot._add_to_reply(789, mock_message, [("german", "Hallo")]),
+            bot._add_to_reply(789, mock_message, [("spanish", "Hola")]),
+        )
+
+        mock_message.reply.assert_called_once_with("Translation (french):\nBonjour", mention_author=False)
+        reply.edit.assert_called_once_with(content="Translation (french):\nBonjour\n\nTranslation (german):\nHallo"
+                                                   "\n\nTranslation (spanish):\nHola")
+
+    @pytest.mark.asyncio
+    async def test_reply_error_reaches_its_caller(self, bot, mock_message):
+        """Test that a failed reply is raised to the caller whose message it was"""
+        mock_message.id = 1
+        mock_message.reply.side_effect = discord.errors.Forbidden(Mock(status=403, reason="Forbidden"), "denied")
+
+        with pytest.raises(discord.errors.Forbidden):
+            await bot._add_to_reply(789, mock_message, [("french", "Bonjour")])
+
+    @pytest.mark.asyncio
+    async def test_reaction_is_traced(self, bot, mock_payload, mock_channel, mock_message, tmp_path):
+        """Test that a traced reaction records a span for every stage from the emoji filter to the reply"""
+        self._prepare_reaction(bot, mock_payload, mock_channel, mock_message)
+        path = tmp_path / 'traces.jsonl'
+        bot.tracer.configure(str(path), sample_rate=1.0)
+        try:
+            with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+                mock_translate.return_value = "Bonjour le monde"
+                await bot.on_raw_reaction_add(mock_payload)
+            await bot.tracer.flush()
+        finally:
+            bot.tracer.configure(None)
+
+        with open(path, encoding='utf-8') as f:
+            spans = [json.loads(line) for line in f]
+        names = {span['name'] for span in spans}
+        assert {'reaction', 'emoji_filter', 'guild_check', 'fetch_channel', 'fetch_message', 'fetch_user',
+                'cache_lookup', 'queue_wait', 'reply'} <= names
+        root = next(span for span in spans if span['name'] == 'reaction')
+        assert root['tags']['language'] == 'french'
+        assert len({span['traceId'] for span in spans}) == 1
+
+    @pytest.mark.asyncio
+    async def test_streaming_reply_is_posted_then_edited(self, bot, mock_message):
+        """Test that streaming posts after the first sentence and edits in the rest"""
+        bot.stream_translations = True
+        bot.stream_edit_interval = 0
+        reply = AsyncMock()
+        mock_message.reply.return_value = reply
+
+        async def fake_stream(text, language, client):
+            for partial in ("Bonjour", "Bonjour. Comment", "Bonjour. Comment allez-vous ?"):
+                yield partial
+
+        with patch('discord_translator.bot.stream_translation', side_effect=fake_stream):
+            translated_text, posted = await bot._stream_translate(mock_message, "french")
+
+        assert translated_text == "Bonjour. Comment allez-vous ?"
+        assert posted is reply
+        mock_message.reply.assert_called_once_with("Translation (french):\nBonjour. Comment", mention_author=False)
+        reply.edit.assert_called_once_with(content="Translation (french):\nBonjour. Comment allez-vous ?")
+        assert bot.result_cache.get(make_cache_key("Hello world", "french", bot.ollama_model)) == translated_text
+
+    @pytest.mark.asyncio
+    async def test_streaming_failure_removes_partial_reply(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a stream failing after the first sentence deletes the partial reply and flags the failure"""
+        bot.stream_translations = True
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_channel.fetch_message.return_value = mock_message
+        bot.fetch_user = AsyncMock(return_value=Mock(id=mock_payload.user_id))
+        reply = AsyncMock()
+        mock_message.reply.return_value = reply
+
+        async def fake_stream(text, language, client):
+            yield "Bonjour."
+            raise aiohttp.ClientPayloadError("connection lost")
+
+        with patch('discord_translator.bot.stream_translation', side_effect=fake_stream):
+            await bot.on_raw_reaction_add(mock_payload)
+
+        mock_message.reply.assert_called_once()
+        reply.delete.assert_called_once()
+        mock_message.add_reaction.assert_called_once_with('❌')
+        assert bot.result_cache.get(make_cache_key("Hello world", "french", bot.ollama_model)) is None
+
+    @pytest.mark.asyncio
+    async def test_streamed_reply_receives_later_languages(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a streamed reply is indexed so the next language is edited into it"""
+        self._prepare_reaction(bot, mock_payload, mock_channel, mock_message)
+        bot.stream_translations = True
+        mock_message.id = mock_payload.message_id
+        reply = AsyncMock()
+        mock_message.reply.return_value = reply
+
+        async def fake_stream(text, language, client):
+            yield "Bonjour le monde."
+
+        with patch('discord_translator.bot.stream_translation', side_effect=fake_stream), \
+                patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            mock_translate.return_value = "Hallo Welt."
+            await bot.on_raw_reaction_add(mock_payload)
+            await bot.on_raw_reaction_add(self._flag_payload(mock_payload, '🇩🇪'))
+
+        mock_message.reply.assert_called_once_with("Translation (french):\nBonjour le monde.", mention_author=False)
+        reply.edit.assert_called_once_with(
+            content="Translation (french):\nBonjour le monde.\n\nTranslation (german):\nHallo Welt."
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_flags_share_the_streamed_reply(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a language requested while another is streaming is edited into the streamed reply"""
+        self._prepare_reaction(bot, mock_payload, mock_channel, mock_message)
+        bot.stream_translations = True
+        mock_message.id = mock_payload.message_id
+        reply = AsyncMock()
+        mock_message.reply.return_value = reply
+
+        async def fake_stream(text, language, client):
+            await asyncio.sleep(0.01)
+            yield "Bonjour le monde."
+
+        with patch('discord_translator.bot.stream_translation', side_effect=fake_stream), \
+                patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            mock_translate.return_value = "Hallo Welt."
+            await asyncio.gather(
+                bot.on_raw_reaction_add(mock_payload),
+                bot.on_raw_reaction_add(self._flag_payload(mock_payload, '🇩🇪')),
+            )
+
+        mock_message.reply.assert_called_once_with("Translation (french):\nBonjour le monde.", mention_author=False)
+        reply.edit.assert_called_once_with(
+            content="Translation (french):\nBonjour le monde.\n\nTranslation (german):\nHallo Welt."
+        )
+        assert list(bot.reply_index.get(mock_message.id).translations) == ['french', 'german']
+
+    @pytest.mark.asyncio
+    async def test_long_streamed_translation_is_split(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a streamed translation outgrowing one message stops being edited and is split at the end"""
+        self._prepare_reaction(bot, mock_payload, mock_channel, mock_message)
+        bot.stream_translations = True
+        bot.stream_edit_interval = 0
+        mock_message.id = mock_payload.message_id
+        reply = AsyncMock()
+        mock_message.reply.return_value = reply
+        sentence = "Bonjour le monde. "
+
+        async def fake_stream(text, language, client):
+            for count in (1, 50, 100, 150):
+                yield (sentence * count).strip()
+
+        with patch('discord_translator.bot.stream_translation', side_effect=fake_stream):
+            await bot.on_raw_reaction_add(mock_payload)
+
+        contents = [call.args[0] for call in mock_message.reply.call_args_list]
+        contents += [call.kwargs['content'] for call in reply.edit.call_args_list]
+        assert all(len(content) <= 2000 for content in contents)
+        assert mock_message.reply.call_count == 2  # The streamed reply and the overflow chunk
+        state = bot.reply_index.get(mock_message.id)
+        assert len(state.messages) == 2 and state.contents == state.render()
+        mock_message.add_reaction.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_streaming_short_translation_replies_at_end(self, bot, mock_message):
+        """Test that a translation with no sentence break is posted once complete"""
+        async def fake_stream(text, language, client):
+            for partial in ("Bon", "Bonjour"):
+                yield partial
+
+        with patch('discord_translator.bot.stream_translation', side_effect=fake_stream):
+            translated_text, posted = await bot._stream_translate(mock_message, "french")
+
+        assert translated_text == "Bonjour"
+        assert posted is None
+        mock_message.reply.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_long_message_translated_by_segment(self, bot):
+        """Test that long messages are split, translated concurrently and reassembled in order"""
+        bot.segment_max_chars = 20
+        text = "First paragraph.\n\n```\ncode\n```\n\nSecond paragraph.\n\nFirst paragraph."
+        in_flight = 0
+        peak = 0
+
+        async def fake_translate(segment, language, client=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return segment.upper()
+
+        with patch('discord_translator.bot.translate_text', side_effect=fake_translate) as mock_translate:
+            result = await bot._translate(text, "french")
+
+        assert result == "FIRST PARAGRAPH.\n\n```\ncode\n```\n\nSECOND PARAGRAPH.\n\nFIRST PARAGRAPH."
+        # The repeated paragraph is translated once
+        assert sorted(call.args[0] for call in mock_translate.call_args_list) == ["First paragraph.", "Second paragraph."]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_segment_fails_translation(self, bot):
+        """Test that a failure in any segment fails the whole message"""
+        bot.segment_max_chars = 20
+        text = "First paragraph.\n\nSecond paragraph."
+
+        async def fake_translate(segment, language, client=None):
+            return None if segment.startswith("Second") else segment
+
+        with patch('discord_translator.bot.translate_text', side_effect=fake_translate):
+            assert await bot._translate(text, "french") is None
+
+    @pytest.mark.asyncio
+    async def test_translation_store_fallback(self, bot):
+        """Test that a result cache miss is served from the persistent store"""
+        bot.translation_store = Mock()
+        bot.translation_store.get = AsyncMock(return_value="Bonjour le monde")
+
+        with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            result = await bot._translate("Hello world", "french")
+
+        assert result == "Bonjour le monde"
+        mock_translate.assert_not_called()
+        assert bot.result_cache.get(make_cache_key("Hello world", "french", bot.ollama_model)) == "Bonjour le monde"
+
     @pytest.mark.asyncio
     async def test_translation_cache_cleanup(self, bot):
         """Test that old cache entries are removed"""
@@ -290,14 +825,12 @@ class TestTranslatorBot:
         old_time = time.time() - 3601  # Older than 1 hour
         current_time = time.time()
 
-        bot.translation_cache = {
-            ('msg1', 'french'): old_time,  # Should be removed
-            ('msg2', 'spanish'): current_time,  # Should stay
-            ('msg3', 'german'): old_time  # Should be removed
-        }
+        bot.translation_cache[('msg1', 'french')] = old_time  # Should be removed
+        bot.translation_cache[('msg2', 'spanish')] = current_time  # Should stay
+        bot.translation_cache[('msg3', 'german')] = old_time  # Should be removed
 
         # Run cleanup
-        bot._cleanup_translation_cache()
+        assert bot._cleanup_translation_cache() == 2
 
         # Verify old entries were removed
         assert ('msg1', 'french') not in bot.translation_cache
@@ -326,13 +859,274 @@ class TestTranslatorBot:
     async def test_unauthorized_guild(self, bot, mock_payload, mock_channel):
         """Test rejection of unauthorized guild"""
         # Set up authorized guilds
-        bot.authorized_guilds = [999]  # Different from mock_channel.guild.id
+        bot.authorized_guilds = {999}  # Different from mock_payload.guild_id
 
         bot.fetch_channel = AsyncMock(return_value=mock_channel)
 
         with patch('discord_translator.bot.translate_text') as mock_translate:
             await bot.on_raw_reaction_add(mock_payload)
             mock_translate.assert_not_called()
+            bot.fetch_channel.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_spans_processes(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a translation and its cooldown are seen by a bot running other shards"""
+        with patch.dict('os.environ', {'AUTHORIZED_GUILDS': ''}):
+            other = TranslatorBot()
+        other._connection = bot._connection
+        bot.shared_cache = other.shared_cache = MemoryCacheBackend()
+        for instance in (bot, other):
+            instance.get_channel = Mock(return_value=None)
+            instance.get_user = Mock(return_value=None)
+            instance.fetch_channel = AsyncMock(return_value=mock_channel)
+            instance.fetch_user = AsyncMock(return_value=Mock(id=mock_payload.user_id))
+        mock_channel.fetch_message.return_value = mock_message
+
+        with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            mock_translate.return_value = "Bonjour le monde"
+            await bot.on_raw_reaction_add(mock_payload)
+            # Within the cooldown the other process ignores the reaction
+            await other.on_raw_reaction_add(mock_payload)
+            assert mock_message.reply.call_count == 1
+
+            # After the cooldown it reuses the shared translation instead of calling the model
+            await other.shared_cache.set('cooldown', f'{mock_payload.message_id}:french', '0', ttl=60)
+            await other.on_raw_reaction_add(mock_payload)
+
+        assert mock_translate.call_count == 1
+        assert mock_message.reply.call_count == 2
+        assert other.result_cache.get(make_cache_key("Hello world", "french", other.ollama_model)) == "Bonjour le monde"
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_user_gets_reaction_without_fetches(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that requests over the user limit are refused before any REST call, reacting once"""
+        bot.rate_limiter = RateLimiter({'user': TokenBucketLimiter(capacity=1, per=60)})
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_channel.fetch_message.return_value = mock_message
+        bot.fetch_user = AsyncMock(return_value=Mock(id=mock_payload.user_id))
+        partial_message = AsyncMock()
+        bot.get_partial_messageable = Mock(return_value=Mock(get_partial_message=Mock(return_value=partial_message)))
+
+        with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            mock_translate.return_value = "Bonjour le monde"
+            await bot.on_raw_reaction_add(mock_payload)
+            mock_payload.emoji.__str__ = Mock(return_value='🇩🇪')
+            await bot.on_raw_reaction_add(mock_payload)
+            await bot.on_raw_reaction_add(mock_payload)
+
+        assert mock_translate.call_count == 1
+        assert bot.fetch_channel.call_count == 1
+        partial_message.add_reaction.assert_called_once_with('🐢')
+
+    def _flag_payload(self, payload, flag):
+        """Copy of payload reacting with another flag"""
+        other = Mock(spec=discord.RawReactionActionEvent)
+        for name in ('channel_id', 'message_id', 'user_id', 'guild_id', 'member'):
+            setattr(other, name, getattr(payload, name))
+        other.emoji = Mock(spec=discord.PartialEmoji)
+        other.emoji.__str__ = Mock(return_value=flag)
+        return other
+
+    def _enable_fanout(self, bot, mock_channel, mock_message, window=0.01):
+        bot.fanout_window = window
+        bot.fanout.window = window
+        bot.fetch_channel = AsyncMock(return_value=mock_channel)
+        mock_channel.fetch_message.return_value = mock_message
+        bot.fetch_user = AsyncMock(return_value=Mock(id=131415))
+        mock_message.id = 101112
+
+    @pytest.mark.asyncio
+    async def test_fanout_translates_flags_in_one_call_and_reply(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that flags within the window share one multi-language call and one consolidated reply"""
+        self._enable_fanout(bot, mock_channel, mock_message)
+
+        with patch('discord_translator.bot.translate_text_multi', new_callable=AsyncMock) as mock_multi:
+            mock_multi.return_value = {"french": "Bonjour", "german": "Hallo"}
+            await asyncio.gather(
+                bot.on_raw_reaction_add(mock_payload),
+                bot.on_raw_reaction_add(self._flag_payload(mock_payload, '🇩🇪')),
+            )
+
+        mock_multi.assert_called_once()
+        assert mock_multi.call_args[0][1] == ["french", "german"]
+        mock_message.reply.assert_called_once_with(
+            "Translation (french):\nBonjour\n\nTranslation (german):\nHallo", mention_author=False
+        )
+
+    @pytest.mark.asyncio
+    async def test_fanout_late_flags_edit_the_reply(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a repeat flag during translation is not re-posted and a later flag edits the reply"""
+        self._enable_fanout(bot, mock_channel, mock_message)
+
+        async def slow_translate(text, language, client=None):
+            await asyncio.sleep(0.05)
+            return {"french": "Bonjour", "spanish": "Hola"}[language]
+
+        with patch('discord_translator.bot.translate_text', side_effect=slow_translate) as mock_translate:
+            first = asyncio.create_task(bot.on_raw_reaction_add(mock_payload))
+            await asyncio.sleep(0.02)  # Window closed, translation in progress
+            repeat = self._flag_payload(mock_payload, '🇫🇷')
+            repeat.user_id = 555
+            await asyncio.gather(first, bot.on_raw_reaction_add(repeat))
+            await bot.on_raw_reaction_add(self._flag_payload(mock_payload, '🇪🇸'))
+
+        assert mock_translate.call_count == 2
+        mock_message.reply.assert_called_once_with("Translation (french):\nBonjour", mention_author=False)
+        mock_message.reply.return_value.edit.assert_called_once_with(
+            content="Translation (french):\nBonjour\n\nTranslation (spanish):\nHola"
+        )
+
+    @pytest.mark.asyncio
+    async def test_fanout_long_reply_is_split(self, bot, mock_payload, mock_channel, mock_message):
+        """Test that a consolidated reply over 2000 characters is posted as several messages"""
+        self._enable_fanout(bot, mock_channel, mock_message)
+        long_text = "mot " * 400
+
+        with patch('discord_translator.bot.translate_text_multi', new_callable=AsyncMock) as mock_multi:
+            mock_multi.return_value = {"french": long_text, "german": long_text}
+            await asyncio.gather(
+                bot.on_raw_reaction_add(mock_payload),
+                bot.on_raw_reaction_add(self._flag_payload(mock_payload, '🇩🇪')),
+            )
+
+        assert mock_message.reply.call_count == 2
+        assert all(len(call.args[0]) <= 2000 for call in mock_message.reply.call_args_list)
+        mock_message.add_reaction.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_subscribe_command_resolves_flags_and_names(self, bot):
+        """Test that !subscribe accepts flags and language names and rejects unknown ones"""
+        ctx = Mock(channel=Mock(id=789), send=AsyncMock())
+        subscribe = bot.get_command('subscribe').callback
+
+        await subscribe(ctx, '🇫🇷', 'German', '🇺🇸')
+        await subscribe(ctx, 'klingon')
+
+        assert bot.subscriptions.get(789) == ["french", "german", "english"]
+        assert "klingon" in ctx.send.call_args_list[-1].args[0]
+
+        await bot.get_command('unsubscribe').callback(ctx, 'english')
+        assert bot.subscriptions.get(789) == ["french", "german"]
+
+    def _channel_message(self, mock_channel, message_id, content):
+        message = AsyncMock(spec=discord.Message)
+        message.id = message_id
+        message.content = content
+        message.author = Mock(bot=False)
+        message.guild = mock_channel.guild
+        message.channel = mock_channel
+        mock_channel.id = 789
+        return message
+
+    @pytest.mark.asyncio
+    async def test_subscribed_channel_messages_are_translated_in_one_batch(self, bot, mock_channel):
+        """Test that a burst of messages in a subscribed channel shares one model call per language"""
+        bot.process_commands = AsyncMock()
+        bot.auto_translator.delay = 0.01
+        bot.subscriptions.add(789, ["french"])
+        messages = [self._channel_message(mock_channel, 1, "Good morning"),
+                    self._channel_message(mock_channel, 2, "How are you?")]
+        command = self._channel_message(mock_channel, 3, "!stats")
+
+        with patch('discord_translator.bot.translate_batch', new_callable=AsyncMock) as mock_batch:
+            mock_batch.return_value = ["Bonjour", "Comment ça va ?"]
+            for message in messages + [command]:
+                await bot.on_message(message)
+            await asyncio.sleep(0.05)
+
+        assert bot.process_commands.call_count == 3
+        mock_batch.assert_called_once()
+        assert mock_batch.call_args[0][:2] == (["Good morning", "How are you?"], "french")
+        messages[0].reply.assert_called_once_with("Translation (french):\nBonjour", mention_author=False)
+        messages[1].reply.assert_called_once_with("Translation (french):\nComment ça va ?", mention_author=False)
+        assert bot.translation_cache.get((1, "french")) is not None
+
+    @pytest.mark.asyncio
+    async def test_unsubscribed_and_bot_messages_are_not_translated(self, bot, mock_channel):
+        """Test that only human messages in subscribed channels are queued"""
+        bot.process_commands = AsyncMock()
+        message = self._channel_message(mock_channel, 1, "Good morning")
+        await bot.on_message(message)
+
+        bot.subscriptions.add(789, ["french"])
+        message.author.bot = True
+        await bot.on_message(message)
+
+        assert bot.auto_translator.pending(789) == 0
+
+    @pytest.mark.asyncio
+    async def test_warm_up_logs_cold_start_before_ready(self, bot, caplog):
+        """Test that the warm-up logs each endpoint's cold start and on_ready reports the model healthy"""
+        bot.ollama_client.warm_up = AsyncMock(return_value={
+            "http://a:11434/api/generate": (4.2, 0.3),
+            "http://b:11434/api/generate": aiohttp.ClientConnectionError("refused"),
+        })
+
+        with caplog.at_level(logging.INFO):
+            await bot._warm_up_model()
+            await bot.on_ready()
+
+        assert bot.model_warm
+        assert "Cold start of llama3.1:8b on http://a:11434/api/generate: loaded in 4.20s" in caplog.text
+        assert "Warm-up of llama3.1:8b on http://b:11434/api/generate failed" in caplog.text
+        assert "Healthy: llama3.1:8b is loaded" in caplog.text
+
+    def test_config_is_injected(self):
+        """Test that a config passed by run_bot is used instead of the environment"""
+        with patch.dict('os.environ', {'OLLAMA_MODEL': 'ignored'}):
+            bot = TranslatorBot(config=Config(ollama_model='qwen2.5:7b', keep_alive='1h'))
+
+        assert bot.ollama_model == 'qwen2.5:7b'
+        assert all(backend.client.keep_alive == '1h' for backend in bot.ollama_client.backends)
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_text_reuses_translation_memory(self, bot):
+        """Test that a near-identical message is served from the translation memory without a model call"""
+        with patch('discord_translator.bot.translate_text', new_callable=AsyncMock) as mock_translate:
+            mock_translate.return_value = "Bonjour à tous !"
+            first = await bot._translate("good morning everyone!", "french")
+            second = await bot._translate("Good morning everyone", "french")
+
+        assert first == second == "Bonjour à tous !"
+        mock_translate.assert_called_once()
+        assert bot.metrics.value('translator_cache_requests_total', cache='memory', result='hit') >= 1
+
+    def test_shards_from_environment(self):
+        """Test that SHARD_IDS and SHARD_COUNT select the shards a process runs"""
+        with patch.dict('os.environ', {'SHARD_IDS': '2,3', 'SHARD_COUNT': '4'}):
+            bot = TranslatorBot()
+        assert bot.shard_ids == [2, 3]
+        assert bot.shard_count == 4
+
+    def test_each_shard_process_gets_its_own_metrics_port(self):
+        """Test that METRICS_PORT is offset by the process index so shard processes do not collide"""
+        with patch.dict('os.environ', {'METRICS_PORT': '9100'}):
+            ports = [TranslatorBot(process_index=index).metrics_server.port for index in range(3)]
+        assert ports == [9100, 9101, 9102]
+
+    @pytest.mark.asyncio
+    async def test_close_without_connecting(self):
+        """Test that a bot that never reached the gateway closes cleanly"""
+        with patch.dict('os.environ', {'AUTHORIZED_GUILDS': ''}):
+            bot = TranslatorBot()
+        await bot.close()
+
+    @pytest.mark.parametrize("shard_count, processes, expected", [
+        (4, 2, [[0, 1], [2, 3]]),
+        (5, 2, [[0, 1, 2], [3, 4]]),
+        (2, 4, [[0], [1]]),
+    ])
+    def test_shard_groups(self, shard_count, processes, expected):
+        """Test that shards are split into contiguous groups, one per process"""
+        assert shard_groups(shard_count, processes) == expected
+
+    def test_discord_logs_only_go_through_the_queue(self):
+        """Test that discord.py is not given a handler of its own next to the queued root handler"""
+        with patch('discord_translator.bot.configure_logging_from_env'), \
+                patch('discord_translator.bot.TranslatorBot') as bot_class:
+            _run_shard_group('token')
+
+        bot_class.return_value.run.assert_called_once_with('token', log_handler=None)
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+from discord_translator.cache import LRUCache, TranslationCache, make_cache_key
+
+
+class TestCacheKey:
+    def test_key_ignores_surrounding_whitespace(self):
+        """Test that keys are computed from normalized text"""
+        assert make_cache_key("Hello world", "french", "llama") == make_cache_key("  Hello world\n", "french", "llama")
+
+    def test_key_normalizes_unicode(self):
+        """Test that composed and decomposed forms share a key"""
+        assert make_cache_key("café", "english", "llama") == make_cache_key("café", "english", "llama")
+
+    def test_key_depends_on_language_and_model(self):
+        """Test that language and model are part of the key"""
+        base = make_cache_key("Hello", "french", "llama")
+        assert base != make_cache_key("Hello", "german", "llama")
+        assert base != make_cache_key("Hello", "french", "mistral")
+
+
+class TestTranslationCache:
+    def test_put_and_get(self):
+        """Test that stored translations are returned and counted as hits"""
+        cache = TranslationCache()
+        cache.put("k", "Bonjour")
+
+        assert cache.get("k") == "Bonjour"
+        assert cache.get("missing") is None
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_lru_eviction_by_bytes(self):
+        """Test that least recently used entries are evicted to respect the byte budget"""
+        cache = TranslationCache(max_bytes=30)
+        cache.put("a", "x" * 9)  # 10 bytes
+        cache.put("b", "x" * 9)
+        cache.put("c", "x" * 9)
+        cache.get("a")  # a becomes most recently used
+        cache.put("d", "x" * 9)
+
+        assert "b" not in cache
+        assert "a" in cache
+        assert "c" in cache
+        assert "d" in cache
+        assert cache.current_bytes == 30
+
+    def test_oversized_entry_is_not_stored(self):
+        """Test that an entry larger than the whole budget is ignored"""
+        cache = TranslationCache(max_bytes=10)
+        cache.put("k", "x" * 100)
+
+        assert len(cache) == 0
+        assert cache.current_bytes == 0
+
+    def test_ttl_expiry(self):
+        """Test that entries older than the TTL are dropped"""
+        cache = TranslationCache(ttl=60)
+        with patch('discord_translator.cache.time.monotonic', return_value=1000):
+            cache.put("k", "Bonjour")
+        with patch('discord_translator.cache.time.monotonic', return_value=1061):
+            assert cache.get("k") is None
+        assert len(cache) == 0
+        assert cache.current_bytes == 0
+
+    def test_overwrite_updates_size(self):
+        """Test that replacing an entry keeps byte accounting consistent"""
+        cache = TranslationCache()
+        cache.put("k", "short")
+        cache.put("k", "a much longer translation")
+
+        assert cache.get("k") == "a much longer translation"
+        assert cache.current_bytes == len("k") + len("a much longer translation")
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted when full"""
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_pop_missing_key(self):
+        """Test that popping a missing key returns the default"""
+        cache = LRUCache()
+        assert cache.pop("missing") is None
@@ -0,0 +1,263 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import patch
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from discord_translator.client import OllamaClient
+from discord_translator.testing import FakeOllamaServer
+
+
+async def start_server(handler):
+    """Start a local HTTP server exposing /api/generate with the given handler"""
+    app = web.Application()
+    app.router.add_post('/api/generate', handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+class TestOllamaClient:
+    @pytest.mark.asyncio
+    async def test_generate_returns_json(self):
+        """Test that generate posts the payload and decodes the response"""
+        received = []
+
+        async def handler(request):
+            received.append(await request.json())
+            return web.json_response({"response": "Bonjour"})
+
+        server = await start_server(handler)
+        client = OllamaClient(str(server.make_url('/api/generate')))
+        try:
+            data = await client.generate({"prompt": "Hello"})
+            assert data == {"response": "Bonjour"}
+            assert received == [{"model": "llama3.1:8b", "prompt": "Hello", "stream": False}]
+        finally:
+            await client.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_overlap(self):
+        """Test that concurrent calls run in parallel rather than serially"""
+        active = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+            return web.json_response({"response": "ok"})
+
+        server = await start_server(handler)
+        client = OllamaClient(str(server.make_url('/api/generate')), pool_size=5)
+        try:
+            await asyncio.gather(*(client.generate({}) for _ in range(5)))
+            assert peak == 5
+        finally:
+            await client.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_pool_size_limits_connections(self):
+        """Test that the connection pool caps simultaneous requests"""
+        active = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+            return web.json_response({"response": "ok"})
+
+        server = await start_server(handler)
+        client = OllamaClient(str(server.make_url('/api/generate')), pool_size=2)
+        try:
+            await asyncio.gather(*(client.generate({}) for _ in range(6)))
+            assert peak == 2
+        finally:
+            await client.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_http_error_raises(self):
+        """Test that non-2xx responses raise ClientResponseError"""
+        async def handler(request):
+            return web.Response(status=500)
+
+        server = await start_server(handler)
+        client = OllamaClient(str(server.make_url('/api/generate')))
+        try:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await client.generate({})
+        finally:
+            await client.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_read_timeout(self):
+        """Test that a slow backend trips the read timeout"""
+        async def handler(request):
+            await asyncio.sleep(1)
+            return web.json_response({"response": "late"})
+
+        server = await start_server(handler)
+        client = OllamaClient(str(server.make_url('/api/generate')), read_timeout=0.05)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.generate({})
+        finally:
+            await client.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_is_aborted(self):
+        """Test that cancelling a request closes its connection so the server stops generating"""
+        async with FakeOllamaServer(latency=1) as server:
+            client = OllamaClient(server.url)
+            try:
+                request = asyncio.create_task(client.generate({"prompt": "Hello"}))
+                while not server.calls:
+                    await asyncio.sleep(0.01)
+                request.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await request
+                for _ in range(100):
+                    if server.aborted:
+                        break
+                    await asyncio.sleep(0.01)
+                assert server.aborted == 1
+            finally:
+                await client.close()
+
+    @pytest.mark.asyncio
+    async def test_stream_generate_yields_chunks(self):
+        """Test that NDJSON chunks are yielded as they arrive"""
+        async def handler(request):
+            body = await request.json()
+            assert body['stream'] is True
+            response = web.StreamResponse()
+            await response.prepare(request)
+            for token in ("Bon", "jour"):
+                await response.write(json.dumps({"response": token, "done": False}).encode() + b"\n")
+            await response.write(json.dumps({"response": "", "done": True}).encode() + b"\n")
+            return response
+
+        server = await start_server(handler)
+        client = OllamaClient(str(server.make_url('/api/generate')))
+        try:
+            chunks = [chunk async for chunk in client.stream_generate({"prompt": "Hello"})]
+            assert [chunk["response"] for chunk in chunks] == ["Bon", "jour", ""]
+            assert chunks[-1]["done"] is True
+        finally:
+            await client.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_close_reopens_on_next_use(self):
+        """Test that the session is reusable across start/close cycles"""
+        client = OllamaClient()
+        assert client.closed
+        await client.start()
+        assert not client.closed
+        await client.close()
+        assert client.closed
+
+    @pytest.mark.asyncio
+    async def test_configured_model_and_keep_alive_are_sent(self):
+        """Test that the client's model and keep_alive fill requests that do not set them"""
+        received = []
+
+        async def handler(request):
+            received.append(await request.json())
+            return web.json_response({"response": "Bonjour"})
+
+        server = await start_server(handler)
+        client = OllamaClient(str(server.make_url('/api/generate')), model="qwen2.5:7b", keep_alive="30m")
+        try:
+            await client.generate({"prompt": "Hello"})
+            await client.generate({"prompt": "Hello", "model": "other", "keep_alive": 0})
+        finally:
+            await client.close()
+            await server.close()
+
+        assert received[0] == {"model": "qwen2.5:7b", "keep_alive": "30m", "prompt": "Hello", "stream": False}
+        assert received[1]["model"] == "other" and received[1]["keep_alive"] == 0
+
+    @pytest.mark.asyncio
+    async def test_warm_up_loads_model_then_generates(self):
+        """Test that warm-up sends an empty load request and a one-token generation"""
+        received = []
+
+        async def handler(request):
+            received.append(await request.json())
+            return web.json_response({"response": "", "done": True})
+
+        server = await start_server(handler)
+        client = OllamaClient(str(server.make_url('/api/generate')), keep_alive=-1)
+        try:
+            load_seconds, generate_seconds = await client.warm_up()
+        finally:
+            await client.close()
+            await server.close()
+
+        assert load_seconds >= 0 and generate_seconds >= 0
+        assert received[0]["prompt"] == "" and received[0]["keep_alive"] == -1
+        assert received[1]["options"] == {"num_predict": 1}
+
+    @pytest.mark.asyncio
+    async def test_chat_mode_sends_system_and_user_messages(self):
+        """Test that chat mode posts to /api/chat and returns the reply text under 'response'"""
+        server = await FakeOllamaServer(response="Bonjour le monde").start()
+        client = OllamaClient(server.url, api='chat', num_ctx=4096)
+        try:
+            data = await client.generate({"system": "Translate.", "prompt": "Hello", "options": {"num_predict": 10}})
+            chunks = [chunk async for chunk in client.stream_generate({"prompt": "Hello"})]
+        finally:
+            await client.close()
+            await server.close()
+
+        assert data["response"] == "Bonjour le monde"
+        assert "".join(chunk["response"] for chunk in chunks).strip() == "Bonjour le monde"
+        assert server.requests[0]["messages"] == [
+            {"role": "system", "content": "Translate."}, {"role": "user", "content": "Hello"},
+        ]
+        assert server.requests[0]["options"] == {"num_ctx": 4096, "num_predict": 10}
+        assert "prompt" not in server.requests[0]
+
+    def test_num_predict_is_scaled_or_removed(self):
+        """Test that num_predict follows num_predict_scale, with 0 removing the limit"""
+        payload = {"prompt": "Hello", "options": {"num_predict": 100}}
+
+        _, scaled = OllamaClient(num_predict_scale=1.5)._request(payload, stream=False)
+        _, unlimited = OllamaClient(num_predict_scale=0)._request(payload, stream=False)
+
+        assert scaled["options"] == {"num_predict": 150}
+        assert "options" not in unlimited
+        assert payload["options"] == {"num_predict": 100}
+
+    def test_from_env(self):
+        """Test that configuration is read from the environment"""
+        env = {
+            'OLLAMA_URL': 'http://gpu-box:11434/api/generate',
+            'OLLAMA_POOL_SIZE': '4',
+            'OLLAMA_CONNECT_TIMEOUT': '2',
+            'OLLAMA_READ_TIMEOUT': '20',
+            'OLLAMA_TIMEOUT': '45',
+        }
+        with patch.dict('os.environ', env):
+            client = OllamaClient.from_env()
+
+        assert client.url == 'http://gpu-box:11434/api/generate'
+        assert client.base_url == 'http://gpu-box:11434'
+        assert client.pool_size == 4
+        assert client.timeout.sock_connect == 2
+        assert client.timeout.sock_read == 20
+        assert client.timeout.total == 45
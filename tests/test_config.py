@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import patch
+
+from discord_translator.client import OllamaClient
+from discord_translator.config import DEFAULT_OLLAMA_MODEL, DEFAULT_OLLAMA_URL, Config
+from discord_translator.pool import BackendPool
+
+
+class TestConfig:
+    def test_defaults(self):
+        """Test that an empty environment gives the built-in defaults"""
+        with patch.dict('os.environ', {}, clear=True):
+            config = Config.from_env()
+
+        assert config.ollama_urls == (DEFAULT_OLLAMA_URL,)
+        assert config.ollama_model == DEFAULT_OLLAMA_MODEL
+        assert config.keep_alive is None
+        assert config.warmup is True
+
+    def test_from_env(self):
+        """Test that settings are read and typed once from the environment"""
+        env = {
+            'OLLAMA_URLS': 'http://a:11434/api/generate, http://b:11434/api/generate',
+            'OLLAMA_MODEL': 'qwen2.5:7b',
+            'OLLAMA_POOL_SIZE': '4',
+            'OLLAMA_KEEP_ALIVE': '-1',
+            'OLLAMA_WARMUP': 'false',
+        }
+        with patch.dict('os.environ', env, clear=True):
+            config = Config.from_env()
+
+        assert config.ollama_urls == ('http://a:11434/api/generate', 'http://b:11434/api/generate')
+        assert config.pool_size == 4
+        assert config.keep_alive == -1
+        assert config.warmup is False
+        with patch.dict('os.environ', {'OLLAMA_KEEP_ALIVE': '30m'}):
+            assert Config.from_env().keep_alive == '30m'
+
+    def test_unknown_api_is_rejected(self):
+        """Test that OLLAMA_API only accepts generate or chat"""
+        with patch.dict('os.environ', {'OLLAMA_API': 'Chat', 'OLLAMA_NUM_CTX': '8192'}):
+            config = Config.from_env()
+        assert (config.api, config.num_ctx) == ('chat', 8192)
+
+        with patch.dict('os.environ', {'OLLAMA_API': 'completions'}):
+            with pytest.raises(ValueError):
+                Config.from_env()
+
+    def test_clients_are_built_from_config(self):
+        """Test that the client and pool take their settings from the config, not the environment"""
+        config = Config(ollama_urls=('http://a:11434/api/generate', 'http://b:11434/api/generate'),
+                        ollama_model='qwen2.5:7b', keep_alive='1h', total_timeout=15)
+
+        with patch.dict('os.environ', {'OLLAMA_MODEL': 'ignored'}):
+            client = OllamaClient.from_config(config)
+            pool = BackendPool.from_config(config)
+
+        assert (client.url, client.model, client.keep_alive) == ('http://a:11434/api/generate', 'qwen2.5:7b', '1h')
+        assert client.timeout.total == 15
+        assert [backend.client.model for backend in pool.backends] == ['qwen2.5:7b', 'qwen2.5:7b']
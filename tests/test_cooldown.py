@@ -0,0 +1,62 @@
+from discord_translator.cooldown import CooldownCache
+
+
+class TestCooldownCache:
+    def test_set_and_get(self):
+        """Test basic mapping behaviour"""
+        cache = CooldownCache()
+        cache[(1, "french")] = 100.0
+
+        assert (1, "french") in cache
+        assert cache[(1, "french")] == 100.0
+        assert cache.get((2, "french")) is None
+        assert len(cache) == 1
+
+    def test_expire_removes_only_old_entries(self):
+        """Test that expiry removes entries past the TTL and keeps the rest"""
+        cache = CooldownCache(ttl=60)
+        cache[(1, "french")] = 0.0
+        cache[(2, "french")] = 50.0
+        cache[(3, "french")] = 100.0
+
+        assert cache.expire(now=120.0) == 2
+        assert (3, "french") in cache
+        assert len(cache) == 1
+
+    def test_updated_entry_is_not_expired_by_stale_heap_item(self):
+        """Test that refreshing a key keeps it alive past its original expiry"""
+        cache = CooldownCache(ttl=60)
+        cache[(1, "french")] = 0.0
+        cache[(1, "french")] = 100.0
+
+        assert cache.expire(now=120.0) == 0
+        assert cache[(1, "french")] == 100.0
+
+    def test_max_entries_evicts_oldest(self):
+        """Test that the hard cap evicts the oldest entries first"""
+        cache = CooldownCache(max_entries=2)
+        cache[(1, "french")] = 1.0
+        cache[(2, "french")] = 2.0
+        cache[(3, "french")] = 3.0
+
+        assert len(cache) == 2
+        assert (1, "french") not in cache
+        assert (3, "french") in cache
+
+    def test_heap_stays_bounded_under_repeated_updates(self):
+        """Test that stale heap items are compacted when one key is updated repeatedly"""
+        cache = CooldownCache()
+        for timestamp in range(1000):
+            cache[(1, "french")] = float(timestamp)
+
+        assert len(cache) == 1
+        assert len(cache._heap) <= 2 * len(cache) + 64
+
+    def test_clear(self):
+        """Test that clear empties the cache"""
+        cache = CooldownCache()
+        cache[(1, "french")] = 1.0
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.expire(now=10_000.0) == 0
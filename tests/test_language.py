@@ -0,0 +1,56 @@
+import pytest
+
+from discord_translator.language import detect_language
+
+
+class TestDetectLanguage:
+    @pytest.mark.parametrize("text, expected", [
+        ("Good morning everyone, how is it going?", "english"),
+        ("Je vais appeler ma mère ce soir", "french"),
+        ("¿Alguien puede revisar mi código por favor?", "spanish"),
+        ("Kann jemand bitte meinen Code prüfen?", "german"),
+        ("Qualcuno può controllare il mio codice per favore?", "italian"),
+        ("Eu te ligo depois do almoço", "portuguese"),
+    ])
+    def test_latin_script_languages(self, text, expected):
+        """Test that Latin-script languages are identified from the trigram profiles"""
+        assert detect_language(text) == expected
+
+    @pytest.mark.parametrize("text, expected", [
+        ("こんにちは世界", "japanese"),
+        ("你好世界", "chinese"),
+        ("안녕하세요", "korean"),
+        ("Привет всем, как вы?", "russian"),
+        ("Γεια σας", "greek"),
+    ])
+    def test_script_languages(self, text, expected):
+        """Test that languages with a distinctive script are identified from the script alone"""
+        assert detect_language(text) == expected
+
+    def test_short_text_is_undetermined(self):
+        """Test that very short Latin-script text is not guessed"""
+        assert detect_language("lol") is None
+
+    def test_urls_and_mentions_are_ignored(self):
+        """Test that URLs and mentions do not influence detection"""
+        assert detect_language("<@123456> https://example.com/page Привет, как вы?") == "russian"
+
+    @pytest.mark.parametrize("text", [
+        "Ik weet niet wat ik nu moet doen met dit",
+        "Ik ga vanavond mijn moeder bellen",
+        "Nie wiem co mam teraz zrobić z tym",
+        "Jag vet inte vad jag ska göra nu",
+    ])
+    def test_unprofiled_latin_languages_are_undetermined(self, text):
+        """Test that Latin-script languages without a profile are not taken for the closest profiled one"""
+        assert detect_language(text) is None
+
+    @pytest.mark.parametrize("text", [
+        "Я не знаю, що мені робити",  # Ukrainian
+        "Не знам шта да радим сада са тим",  # Serbian
+        "Привет всем",  # Russian, but nothing rules out other Cyrillic languages
+        "東京大学合格発表",  # Japanese written in kanji only
+    ])
+    def test_shared_scripts_need_confirming_letters(self, text):
+        """Test that Cyrillic and Han text is only labelled Russian or Chinese when its letters confirm it"""
+        assert detect_language(text) is None
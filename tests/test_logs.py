@@ -0,0 +1,64 @@
+import json
+import logging
+
+import pytest
+
+from discord_translator.logs import (
+    DeferredQueueHandler, Preview, configure_logging, payload_logger, shutdown_logging,
+)
+
+
+@pytest.fixture
+def root_level():
+    """Restore the root logger level changed by configure_logging"""
+    level = logging.getLogger().level
+    yield
+    shutdown_logging()
+    logging.getLogger().setLevel(level)
+
+
+class TestLogs:
+    def test_preview_truncates_only_when_formatted(self):
+        """Test that a preview keeps the text and shortens it when turned into a string"""
+        text = "word " * 100
+        preview = Preview(text)
+
+        assert preview.text is text
+        assert str(preview) == text[:Preview.max_chars] + "… (500 chars)"
+        assert str(Preview("short")) == "short"
+
+    def test_records_are_queued_unformatted(self):
+        """Test that the queue handler leaves message arguments for the listener thread to merge"""
+        handler = DeferredQueueHandler(None)
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "Translated %s", ("hello",), None)
+
+        prepared = handler.prepare(record)
+
+        assert prepared.msg == "Translated %s" and prepared.args == ("hello",)
+
+    def test_json_lines_written_off_the_caller_thread(self, root_level, capsys):
+        """Test that records reach stderr as JSON through the listener, with extra fields"""
+        configure_logging(level="INFO", json_output=True)
+        logging.getLogger("discord_translator.test").info("Translated message %s", 42, extra={"language": "french"})
+        shutdown_logging()
+
+        entry = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+        assert entry["message"] == "Translated message 42"
+        assert entry["level"] == "INFO" and entry["language"] == "french"
+        assert capsys.readouterr().out == ""
+
+    def test_payload_records_are_sampled(self, root_level, capsys):
+        """Test that payload records are dropped at a zero sample rate while other records are kept"""
+        configure_logging(level="INFO", payload_sample_rate=0.0)
+        payload_logger.info("Original text: %s", Preview("Hello"))
+        logging.getLogger("discord_translator.test").info("Translated message")
+        shutdown_logging()
+
+        err = capsys.readouterr().err
+        assert "Original text" not in err
+        assert "Translated message" in err
+
+        configure_logging(level="INFO")
+        payload_logger.info("Original text: %s", Preview("Hello"))
+        shutdown_logging()
+        assert "Original text: Hello" in capsys.readouterr().err
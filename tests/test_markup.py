@@ -0,0 +1,58 @@
+import pytest
+
+from discord_translator.markup import has_translatable_text, protect, restore
+
+
+class TestProtect:
+    def test_protected_spans_replaced_with_placeholders(self):
+        """Test that code, URLs, mentions and custom emoji are masked in order"""
+        text = "Hey <@123> run `pip install x` then see https://example.com/a?b=1 <:ok:456>"
+        masked, spans = protect(text)
+
+        assert masked == "Hey [[0]] run [[1]] then see [[2]] [[3]]"
+        assert spans == ["<@123>", "`pip install x`", "https://example.com/a?b=1", "<:ok:456>"]
+
+    def test_code_block_masked_whole(self):
+        """Test that a fenced code block becomes a single placeholder"""
+        text = "Try this:\n```py\nprint(`x`)\n```\nthanks"
+        masked, spans = protect(text)
+
+        assert masked == "Try this:\n[[0]]\nthanks"
+        assert spans == ["```py\nprint(`x`)\n```"]
+
+    def test_existing_placeholder_text_left_alone(self):
+        """Test that text already containing placeholder markers is not masked"""
+        text = "literal [[0]] and https://example.com"
+        assert protect(text) == (text, [])
+
+
+class TestRestore:
+    def test_round_trip_is_exact(self):
+        """Test that restoring the masked text gives back the original byte for byte"""
+        text = "<@&42> see <t:1700000000:R> and ```\n  code  \n``` or <a:dance:7>"
+        masked, spans = protect(text)
+        assert restore(masked, spans) == text
+
+    def test_tolerates_spacing_inside_placeholder(self):
+        """Test that placeholders reformatted by the model are still recognised"""
+        assert restore("Voir [[ 0 ]]", ["https://example.com"]) == "Voir https://example.com"
+
+    def test_missing_placeholder_appended(self):
+        """Test that spans dropped by the model are appended rather than lost"""
+        assert restore("Bonjour", ["`code`"]) == "Bonjour\n`code`"
+        assert restore("Bonjour", ["`code`"], append_missing=False) == "Bonjour"
+
+
+class TestHasTranslatableText:
+    @pytest.mark.parametrize("text", [
+        "https://example.com/some/page",
+        "<@123456> <#789>",
+        "<:party:123456789> 🎉🎉",
+        "```py\nprint('only code')\n```",
+        "12345 !!!",
+    ])
+    def test_nothing_to_translate(self, text):
+        assert not has_translatable_text(text)
+
+    def test_text_with_words(self):
+        assert has_translatable_text("<@123456> hello there")
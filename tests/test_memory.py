@@ -0,0 +1,72 @@
+import pytest
+
+from discord_translator.memory import TranslationMemory
+
+
+class TestTranslationMemory:
+    def test_near_duplicates_reuse_the_translation(self):
+        """Test that case, whitespace and small punctuation changes reuse a stored translation"""
+        memory = TranslationMemory(threshold=0.85)
+        memory.put("good morning everyone!", "french", "Bonjour à tous !")
+
+        assert memory.get("Good morning everyone", "french") == "Bonjour à tous !"
+        assert memory.get("  GOOD   morning everyone!  ", "French") == "Bonjour à tous !"
+
+    def test_different_texts_and_languages_miss(self):
+        """Test that dissimilar texts, other languages and very short texts are not matched"""
+        memory = TranslationMemory(threshold=0.85)
+        memory.put("good morning everyone!", "french", "Bonjour à tous !")
+        memory.put("ok", "french", "d'accord")
+
+        assert memory.get("good night everyone, see you tomorrow", "french") is None
+        assert memory.get("good morning everyone!", "german") is None
+        assert memory.get("ok", "french") is None
+
+    def test_numbers_and_protected_spans_must_match(self):
+        """Test that texts differing only in a number, link or mention never share a translation"""
+        memory = TranslationMemory(threshold=0.5)
+        memory.put("the meeting starts at 5 today", "french", "la réunion commence à 5 aujourd'hui")
+        memory.put("read the docs at https://a.example", "french", "lisez la doc sur https://a.example")
+
+        assert memory.get("the meeting starts at 6 today", "french") is None
+        assert memory.get("read the docs at https://b.example", "french") is None
+        assert memory.get("The meeting starts at 5 today.", "french") == "la réunion commence à 5 aujourd'hui"
+
+    def test_least_recently_used_texts_are_evicted(self):
+        """Test that memory stays within max_entries, keeping recently used texts"""
+        memory = TranslationMemory(max_entries=2)
+        memory.put("first message here", "french", "premier")
+        memory.put("second message here", "french", "deuxième")
+        assert memory.get("first message here", "french") == "premier"
+
+        memory.put("third message here", "french", "troisième")
+
+        assert len(memory) == 2
+        assert memory.get("second message here", "french") is None
+        assert memory.get("first message here", "french") == "premier"
+        assert not any("second message here" in bucket for bucket in memory._buckets.values())
+
+    @pytest.mark.parametrize("stored, text", [
+        ("Please do merge this pull request now", "Please do not merge this pull request now"),
+        ("The deployment of the new release to production was successful",
+         "The deployment of the new release to production was unsuccessful"),
+        ("Heads up everyone, the server is down right now",
+         "Heads up everyone, the server is not down right now"),
+        ("I can make it to the team meeting tomorrow afternoon",
+         "I can't make it to the team meeting tomorrow afternoon"),
+        ("Let us talk about the release plan again later.", "Let us talk about the release plan again later?"),
+    ])
+    def test_negations_and_questions_must_match(self, stored, text):
+        """Test that texts differing by a negation or a question mark never share a translation"""
+        memory = TranslationMemory()
+        memory.put(stored, "french", "stored translation")
+
+        assert memory.get(text, "french") is None
+        assert memory.get(stored, "french") == "stored translation"
+
+    def test_other_word_changes_reuse_the_translation(self):
+        """Test that a small change to a word that does not negate the text still reuses the translation"""
+        memory = TranslationMemory()
+        memory.put("can someone review my pull request please", "french", "relecture svp")
+
+        assert memory.get("can someone review my pull requests please", "french") == "relecture svp"
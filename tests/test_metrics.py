@@ -0,0 +1,100 @@
+import aiohttp
+import pytest
+
+from discord_translator.metrics import Histogram, Metrics, MetricsServer
+
+
+class TestHistogram:
+    def test_observations_land_in_buckets(self):
+        """Test that values are counted in the first bucket whose bound they do not exceed"""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(5.65)
+
+    def test_quantile_interpolates_within_bucket(self):
+        """Test that quantiles are estimated from bucket counts"""
+        histogram = Histogram((1.0, 2.0))
+        for value in (0.5, 1.5, 1.5, 1.5):
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == pytest.approx(1 + 1 / 3)
+        assert Histogram().quantile(0.5) is None
+
+    def test_quantile_in_overflow_bucket_is_capped(self):
+        """Test that quantiles beyond the last bound report the last bound"""
+        histogram = Histogram((1.0,))
+        histogram.observe(10.0)
+
+        assert histogram.quantile(0.99) == 1.0
+
+
+class TestMetrics:
+    def test_counters_by_label(self):
+        """Test that counters are tracked per label set"""
+        metrics = Metrics()
+        metrics.inc('hits_total', cache='result')
+        metrics.inc('hits_total', 2, cache='result')
+        metrics.inc('hits_total', cache='message')
+
+        assert metrics.value('hits_total', cache='result') == 3
+        assert metrics.value('hits_total', cache='message') == 1
+        assert metrics.value('hits_total', cache='store') == 0
+
+    def test_time_records_even_on_error(self):
+        """Test that the timer observes the block when it raises"""
+        metrics = Metrics()
+        with pytest.raises(RuntimeError):
+            with metrics.time('stage_seconds', stage='reply'):
+                raise RuntimeError
+
+        assert metrics.histogram('stage_seconds', stage='reply').count == 1
+
+    def test_render_prometheus_format(self):
+        """Test the text exposition of counters, histograms and gauges"""
+        metrics = Metrics(buckets=(0.5,))
+        metrics.describe('errors_total', 'Failed requests')
+        metrics.inc('errors_total', error='timeout')
+        metrics.observe('stage_seconds', 0.25, stage='queue')
+        metrics.gauge('queue_waiting', lambda: 3)
+
+        text = metrics.render()
+
+        assert '# HELP errors_total Failed requests\n# TYPE errors_total counter' in text
+        assert 'errors_total{error="timeout"} 1' in text
+        assert '# TYPE stage_seconds histogram' in text
+        assert 'stage_seconds_bucket{stage="queue",le="0.5"} 1' in text
+        assert 'stage_seconds_bucket{stage="queue",le="+Inf"} 1' in text
+        assert 'stage_seconds_sum{stage="queue"} 0.25' in text
+        assert 'stage_seconds_count{stage="queue"} 1' in text
+        assert 'queue_waiting 3' in text
+
+    def test_reset_keeps_gauges(self):
+        """Test that reset clears recorded values only"""
+        metrics = Metrics()
+        metrics.inc('hits_total')
+        metrics.gauge('queue_waiting', lambda: 0)
+        metrics.reset()
+
+        assert metrics.value('hits_total') == 0
+        assert 'queue_waiting 0' in metrics.render()
+
+
+class TestMetricsServer:
+    @pytest.mark.asyncio
+    async def test_serves_metrics(self):
+        """Test that /metrics returns the rendered registry"""
+        metrics = Metrics()
+        metrics.inc('reactions_total', outcome='translated')
+        server = await MetricsServer(metrics, port=0).start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f'http://127.0.0.1:{server.port}/metrics') as response:
+                    assert response.status == 200
+                    assert response.content_type == 'text/plain'
+                    assert 'reactions_total{outcome="translated"} 1' in await response.text()
+        finally:
+            await server.close()
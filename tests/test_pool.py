@@ -0,0 +1,148 @@
+import pytest
+import asyncio
+
+import aiohttp
+
+from discord_translator.pool import BackendPool, NoHealthyBackendError
+from discord_translator.testing import FakeOllamaServer
+from discord_translator.translation import translate_text
+
+
+@pytest.fixture
+async def servers():
+    """Three local fake Ollama servers"""
+    started = [await FakeOllamaServer(response=f"node {i}").start() for i in range(3)]
+    yield started
+    for server in started:
+        await server.close()
+
+
+class TestBackendPool:
+    @pytest.mark.asyncio
+    async def test_translate_through_pool(self, servers):
+        """Test that translate_text works with a pool in place of a client"""
+        pool = BackendPool([servers[0].url], probe_interval=0)
+        try:
+            assert await translate_text("Hello", "french", client=pool) == "node 0"
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_spread_across_nodes(self, servers):
+        """Test that in-flight load is spread over all nodes"""
+        for server in servers:
+            server.latency = 0.05
+        pool = BackendPool([server.url for server in servers], probe_interval=0)
+        try:
+            await asyncio.gather(*(pool.generate({"prompt": "Hello"}) for _ in range(6)))
+            assert [server.calls for server in servers] == [2, 2, 2]
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_prefers_faster_node(self, servers):
+        """Test that EWMA latency steers traffic away from a slow node"""
+        servers[0].latency = 0.1
+        pool = BackendPool([servers[0].url, servers[1].url], probe_interval=0)
+        try:
+            # Warm up latency estimates on both nodes
+            await asyncio.gather(pool.generate({}), pool.generate({}))
+            for _ in range(4):
+                await pool.generate({})
+            assert servers[0].calls == 1
+            assert servers[1].calls == 5
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_failing_node_circuit_opens(self, servers):
+        """Test that a node returning errors is taken out of rotation"""
+        servers[0].failure_rate = 1.0
+        pool = BackendPool([servers[0].url, servers[1].url], failure_threshold=2, cooldown=60, probe_interval=0)
+        try:
+            results = []
+            for _ in range(6):
+                try:
+                    results.append(await pool.generate({}))
+                except aiohttp.ClientResponseError:
+                    results.append(None)
+
+            assert servers[0].calls == 2
+            assert not pool.backends[0].healthy
+            assert results.count(None) == 2
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_connection_error_retries_other_node(self, servers):
+        """Test that a dead endpoint is retried on another node"""
+        dead = "http://127.0.0.1:1/api/generate"
+        pool = BackendPool([dead, servers[1].url], probe_interval=0)
+        pool.backends[1].in_flight = 1  # Make the dead node look least loaded
+        try:
+            assert await pool.generate({}) == {"response": "node 1", "done": True}
+            assert pool.backends[0].failures == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_probe_opens_and_closes_circuit(self, servers):
+        """Test that health probes remove unhealthy nodes and restore recovered ones"""
+        pool = BackendPool([servers[0].url, servers[1].url], probe_interval=0)
+        try:
+            servers[0].healthy = False
+            await pool.probe()
+            assert not pool.backends[0].healthy
+
+            servers[0].healthy = True
+            await pool.probe()
+            assert pool.backends[0].healthy
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_all_nodes_down(self, servers):
+        """Test that a pool with no healthy nodes fails fast"""
+        pool = BackendPool([servers[0].url], probe_interval=0)
+        try:
+            servers[0].healthy = False
+            await pool.probe()
+            with pytest.raises(NoHealthyBackendError):
+                await pool.generate({})
+            assert await translate_text("Hello", "french", client=pool) is None
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_stream_generate(self, servers):
+        """Test that streaming requests are routed through the pool"""
+        pool = BackendPool([servers[2].url], probe_interval=0)
+        try:
+            chunks = [chunk async for chunk in pool.stream_generate({"prompt": "Hello"})]
+            assert "".join(chunk["response"] for chunk in chunks).strip() == "node 2"
+            assert pool.backends[0].in_flight == 0
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_warm_up_reports_each_node(self, servers):
+        """Test that every node is warmed up and a failing node reports its error"""
+        servers[1].healthy = False
+        pool = BackendPool([server.url for server in servers[:2]], probe_interval=0)
+        try:
+            results = await pool.warm_up()
+        finally:
+            await pool.close()
+
+        assert len(results[servers[0].url]) == 2
+        assert isinstance(results[servers[1].url], aiohttp.ClientResponseError)
+        assert servers[0].calls == 2
+
+    def test_from_env_splits_urls(self, monkeypatch):
+        """Test that OLLAMA_URLS configures one node per endpoint"""
+        monkeypatch.setenv("OLLAMA_URLS", "http://a:11434/api/generate, http://b:11434/api/generate")
+        pool = BackendPool.from_env()
+        assert [backend.url for backend in pool.backends] == [
+            "http://a:11434/api/generate",
+            "http://b:11434/api/generate",
+        ]
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+
+from discord_translator.ratelimit import RateLimiter, TokenBucketLimiter, parse_rate
+
+
+class TestParseRate:
+    @pytest.mark.parametrize("spec, expected", [
+        ("10/60", (10, 60.0)),
+        (" 3/1.5 ", (3, 1.5)),
+        ("", None),
+        ("0/60", None),
+    ])
+    def test_parse(self, spec, expected):
+        """Test parsing of requests/seconds limits"""
+        assert parse_rate(spec) == expected
+
+    def test_invalid(self):
+        """Test that a limit without a period is rejected"""
+        with pytest.raises(ValueError):
+            parse_rate("10")
+
+
+class TestTokenBucketLimiter:
+    def test_burst_then_refill(self):
+        """Test that a bucket allows a burst and then one request per refill interval"""
+        limiter = TokenBucketLimiter(capacity=2, per=10)  # One token every 5 seconds
+
+        assert limiter.consume("u", now=0)
+        assert limiter.consume("u", now=0)
+        assert not limiter.consume("u", now=1)
+        assert limiter.consume("u", now=5)
+        assert not limiter.consume("u", now=5)
+
+    def test_keys_are_independent(self):
+        """Test that one key exhausting its bucket does not affect another"""
+        limiter = TokenBucketLimiter(capacity=1, per=60)
+
+        assert limiter.consume("a", now=0)
+        assert not limiter.consume("a", now=0)
+        assert limiter.consume("b", now=0)
+
+    def test_idle_buckets_are_evicted(self):
+        """Test that buckets refilled completely are dropped"""
+        limiter = TokenBucketLimiter(capacity=1, per=10)
+        for key in range(100):
+            limiter.consume(key, now=0)
+        assert len(limiter) == 100
+
+        limiter.consume("late", now=10)
+
+        assert len(limiter) == 1
+        assert limiter.tokens(0, now=10) == 1
+
+
+class TestRateLimiter:
+    def test_refused_request_does_not_use_other_scopes(self):
+        """Test that tokens are only taken when every scope admits the request"""
+        limiter = RateLimiter({
+            'user': TokenBucketLimiter(capacity=5, per=60),
+            'guild': TokenBucketLimiter(capacity=1, per=60),
+        })
+
+        assert limiter.check(now=0, user=1, guild=9) is None
+        assert limiter.check(now=0, user=1, guild=9) == 'guild'
+        assert limiter.limits['user'].tokens(1, now=0) == 4
+
+    def test_unset_keys_and_scopes_are_skipped(self):
+        """Test that None keys, such as the guild of a DM, and unconfigured scopes are not limited"""
+        limiter = RateLimiter({'guild': TokenBucketLimiter(capacity=1, per=60)})
+
+        assert limiter.check(now=0, user=1, guild=None) is None
+        assert limiter.check(now=0, user=1, guild=None) is None
+
+    def test_from_env(self):
+        """Test that limits are read from the environment, with a default user limit"""
+        with patch.dict('os.environ', {'RATE_LIMIT_CHANNEL': '20/60', 'RATE_LIMIT_GUILD': ''}):
+            limiter = RateLimiter.from_env()
+
+        assert set(limiter.limits) == {'user', 'channel'}
+        assert limiter.limits['channel'].capacity == 20
@@ -0,0 +1,49 @@
+from discord_translator.replies import ConsolidatedReply, chunk_sections
+
+
+class TestChunkSections:
+    def test_sections_share_a_message_when_they_fit(self):
+        """Test that short sections are joined into one message"""
+        assert chunk_sections(["a", "b"], limit=10) == ["a\n\nb"]
+
+    def test_sections_move_to_a_new_message_when_full(self):
+        """Test that a section that does not fit starts the next message"""
+        assert chunk_sections(["aaaa", "bbbb"], limit=8) == ["aaaa", "bbbb"]
+
+    def test_long_section_split_at_line_and_word_breaks(self):
+        """Test that a section over the limit is split without exceeding it"""
+        chunks = chunk_sections(["one two three\nfour five"], limit=10)
+
+        assert chunks == ["one two", "three", "four five"]
+        assert all(len(chunk) <= 10 for chunk in chunks)
+
+    def test_early_line_break_is_not_preferred_over_a_late_word_break(self):
+        """Test that a long section is not split right after its first short line"""
+        chunks = chunk_sections(["Header:\none two three four five six"], limit=20)
+
+        assert chunks[0] == "Header:\none two"
+        assert all(len(chunk) <= 20 for chunk in chunks)
+
+    def test_unbreakable_text_is_cut_at_the_limit(self):
+        """Test that text without breaks is cut hard"""
+        assert chunk_sections(["x" * 25], limit=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+class TestConsolidatedReply:
+    def test_render_lists_every_language(self):
+        """Test that each translation is shown under its language"""
+        state = ConsolidatedReply()
+        state.translations.update([("french", "Bonjour"), ("german", "Hallo")])
+
+        assert state.render() == ["Translation (french):\nBonjour\n\nTranslation (german):\nHallo"]
+
+    def test_render_respects_the_discord_limit(self):
+        """Test that long translations are spread across messages of at most 2000 characters"""
+        state = ConsolidatedReply()
+        for language in ("french", "german", "spanish"):
+            state.translations[language] = "mot " * 400
+
+        chunks = state.render()
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 2000 for chunk in chunks)
@@ -0,0 +1,193 @@
+import pytest
+import asyncio
+
+from discord_translator.scheduler import QueueFullError, TranslationScheduler
+
+
+class TestTranslationScheduler:
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self):
+        """Test that queued work runs and its result is returned"""
+        scheduler = TranslationScheduler(workers=1)
+        try:
+            async def work():
+                return "Bonjour"
+
+            assert await scheduler.run(1, work) == "Bonjour"
+        finally:
+            await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_worker_count_limits_concurrency(self):
+        """Test that no more than the configured number of workers run at once"""
+        scheduler = TranslationScheduler(workers=2)
+        active = 0
+        peak = 0
+
+        async def work():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        try:
+            await asyncio.gather(*(scheduler.run(1, work) for _ in range(6)))
+            assert peak == 2
+        finally:
+            await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self):
+        """Test that work beyond the queue bound is shed immediately"""
+        scheduler = TranslationScheduler(workers=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+
+        try:
+            running = asyncio.create_task(scheduler.run(1, work))
+            await asyncio.sleep(0)  # Let the worker take the first item
+            queued = asyncio.create_task(scheduler.run(1, work))
+            await asyncio.sleep(0)
+
+            with pytest.raises(QueueFullError):
+                await scheduler.run(2, work)
+            assert scheduler.rejected == 1
+
+            release.set()
+            await asyncio.gather(running, queued)
+        finally:
+            await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_per_guild_limit(self):
+        """Test that one guild cannot take the whole queue"""
+        scheduler = TranslationScheduler(workers=1, max_queue=10, max_per_guild=1)
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+
+        try:
+            tasks = [asyncio.create_task(scheduler.run("busy", work))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(scheduler.run("busy", work)))
+            await asyncio.sleep(0)
+
+            with pytest.raises(QueueFullError):
+                await scheduler.run("busy", work)
+
+            tasks.append(asyncio.create_task(scheduler.run("quiet", work)))
+            await asyncio.sleep(0)
+            assert scheduler.queued == 2
+
+            release.set()
+            await asyncio.gather(*tasks)
+        finally:
+            await scheduler.close()
+
+    def test_default_per_guild_share(self):
+        """Test that without an explicit limit one guild may only fill a quarter of the queue"""
+        assert TranslationScheduler(max_queue=100).max_per_guild == 25
+        assert TranslationScheduler(max_queue=2).max_per_guild == 1
+
+    @pytest.mark.asyncio
+    async def test_round_robin_between_guilds(self):
+        """Test that workers alternate between guilds instead of draining one first"""
+        scheduler = TranslationScheduler(workers=1)
+        order = []
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+
+        def work(label):
+            async def run():
+                order.append(label)
+            return run
+
+        try:
+            tasks = [asyncio.create_task(scheduler.run("a", blocker))]
+            await asyncio.sleep(0)
+            for label in ("a1", "a2", "a3"):
+                tasks.append(asyncio.create_task(scheduler.run("a", work(label))))
+            tasks.append(asyncio.create_task(scheduler.run("b", work("b1"))))
+            await asyncio.sleep(0)
+
+            release.set()
+            await asyncio.gather(*tasks)
+            assert order == ["a1", "b1", "a2", "a3"]
+        finally:
+            await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates(self):
+        """Test that a failure in the work is raised to the caller"""
+        scheduler = TranslationScheduler(workers=1)
+
+        async def work():
+            raise ValueError("boom")
+
+        try:
+            with pytest.raises(ValueError):
+                await scheduler.run(1, work)
+        finally:
+            await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_queued_work_is_dropped(self):
+        """Test that work whose caller gives up leaves the queue at once and never runs"""
+        scheduler = TranslationScheduler(workers=1)
+        release = asyncio.Event()
+        ran = []
+
+        async def blocker():
+            await release.wait()
+
+        async def work():
+            ran.append(True)
+
+        try:
+            running = asyncio.create_task(scheduler.run(1, blocker))
+            await asyncio.sleep(0)
+            queued = asyncio.create_task(scheduler.run(1, work))
+            await asyncio.sleep(0)
+            assert scheduler.queued == 1
+
+            queued.cancel()
+            await asyncio.sleep(0)
+            assert scheduler.queued == 0 and scheduler.cancelled == 1
+
+            release.set()
+            await running
+            assert await scheduler.run(1, lambda: asyncio.sleep(0, "next")) == "next"
+            assert ran == []
+        finally:
+            await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_running_work_is_stopped(self):
+        """Test that cancelling the caller cancels work already running and frees its worker"""
+        scheduler = TranslationScheduler(workers=1)
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        try:
+            caller = asyncio.create_task(scheduler.run(1, work))
+            await asyncio.sleep(0.01)
+            assert scheduler.active == 1
+
+            caller.cancel()
+            await asyncio.wait_for(cancelled.wait(), 1)
+            assert await scheduler.run(1, lambda: asyncio.sleep(0, "next")) == "next"
+            assert scheduler.active == 0 and scheduler.cancelled == 1
+        finally:
+            await scheduler.close()
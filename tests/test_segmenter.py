@@ -0,0 +1,53 @@
+from discord_translator.segmenter import Segment, split_segments
+
+
+def joined(segments):
+    return ''.join(segment.text for segment in segments)
+
+
+class TestSplitSegments:
+    def test_short_message_is_one_segment(self):
+        """Test that a message under the limit is left whole"""
+        assert split_segments("Hello world") == [Segment("Hello world", True)]
+
+    def test_paragraphs_split_and_rejoin_exactly(self):
+        """Test that paragraph breaks become untranslated separators and nothing is lost"""
+        text = "First paragraph here.\n\n  Second paragraph here.\n"
+        segments = split_segments(text, max_chars=25)
+
+        assert joined(segments) == text
+        assert [s.text for s in segments if s.translate] == ["First paragraph here.", "Second paragraph here."]
+
+    def test_code_blocks_are_not_translated(self):
+        """Test that fenced code blocks are kept verbatim and never merged into prose"""
+        text = "Run this:\n\n```py\nprint('hi')\n```\n\nThen restart."
+        segments = split_segments(text, max_chars=1000)
+
+        assert joined(segments) == text
+        assert [s.text for s in segments if s.translate] == ["Run this:", "Then restart."]
+        assert any("```py" in s.text and not s.translate for s in segments)
+
+    def test_unclosed_code_block(self):
+        """Test that an unterminated fence runs to the end of the message"""
+        text = "Look:\n```\nstill code"
+        segments = split_segments(text)
+
+        assert joined(segments) == text
+        assert [s.text for s in segments if s.translate] == ["Look:"]
+
+    def test_long_paragraph_split_into_sentences(self):
+        """Test that a paragraph over the limit is split at sentence boundaries"""
+        sentences = ["A" * 40 + ".", "B" * 40 + "!", "C" * 40 + "?"]
+        text = " ".join(sentences)
+        segments = split_segments(text, max_chars=50)
+
+        assert joined(segments) == text
+        assert [s.text for s in segments if s.translate] == sentences
+
+    def test_short_paragraphs_are_merged(self):
+        """Test that consecutive short paragraphs are merged up to the limit"""
+        text = "one\n\ntwo\n\nthree\n\n" + "x" * 30
+        segments = split_segments(text, max_chars=20)
+
+        assert joined(segments) == text
+        assert [s.text for s in segments if s.translate] == ["one\n\ntwo\n\nthree", "x" * 30]
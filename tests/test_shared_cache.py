@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import patch
+
+from discord_translator.shared_cache import (
+    CacheBackend, MemoryCacheBackend, SQLiteCacheBackend, cache_backend_from_env,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "shared.db")
+
+
+class TestCacheBackend:
+    def test_get_and_set_must_be_implemented(self):
+        """Test that a backend missing get or set cannot be created"""
+        class Incomplete(CacheBackend):
+            async def get(self, namespace, key):
+                return None
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestMemoryCacheBackend:
+    @pytest.mark.asyncio
+    async def test_set_get_by_namespace(self):
+        """Test that values are stored per namespace"""
+        backend = MemoryCacheBackend()
+        await backend.set("result", "k", "Bonjour", ttl=60)
+
+        assert await backend.get("result", "k") == "Bonjour"
+        assert await backend.get("cooldown", "k") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries(self):
+        """Test that expired entries are neither returned nor kept by purge"""
+        backend = MemoryCacheBackend()
+        await backend.set("result", "old", "x", ttl=-1)
+        await backend.set("result", "new", "y", ttl=60)
+
+        assert await backend.purge() == 1
+        assert await backend.get("result", "old") is None
+        assert await backend.get("result", "new") == "y"
+
+
+class TestSQLiteCacheBackend:
+    @pytest.mark.asyncio
+    async def test_writes_are_visible_to_other_connections(self, db_path):
+        """Test that a value set through one backend is read through another on the same file"""
+        writer, reader = SQLiteCacheBackend(db_path), SQLiteCacheBackend(db_path)
+        await writer.open()
+        await reader.open()
+        try:
+            await writer.set("cooldown", "1:french", "123.5", ttl=30)
+            assert await reader.get("cooldown", "1:french") == "123.5"
+            assert await reader.get("cooldown", "1:german") is None
+        finally:
+            await writer.close()
+            await reader.close()
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_hidden_and_purged(self, db_path):
+        """Test that expired rows are ignored by get and deleted by purge"""
+        backend = SQLiteCacheBackend(db_path)
+        await backend.open()
+        try:
+            await backend.set("result", "k", "Bonjour", ttl=-1)
+            assert await backend.get("result", "k") is None
+            assert await backend.purge() == 1
+        finally:
+            await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_unopened_backend_is_a_no_op(self, db_path):
+        """Test that an unopened backend misses instead of raising"""
+        backend = SQLiteCacheBackend(db_path)
+        await backend.set("result", "k", "Bonjour", ttl=60)
+        assert await backend.get("result", "k") is None
+
+
+class TestCacheBackendFromEnv:
+    @pytest.mark.parametrize("url, expected", [
+        ("", type(None)),
+        ("memory://", MemoryCacheBackend),
+        ("sqlite:///shared.db", SQLiteCacheBackend),
+    ])
+    def test_backend_selected_by_url(self, url, expected):
+        """Test that SHARED_CACHE_URL picks the backend"""
+        with patch.dict('os.environ', {'SHARED_CACHE_URL': url}):
+            assert isinstance(cache_backend_from_env(), expected)
+
+    def test_sqlite_path(self):
+        """Test that the path follows the sqlite:/// prefix"""
+        with patch.dict('os.environ', {'SHARED_CACHE_URL': 'sqlite:////var/cache/shared.db'}):
+            assert cache_backend_from_env().path == '/var/cache/shared.db'
+
+    def test_unsupported_scheme(self):
+        """Test that unknown schemes are rejected"""
+        with patch.dict('os.environ', {'SHARED_CACHE_URL': 'redis://localhost'}):
+            with pytest.raises(ValueError):
+                cache_backend_from_env()
@@ -0,0 +1,123 @@
+import pytest
+import asyncio
+
+from discord_translator.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that concurrent callers with the same key run the work once"""
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+
+        assert calls == 1
+        assert [value for value, _ in results] == ["result"] * 5
+        assert [shared for _, shared in results] == [False, True, True, True, True]
+        assert "k" not in flights
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that distinct keys are not coalesced"""
+        flights = SingleFlight()
+        calls = []
+
+        async def work(key):
+            calls.append(key)
+            return key
+
+        await asyncio.gather(flights.do("a", lambda: work("a")), flights.do("b", lambda: work("b")))
+
+        assert sorted(calls) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_key_released_after_completion(self):
+        """Test that a call after completion runs the work again"""
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+
+        await flights.do("k", work)
+        await flights.do("k", work)
+
+        assert calls == 2
+        assert len(flights) == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_all_waiters(self):
+        """Test that a failure is raised to every waiter"""
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flights.do("k", work), flights.do("k", work), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert "k" not in flights
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_work(self):
+        """Test that cancelling one waiter leaves the shared work running for the others"""
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flights.do("k", work))
+        second = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == ("done", True)
+
+    @pytest.mark.asyncio
+    async def test_work_cancelled_with_its_last_waiter(self):
+        """Test that the shared work is cancelled once nobody is waiting for it"""
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert "k" not in flights
+
+    @pytest.mark.asyncio
+    async def test_cancel_by_key(self):
+        """Test that cancel() stops the work and raises CancelledError to its waiters"""
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(10)
+
+        waiters = [asyncio.create_task(flights.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        assert list(flights) == ["k"]
+        assert flights.cancel("k")
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        assert not flights.cancel("k")
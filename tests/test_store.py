@@ -0,0 +1,83 @@
+import pytest
+import asyncio
+import sqlite3
+
+from discord_translator.store import TranslationStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "translations.db")
+
+
+class TestTranslationStore:
+    @pytest.mark.asyncio
+    async def test_put_is_visible_before_flush(self, db_path):
+        """Test that queued writes are returned by get() before they are committed"""
+        store = TranslationStore(db_path, flush_interval=60)
+        await store.open()
+        try:
+            store.put("k", "Bonjour")
+            assert await store.get("k") == "Bonjour"
+        finally:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_translations_survive_reopen(self, db_path):
+        """Test that translations written before close are available after reopening"""
+        store = TranslationStore(db_path, flush_interval=60)
+        await store.open()
+        store.put("k", "Bonjour")
+        await store.close()
+
+        reopened = TranslationStore(db_path)
+        await reopened.open()
+        try:
+            assert await reopened.get("k") == "Bonjour"
+            assert await reopened.get("missing") is None
+        finally:
+            await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_batch_size_triggers_flush(self, db_path):
+        """Test that reaching the batch size commits without waiting for the interval"""
+        store = TranslationStore(db_path, batch_size=2, flush_interval=60)
+        await store.open()
+        try:
+            store.put("a", "1")
+            store.put("b", "2")
+            for _ in range(50):
+                if not store._pending:
+                    break
+                await asyncio.sleep(0.01)
+
+            with sqlite3.connect(db_path) as connection:
+                count = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            assert count == 2
+        finally:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_wal_mode_enabled(self, db_path):
+        """Test that the database is opened in write-ahead logging mode"""
+        store = TranslationStore(db_path)
+        await store.open()
+        await store.close()
+
+        with sqlite3.connect(db_path) as connection:
+            assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    @pytest.mark.asyncio
+    async def test_recent_returns_newest_first(self, db_path):
+        """Test that warm-up rows are ordered by recency and limited"""
+        store = TranslationStore(db_path)
+        await store.open()
+        try:
+            for key in ("a", "b", "c"):
+                store.put(key, key.upper())
+                await store.flush()
+
+            rows = await store.recent(2)
+            assert rows == [("c", "C"), ("b", "B")]
+        finally:
+            await store.close()
@@ -0,0 +1,42 @@
+import pytest
+
+from discord_translator.subscriptions import SubscriptionRegistry
+
+
+class TestSubscriptionRegistry:
+    def test_add_and_remove_languages(self):
+        """Test that languages are added once and removed individually or all together"""
+        registry = SubscriptionRegistry()
+
+        assert registry.add(1, ["french", "german", "french"]) == ["french", "german"]
+        assert 1 in registry
+        assert registry.remove(1, ["french"]) == ["german"]
+        assert registry.remove(1, ["german"]) == []
+        assert 1 not in registry
+
+        registry.add(2, ["spanish"])
+        assert registry.remove(2) == []
+        assert len(registry) == 0
+
+    @pytest.mark.asyncio
+    async def test_saved_subscriptions_are_loaded(self, tmp_path):
+        """Test that subscriptions survive a restart through the JSON file"""
+        path = str(tmp_path / "subscriptions.json")
+        registry = SubscriptionRegistry(path)
+        registry.add(123, ["french", "japanese"])
+        await registry.save()
+
+        restored = SubscriptionRegistry(path)
+        restored.load()
+
+        assert restored.get(123) == ["french", "japanese"]
+
+    def test_unreadable_file_is_ignored(self, tmp_path):
+        """Test that a corrupt subscriptions file leaves the registry empty"""
+        path = tmp_path / "subscriptions.json"
+        path.write_text("{not json")
+        registry = SubscriptionRegistry(str(path))
+
+        registry.load()
+
+        assert len(registry) == 0
@@ -0,0 +1,120 @@
+import pytest
+import asyncio
+import json
+
+from discord_translator.client import OllamaClient
+from discord_translator.scheduler import TranslationScheduler
+from discord_translator.testing import FakeOllamaServer
+from discord_translator.tracing import NOOP_SPAN, Tracer, tracer
+from discord_translator.translation import translate_text
+
+
+def read_spans(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def shared_tracer(tmp_path):
+    """Enable the shared tracer, keeping every trace, and disable it again afterwards"""
+    tracer.configure(str(tmp_path / 'traces.jsonl'), sample_rate=1.0)
+    yield tracer
+    tracer._pending.clear()
+    tracer.configure(None)
+
+
+class TestTracer:
+    @pytest.mark.asyncio
+    async def test_spans_form_a_tree_exported_as_json_lines(self, tmp_path):
+        """Test that nested spans and recorded intervals share the trace and point at their parents"""
+        path = tmp_path / 'traces.jsonl'
+        local = Tracer(str(path), sample_rate=1.0)
+
+        with local.trace('reaction', message_id=1):
+            with local.span('cache_lookup') as span:
+                span.set(hit=False)
+            with local.span('translate_text'):
+                local.record('queue_wait', 0.0)
+        await local.flush()
+
+        spans = {span['name']: span for span in read_spans(path)}
+        assert set(spans) == {'reaction', 'cache_lookup', 'translate_text', 'queue_wait'}
+        assert len({span['traceId'] for span in spans.values()}) == 1
+        assert 'parentId' not in spans['reaction']
+        assert spans['cache_lookup']['parentId'] == spans['reaction']['id']
+        assert spans['queue_wait']['parentId'] == spans['translate_text']['id']
+        assert spans['cache_lookup']['tags'] == {'hit': 'False'}
+        assert spans['reaction']['tags'] == {'message_id': '1'}
+        assert spans['reaction']['localEndpoint'] == {'serviceName': 'discord-translator'}
+
+    @pytest.mark.asyncio
+    async def test_head_and_tail_sampling(self, tmp_path):
+        """Test that unsampled fast traces are dropped while slow and failed ones are always kept"""
+        local = Tracer(str(tmp_path / 'traces.jsonl'), sample_rate=0.0, slow_threshold=0.05)
+
+        with local.trace('fast'):
+            pass
+        with local.trace('slow'):
+            await asyncio.sleep(0.06)
+        with pytest.raises(ValueError):
+            with local.trace('failed'):
+                with local.span('backend'):
+                    raise ValueError("boom")
+        await local.flush()
+
+        names = [span['name'] for span in read_spans(tmp_path / 'traces.jsonl')]
+        assert sorted(names) == ['backend', 'failed', 'slow']
+        assert local.kept == 2
+
+    def test_disabled_tracer_records_nothing(self):
+        """Test that without a path traces and spans are no-ops"""
+        local = Tracer()
+
+        with local.trace('reaction') as root:
+            with local.span('cache_lookup') as span:
+                local.record('queue_wait', 0.0)
+
+        assert root is NOOP_SPAN and span is NOOP_SPAN
+        assert local.current() is NOOP_SPAN
+        assert not local._pending
+
+    @pytest.mark.asyncio
+    async def test_context_flows_into_tasks_and_scheduler_workers(self, tmp_path):
+        """Test that spans opened in tasks and in queued work become children of the caller's span"""
+        path = tmp_path / 'traces.jsonl'
+        local = Tracer(str(path), sample_rate=1.0)
+        scheduler = TranslationScheduler(workers=1)
+
+        async def work(name):
+            with local.span(name):
+                await asyncio.sleep(0)
+
+        try:
+            with local.trace('reaction'):
+                await asyncio.gather(asyncio.create_task(work('task')), scheduler.run(1, lambda: work('queued')))
+        finally:
+            await scheduler.close()
+        await local.flush()
+
+        spans = {span['name']: span for span in read_spans(path)}
+        assert spans['task']['parentId'] == spans['reaction']['id']
+        assert spans['queued']['parentId'] == spans['reaction']['id']
+
+    @pytest.mark.asyncio
+    async def test_backend_request_span_records_time_to_first_byte(self, shared_tracer):
+        """Test that translate_text and its HTTP request to the backend are traced with the TTFB"""
+        async with FakeOllamaServer(latency=0.01) as server:
+            client = OllamaClient(server.url)
+            try:
+                with shared_tracer.trace('reaction'):
+                    assert await translate_text("Hello world", "french", client=client) == "Bonjour le monde"
+            finally:
+                await client.close()
+        await shared_tracer.flush()
+
+        spans = {span['name']: span for span in read_spans(shared_tracer.path)}
+        request = spans['ollama_request']
+        assert request['parentId'] == spans['translate_text']['id']
+        assert request['tags']['status'] == '200'
+        assert 0 < float(request['tags']['ttfb_ms']) <= request['duration'] / 1000
+        assert spans['translate_text']['tags']['language'] == 'french'
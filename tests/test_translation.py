@@ -1,118 +1,268 @@
 import pytest
+import asyncio
 import json
 from unittest.mock import patch, Mock, AsyncMock
-import requests
+import aiohttp
 
 # Import the function to test
-from discord_translator.translation import translate_text
+from discord_translator.translation import (
+    SYSTEM_PROMPT, translate_batch, translate_text, translate_text_multi, stream_translation
+)
+from discord_translator.client import OllamaClient
+from discord_translator.metrics import registry
+
+
+def make_client(return_value=None, side_effect=None):
+    """Create a mocked OllamaClient whose generate() returns or raises as given"""
+    client = Mock(spec=OllamaClient)
+    client.generate = AsyncMock(return_value=return_value, side_effect=side_effect)
+    return client
+
 
 # Tests specifically for the LLM translation functionality
 class TestTranslation:
     @pytest.mark.asyncio
     async def test_successful_translation(self):
         """Test successful translation with valid input"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "response": "Bonjour le monde"
-        }
+        client = make_client({"response": "Bonjour le monde"})
 
-        with patch('requests.post', return_value=mock_response):
-            result = await translate_text("Hello world", "french")
-            assert result == "Bonjour le monde"
+        result = await translate_text("Hello world", "french", client=client)
+        assert result == "Bonjour le monde"
 
     @pytest.mark.asyncio
     async def test_translation_api_error(self):
         """Test handling of API errors"""
-        with patch('requests.post', side_effect=requests.exceptions.RequestException("API Error")):
-            result = await translate_text("Hello world", "french")
-            assert result is None
+        client = make_client(side_effect=aiohttp.ClientError("API Error"))
+
+        result = await translate_text("Hello world", "french", client=client)
+        assert result is None
 
     @pytest.mark.asyncio
     async def test_translation_invalid_json(self):
         """Test handling of invalid JSON response"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.side_effect = json.JSONDecodeError("Invalid JSON", "", 0)
+        client = make_client(side_effect=json.JSONDecodeError("Invalid JSON", "", 0))
 
-        with patch('requests.post', return_value=mock_response):
-            result = await translate_text("Hello world", "french")
-            assert result is None
+        result = await translate_text("Hello world", "french", client=client)
+        assert result is None
 
     @pytest.mark.asyncio
     async def test_translation_missing_response_field(self):
         """Test handling of missing 'response' field in API response"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {}  # Empty response without 'response' field
+        client = make_client({})  # Empty response without 'response' field
 
-        with patch('requests.post', return_value=mock_response):
-            result = await translate_text("Hello world", "french")
-            assert result is None
+        result = await translate_text("Hello world", "french", client=client)
+        assert result is None
 
     @pytest.mark.asyncio
     async def test_translation_timeout(self):
         """Test handling of API timeout"""
-        with patch('requests.post', side_effect=requests.exceptions.Timeout("Timeout")):
-            result = await translate_text("Hello world", "french")
-            assert result is None
+        client = make_client(side_effect=asyncio.TimeoutError())
+
+        result = await translate_text("Hello world", "french", client=client)
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_translation_records_timing_and_errors(self):
+        """Test that the Ollama call is timed and failures are counted by kind"""
+        registry.reset()
+        await translate_text("Hello world", "french", client=make_client({"response": "Bonjour"}))
+        await translate_text("Hello world", "french", client=make_client(side_effect=asyncio.TimeoutError()))
+
+        assert registry.histogram('translator_stage_seconds', stage='ollama').count == 2
+        assert registry.value('translator_backend_errors_total', error='timeout') == 1
 
     @pytest.mark.asyncio
     async def test_translation_server_error(self):
         """Test handling of server error"""
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("Server Error")
+        error = aiohttp.ClientResponseError(Mock(), (), status=500, message="Server Error")
+        client = make_client(side_effect=error)
 
-        with patch('requests.post', return_value=mock_response):
-            result = await translate_text("Hello world", "french")
-            assert result is None
+        result = await translate_text("Hello world", "french", client=client)
+        assert result is None
 
     @pytest.mark.asyncio
     async def test_translation_request_format(self):
         """Test that the request is formatted correctly"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"response": "Test"}
+        client = make_client({"response": "Test"})
 
-        with patch('requests.post') as mock_post:
-            mock_post.return_value = mock_response
-            await translate_text("Hello world", "french")
+        with patch.dict('os.environ', {'OLLAMA_MODEL': 'other-model'}):
+            await translate_text("Hello world", "french", client=client)
 
-            # Verify the request format
-            mock_post.assert_called_once()
-            args, kwargs = mock_post.call_args
+        # Verify the request format; the model comes from the client's configuration, not the environment
+        client.generate.assert_called_once()
+        payload = client.generate.call_args[0][0]
 
-            assert args[0] == 'http://localhost:11434/api/generate'
-            # assert kwargs['json']['model'] == 'llama2'
-            assert kwargs['json']['model'].startswith('llama')
-            assert kwargs['json']['prompt'] == 'Translate the following text to french. Translation only no explanations or commentary will be accepted: "Hello world"'
-            assert kwargs['json']['stream'] is False
-            assert kwargs['timeout'] == 30
+        assert 'model' not in payload
+        assert payload['prompt'].startswith('Translate the following text to french.')
+        assert payload['prompt'].endswith('\n\nHello world')
+        assert payload['stream'] is False
+
+    @pytest.mark.asyncio
+    async def test_requests_share_the_system_prompt(self):
+        """Test that every language sends the same system prompt and an output limit scaled to the text"""
+        client = make_client({"response": "Test"})
+
+        await translate_text("Hello world", "french", client=client)
+        await translate_text("Hello world, how are you today?", "german", client=client)
+
+        first, second = (call.args[0] for call in client.generate.call_args_list)
+        assert first["system"] == second["system"] == SYSTEM_PROMPT
+        assert first["options"]["num_predict"] < second["options"]["num_predict"]
 
     @pytest.mark.asyncio
     async def test_translation_empty_input(self):
         """Test handling of empty input text"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"response": ""}
+        client = make_client({"response": ""})
 
-        with patch('requests.post', return_value=mock_response):
-            result = await translate_text("", "french")
-            assert result == ""
+        result = await translate_text("", "french", client=client)
+        assert result == ""
+        client.generate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_protected_spans_kept_out_of_prompt(self):
+        """Test that code and URLs are replaced by placeholders in the prompt and restored after"""
+        client = make_client({"response": "Exécutez [[0]] puis ouvrez [[1]]"})
+
+        result = await translate_text("Run `make test` then open https://example.com", "french", client=client)
+
+        prompt = client.generate.call_args[0][0]['prompt']
+        assert "`make test`" not in prompt
+        assert "https://example.com" not in prompt
+        assert prompt.endswith("Run [[0]] then open [[1]]")
+        assert result == "Exécutez `make test` puis ouvrez https://example.com"
+
+    @pytest.mark.asyncio
+    async def test_nothing_translatable_skips_model(self):
+        """Test that a message of only code and links is returned without a model call"""
+        client = make_client({"response": "unused"})
+        text = "```\nls -la\n```\nhttps://example.com"
+
+        assert await translate_text(text, "french", client=client) == text
+        client.generate.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_translation_long_text(self):
         """Test handling of long input text"""
         long_text = "Hello world " * 100
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"response": "Long translated text"}
+        client = make_client({"response": "Long translated text"})
+
+        result = await translate_text(long_text, "french", client=client)
+        assert result == "Long translated text"
+
+    @pytest.mark.asyncio
+    async def test_translation_without_client_closes_temporary_client(self):
+        """Test that a client created for a single call is closed afterwards"""
+        with patch('discord_translator.translation.OllamaClient') as client_cls:
+            client = make_client({"response": "Bonjour"})
+            client.close = AsyncMock()
+            client_cls.from_env.return_value = client
+
+            result = await translate_text("Hello", "french")
+
+            assert result == "Bonjour"
+            client.close.assert_awaited_once()
+
+
+class TestTranslateTextMulti:
+    @pytest.mark.asyncio
+    async def test_one_json_request_for_all_languages(self):
+        """Test that every language is requested in one JSON-mode call and parsed per language"""
+        client = make_client({"response": json.dumps({"French": "Translation: Bonjour", "german": "Hallo"})})
+
+        result = await translate_text_multi("Hello", ["french", "german"], client=client)
+
+        assert result == {"french": "Bonjour", "german": "Hallo"}
+        client.generate.assert_called_once()
+        payload = client.generate.call_args[0][0]
+        assert payload["format"] == "json"
+        assert "french, german" in payload["prompt"]
+
+    @pytest.mark.asyncio
+    async def test_missing_languages_are_none(self):
+        """Test that languages absent from the response are reported as failed"""
+        client = make_client({"response": json.dumps({"french": "Bonjour", "german": 42})})
+
+        result = await translate_text_multi("Hello", ["french", "german", "spanish"], client=client)
+
+        assert result == {"french": "Bonjour", "german": None, "spanish": None}
+
+    @pytest.mark.asyncio
+    async def test_protected_spans_restored_in_every_language(self):
+        """Test that code and links are put back into each translation"""
+        client = make_client({"response": json.dumps({"french": "Lancez [[0]]", "german": "Starte [[0]]"})})
+
+        result = await translate_text_multi("Run `make`", ["french", "german"], client=client)
+
+        assert result == {"french": "Lancez `make`", "german": "Starte `make`"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("response", [{"response": "not json"}, {"response": "[1, 2]"}])
+    async def test_invalid_json_fails_every_language(self, response):
+        """Test that a response that is not a JSON object fails all languages"""
+        client = make_client(response)
+
+        result = await translate_text_multi("Hello", ["french", "german"], client=client)
+
+        assert result == {"french": None, "german": None}
+
+
+class TestTranslateBatch:
+    @pytest.mark.asyncio
+    async def test_one_json_request_for_all_texts(self):
+        """Test that several texts are sent in one JSON-mode call and matched back in order"""
+        client = make_client({"response": json.dumps({"translations": ["Bonjour", "Lancez [[0]]"]})})
+
+        result = await translate_batch(["Hello", "`42`", "Run `make`"], "french", client=client)
+
+        assert result == ["Bonjour", "`42`", "Lancez `make`"]
+        client.generate.assert_called_once()
+        payload = client.generate.call_args[0][0]
+        assert payload["format"] == "json"
+        assert '["Hello", "Run [[0]]"]' in payload["prompt"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("response", [
+        {"response": json.dumps({"translations": ["Bonjour"]})},
+        {"response": "not json"},
+    ])
+    async def test_mismatched_or_invalid_response_fails_every_text(self, response):
+        """Test that a response that cannot be matched to the texts fails all of them"""
+        client = make_client(response)
+
+        result = await translate_batch(["Hello", "Goodbye"], "french", client=client)
+
+        assert result == [None, None]
+
+
+class TestStreamTranslation:
+    @pytest.mark.asyncio
+    async def test_yields_accumulated_translation(self):
+        """Test that each streamed token extends the yielded translation"""
+        async def chunks(payload):
+            for token in ("Translation: Bon", "jour", " le monde"):
+                yield {"response": token, "done": False}
+            yield {"response": "", "done": True}
+
+        client = Mock(spec=OllamaClient)
+        client.stream_generate = chunks
+
+        results = [text async for text in stream_translation("Hello world", "french", client)]
+        assert results == ["Bon", "Bonjour", "Bonjour le monde"]
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self):
+        """Test that transport errors are raised to the caller"""
+        async def chunks(payload):
+            yield {"response": "Bon", "done": False}
+            raise aiohttp.ClientPayloadError("connection lost")
+
+        client = Mock(spec=OllamaClient)
+        client.stream_generate = chunks
 
-        with patch('requests.post', return_value=mock_response):
-            result = await translate_text(long_text, "french")
-            assert result == "Long translated text"
+        with pytest.raises(aiohttp.ClientError):
+            async for _ in stream_translation("Hello world", "french", client):
+                pass
 
 
 if __name__ == '__main__':
-    pytest.main([__file__])
\ No newline at end of file
+    pytest.main([__file__])